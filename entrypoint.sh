@@ -28,7 +28,7 @@ if [ "$BUILD" = "1" ]; then
 fi
 if [ "$PRODUCTION" = "1" ]; then
 #   echo "⛔ Production server not implemented yet!"
-  gunicorn --bind "0.0.0.0:$APP_PORT" "$APP_NAME.asgi" --log-level info --chdir $APP_NAME -w 4 --worker-connections=1000 --threads 2 -k uvicorn.workers.UvicornWorker
+  gunicorn --bind "0.0.0.0:$APP_PORT" "$APP_NAME.asgi" --log-level info --chdir $APP_NAME -w "${GUNICORN_WORKERS:-4}" --worker-connections=1000 --threads "${GUNICORN_THREADS:-2}" -k uvicorn.workers.UvicornWorker
 else
   if [ "$CONTAINER" = "1" ]; then
     echo "🐋 running project in container. Visit http://0.0.0.0:8081."
@@ -0,0 +1,103 @@
+"""
+Minimal HTTP load test reporting latency percentiles.
+
+Usage:
+    python scripts/loadtest.py http://localhost:8080/ --requests 2000 --concurrency 16
+    python scripts/loadtest.py http://localhost:8080/transactions/ \\
+        --cookie "sessionid=<id>" --save after.json --baseline before.json
+
+Run it once against the server before a change with `--save before.json`
+and again after it with `--baseline before.json` to compare the numbers.
+"""
+import json
+import time
+import argparse
+import statistics
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, rank):
+    """Returns the `rank` percentile (0-100) of sorted `values`."""
+    index = min(len(values) - 1, max(0, round(rank / 100 * len(values)) - 1))
+    return values[index]
+
+
+def fetch(url, headers, timeout):
+    """Returns (status, seconds) for one GET request."""
+    request = urllib.request.Request(url, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def run(url, requests, concurrency, headers, timeout, warmup):
+    for _ in range(warmup):
+        fetch(url, headers, timeout)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: fetch(url, headers, timeout), range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(seconds * 1000 for status, seconds in results if 200 <= status < 400)
+    if not latencies:
+        raise SystemExit(f"All {requests} requests to {url} failed.")
+    return {
+        "url": url,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(1 for status, _ in results if not 200 <= status < 400),
+        "throughput": round(requests / elapsed, 1),
+        "mean": round(statistics.fmean(latencies), 2),
+        "p50": round(percentile(latencies, 50), 2),
+        "p95": round(percentile(latencies, 95), 2),
+        "p99": round(percentile(latencies, 99), 2),
+        "max": round(latencies[-1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("url")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests sent first.")
+    parser.add_argument("--cookie", help="Cookie header, e.g. 'sessionid=...'.")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare with results saved by a previous run.")
+    options = parser.parse_args()
+
+    headers = {"Cookie": options.cookie} if options.cookie else {}
+    result = run(
+        options.url, options.requests, options.concurrency,
+        headers, options.timeout, options.warmup,
+    )
+    baseline = {}
+    if options.baseline:
+        with open(options.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    print(f"{result['requests']} requests, concurrency {result['concurrency']}, "
+          f"{result['errors']} errors")
+    for metric in ("throughput", "mean", "p50", "p95", "p99", "max"):
+        unit = "req/s" if metric == "throughput" else "ms"
+        line = f"{metric:>10}: {result[metric]:>10} {unit}"
+        if metric in baseline:
+            line += f"  (before: {baseline[metric]} {unit})"
+        print(line)
+
+    if options.save:
+        with open(options.save, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
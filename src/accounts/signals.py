@@ -5,6 +5,8 @@ from django.dispatch import receiver
 
 from allauth.account.signals import email_confirmed
 
+from transactions.provisioning import provision_categories
+
 logger = logging.getLogger('accounts.signal')
 
 @receiver(email_confirmed)
@@ -13,3 +15,9 @@ def set_user_verified(sender, **kwargs):
     logger.debug("Email confrimed: %s", user)
     user.is_verified = True
     user.save()
+
+
+@receiver(email_confirmed)
+def provision_default_categories(sender, **kwargs):
+    user = kwargs['email_address'].user
+    provision_categories([user])
@@ -1,4 +1,12 @@
 """Configurations for development and maintenance"""
+import copy
+import json
+import atexit
+import random
+import logging
+import datetime
+from logging.handlers import QueueHandler
+
 LOG = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -62,3 +70,115 @@ LOG = {
         }
     }
 }
+
+
+# Attributes every LogRecord has; anything else was passed through `extra`.
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects, including the values
+    passed through `extra`.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a `rate` fraction of the records below `level`, and every record
+    at or above it.
+    """
+
+    def __init__(self, rate=0.01, level="INFO"):
+        super().__init__()
+        self.rate = rate
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def filter(self, record):
+        return record.levelno >= self.level or random.random() < self.rate
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    Queues records with their exception and stack information, which
+    `QueueHandler.prepare()` drops after merging the traceback into the
+    message, so that the listener's formatter can output them separately.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Selected by the PRODUCTION setting. Records are put on a queue by the
+# calling thread and formatted and written by the listener's thread, which
+# `start_log_listener` starts. Loggers on hot paths stay at DEBUG, sampled.
+PRODUCTION_LOG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "app.config.JSONFormatter"},
+    },
+    "filters": {
+        "sampled": {"()": "app.config.SamplingFilter", "rate": 0.01},
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "json",
+        },
+        "queue": {
+            "class": "app.config.StructuredQueueHandler",
+            "handlers": ["console"],
+            "filters": ["sampled"],
+            "respect_handler_level": True,
+        },
+    },
+    "root": {"handlers": ["queue"], "level": "INFO"},
+    "loggers": {
+        "django": {"level": "INFO"},
+        "django.db.backends": {"level": "WARNING"},
+        "environ": {"level": "WARNING"},
+        "pages.views": {"level": "DEBUG"},
+        "transactions.cache": {"level": "DEBUG"},
+        "app.middleware": {"level": "INFO"},
+    },
+}
+
+
+def start_log_listener(name="queue"):
+    """
+    Starts the listener of the QueueHandler configured as `name`, and
+    stops it, flushing the queue, when the process exits.
+    """
+    handler = logging.getHandlerByName(name)
+    listener = getattr(handler, "listener", None)
+    if listener is not None and listener._thread is None:
+        listener.start()
+        atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,87 @@
+import time
+import heapq
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('app.middleware')
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting queries and their total time, and
+    keeping the `keep` slowest statements.
+    """
+
+    def __init__(self, keep=5):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            entry = (duration, self.count, sql)
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+
+    def slowest_statements(self):
+        """Returns (milliseconds, sql) pairs of the slowest statements, slowest first."""
+        return [(duration * 1000, sql) for duration, _, sql in sorted(self.slowest, reverse=True)]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records the number of queries, the database time and the total time of
+    each request. Adds them to the response as a `Server-Timing` header and
+    logs requests slower than `SLOW_REQUEST_THRESHOLD` milliseconds with
+    their slowest statements.
+
+    Enabled by the `QUERY_INSTRUMENTATION` setting. It is synchronous, so
+    it instruments the queries of sync views only.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, "SLOW_REQUEST_THRESHOLD", 500)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = (time.perf_counter() - started) * 1000
+        database = recorder.duration * 1000
+
+        response["Server-Timing"] = (
+            f'db;dur={database:.1f};desc="{recorder.count} queries", '
+            f'app;dur={total - database:.1f}, total;dur={total:.1f}'
+        )
+        if total >= self.threshold:
+            match = request.resolver_match
+            logger.warning(
+                "Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms. Slowest:\n%s",
+                request.method,
+                request.path,
+                match.view_name if match else "-",
+                total,
+                recorder.count,
+                database,
+                "\n".join(f"  {duration:.1f} ms: {sql}" for duration, sql in recorder.slowest_statements()),
+            )
+        return response
@@ -1,3 +1,6 @@
+from django.contrib.auth.mixins import AccessMixin
+
+
 class ContextMixin:
 
     def get_context_data(self, **kwargs):
@@ -5,3 +8,17 @@ class ContextMixin:
         context = super().get_context_data(**kwargs)
         context['user'] = self.request.user
         return context
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """
+    `LoginRequiredMixin` for views whose handlers are all `async def`.
+    The user is loaded with `request.auser()`, so the check never blocks
+    the event loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
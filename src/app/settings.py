@@ -15,9 +15,8 @@ from logging.config import dictConfig
 from pathlib import Path
 from django.core.exceptions import ImproperlyConfigured
 
-from .config import LOG
+from .config import LOG, PRODUCTION_LOG, start_log_listener
 
-dictConfig(LOG)
 logging.getLogger('environ').setLevel(logging.WARNING)
 
 
@@ -44,6 +43,12 @@ ALLOWED_HOSTS = env.str('ALLOWED_HOSTS', default=DEFAULT_HOSTS).split(',')
 CONTAINER = env.bool("CONTAINER", default=False)
 PRODUCTION = env.bool("PRODUCTION", default=False)
 
+if PRODUCTION:
+    dictConfig(PRODUCTION_LOG)
+    start_log_listener()
+else:
+    dictConfig(LOG)
+
 DOMAIN_URL = f"https://{ALLOWED_HOSTS[0]}/"
 if len(ALLOWED_HOSTS) > 3:
     DOMAIN_URL = f"https://{ALLOWED_HOSTS[-1]}/"
@@ -112,6 +117,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "app.middleware.QueryInstrumentationMiddleware",  # only with QUERY_INSTRUMENTATION
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -121,7 +127,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "transactions.middleware.CategoryOwnershipMiddleware",
 ]
+# Server-Timing headers and slow request logs (see app/middleware.py).
+QUERY_INSTRUMENTATION = env.bool("QUERY_INSTRUMENTATION", default=DEBUG)
+SLOW_REQUEST_THRESHOLD = env.int("SLOW_REQUEST_THRESHOLD", default=500)  # milliseconds
 
 ROOT_URLCONF = "app.urls"
 
@@ -163,6 +173,60 @@ if not PRODUCTION:
         }
     }
 
+# The app is served over ASGI, where persistent connections (CONN_MAX_AGE)
+# are neither reused nor closed across requests, so they are off by default.
+# Set DB_POOL=1 to reuse connections through psycopg 3's connection pool
+# (requires `pip install "psycopg[binary,pool]"`). Each gunicorn worker owns
+# a pool, so the server opens up to GUNICORN_WORKERS * DB_POOL_MAX_SIZE
+# connections.
+GUNICORN_WORKERS = env.int("GUNICORN_WORKERS", default=4)
+GUNICORN_THREADS = env.int("GUNICORN_THREADS", default=2)
+DB_POOL = env.bool("DB_POOL", default=False)
+if DB_POOL:
+    try:
+        import psycopg_pool  # noqa: F401  pylint: disable=unused-import
+    except ImportError as error:
+        raise ImproperlyConfigured(
+            'DB_POOL=1 requires psycopg 3 with its pool: pip install "psycopg[binary,pool]"'
+        ) from error
+for database in DATABASES.values():
+    database["CONN_HEALTH_CHECKS"] = env.bool("CONN_HEALTH_CHECKS", default=True)
+    if DB_POOL and database["ENGINE"] == "django.db.backends.postgresql":
+        # Persistent connections and pooling are mutually exclusive.
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": env.int("DB_POOL_MIN_SIZE", default=1),
+            "max_size": env.int("DB_POOL_MAX_SIZE", default=GUNICORN_THREADS + 1),
+            "timeout": env.int("DB_POOL_TIMEOUT", default=10),
+        }
+    else:
+        database["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=0)
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# CACHE_URL examples: locmemcache://, filecache:///var/tmp/django_cache,
+# dbcache://django_cache (run `manage.py createcachetable`),
+# redis://localhost:6379/0 (requires the `redis` package).
+
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+CACHES["default"].setdefault("KEY_PREFIX", env("CACHE_KEY_PREFIX", default="expense-tracker"))
+DASHBOARD_CACHE_TIMEOUT = env.int("DASHBOARD_CACHE_TIMEOUT", default=300)
+EXCHANGE_BASE_CURRENCY = env("EXCHANGE_BASE_CURRENCY", default="BRL")
+REPORT_CACHE_TIMEOUT = env.int("REPORT_CACHE_TIMEOUT", default=3600)
+REFERENCE_CACHE_TIMEOUT = env.int("REFERENCE_CACHE_TIMEOUT", default=3600)
+REFERENCE_CACHE_LOCAL_TIMEOUT = env.int("REFERENCE_CACHE_LOCAL_TIMEOUT", default=60)
+MATCHER_CACHE_TIMEOUT = env.int("MATCHER_CACHE_TIMEOUT", default=3600)
+# A local memory cache lives in each gunicorn worker, so the version bumps
+# that invalidate dashboards, reports, compiled rules and reference data
+# only reach the worker that made them. Keep those entries as short-lived as
+# the local tier of the reference caches; use a shared backend to cache
+# them longer.
+if CACHES["default"]["BACKEND"].endswith("LocMemCache") and GUNICORN_WORKERS > 1:
+    REFERENCE_CACHE_TIMEOUT = min(REFERENCE_CACHE_TIMEOUT, REFERENCE_CACHE_LOCAL_TIMEOUT)
+    DASHBOARD_CACHE_TIMEOUT = min(DASHBOARD_CACHE_TIMEOUT, REFERENCE_CACHE_LOCAL_TIMEOUT)
+    REPORT_CACHE_TIMEOUT = min(REPORT_CACHE_TIMEOUT, REFERENCE_CACHE_LOCAL_TIMEOUT)
+    MATCHER_CACHE_TIMEOUT = min(MATCHER_CACHE_TIMEOUT, REFERENCE_CACHE_LOCAL_TIMEOUT)
+
 CHANNEL_LAYERS = {
     'default': {
         "BACKEND": "channels.layers.InMemoryChannelLayer"
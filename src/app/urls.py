@@ -22,6 +22,7 @@ from django.urls import include
 urlpatterns = [
     path("", include("pages.urls")),
     path("accounts/", include("accounts.urls")),
+    path("transactions/", include("transactions.urls")),
     path("accounts/", include("django.contrib.auth.urls")),
     path('accounts/', include('allauth.urls')),
     path("i18n/", include("django.conf.urls.i18n")),
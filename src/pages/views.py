@@ -1,6 +1,10 @@
 import logging
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import TemplateView
 from app.mixins import ContextMixin
+from transactions.cache import dashboard_version
+from transactions.models import Transaction
 
 logger = logging.getLogger('pages.views')
 
@@ -8,9 +12,19 @@ logger = logging.getLogger('pages.views')
 class HomePageView(ContextMixin, TemplateView):
     template_name = "pages/home.html"
     def get(self, request, *args, **kwargs):
-        logger.debug(self.request.user)
+        logger.debug("Home page requested by %s.", request.user)
         return super().get(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        if user.is_authenticated:
+            # The summary is only queried when the cached fragment is stale.
+            context['summary'] = SimpleLazyObject(lambda: Transaction.objects.summary(user))
+            context['dashboard_version'] = dashboard_version(user.pk)
+            context['dashboard_timeout'] = settings.DASHBOARD_CACHE_TIMEOUT
+        return context
+
 
 class ColorsPageView(ContextMixin, TemplateView):
 
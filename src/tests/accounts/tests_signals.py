@@ -0,0 +1,16 @@
+from allauth.account.models import EmailAddress
+from allauth.account.signals import email_confirmed
+from django.test import TestCase
+from transactions.models import CategoryUser
+from transactions.provisioning import DEFAULT_CATEGORIES
+from tests.factories import UserFactory
+
+
+class EmailConfirmedTest(TestCase):
+    def test_email_confirmed(self):
+        user = UserFactory()
+        email_address = EmailAddress.objects.create(user=user, email=user.email, verified=True, primary=True)
+        email_confirmed.send(sender=EmailAddress, request=None, email_address=email_address)
+        user.refresh_from_db()
+        self.assertTrue(user.is_verified)
+        self.assertEqual(CategoryUser.objects.filter(user=user).count(), len(DEFAULT_CATEGORIES))
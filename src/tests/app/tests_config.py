@@ -0,0 +1,77 @@
+import sys
+import json
+import logging
+import subprocess
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.config import JSONFormatter, SamplingFilter
+
+
+def make_record(level=logging.INFO, message="Hello %s", args=("world",), **extra):
+    record = logging.LogRecord("tests", level, __file__, 10, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class JSONFormatterTest(SimpleTestCase):
+
+    def test_single_line_json(self):
+        line = JSONFormatter().format(make_record(user_id=3))
+        self.assertNotIn("\n", line)
+        entry = json.loads(line)
+        self.assertEqual(entry["message"], "Hello world")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "tests")
+        self.assertEqual(entry["user_id"], 3)
+
+    def test_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record(level=logging.ERROR)
+            record.exc_info = sys.exc_info()
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertIn("ValueError: boom", entry["exception"])
+
+
+class ProductionLogTest(SimpleTestCase):
+
+    def test_exception_through_the_queue(self):
+        # Configures logging in a separate interpreter to leave this one's
+        # alone; the listener flushes the queue when it exits.
+        script = (
+            "import logging, logging.config\n"
+            "from app.config import PRODUCTION_LOG, start_log_listener\n"
+            "logging.config.dictConfig(PRODUCTION_LOG)\n"
+            "start_log_listener()\n"
+            "try:\n"
+            "    raise ValueError('boom')\n"
+            "except ValueError:\n"
+            "    logging.getLogger('tests').exception('Failed %s', 'here', stack_info=True)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parents[2],
+        )
+        entry = json.loads(result.stderr)
+        self.assertEqual(entry["message"], "Failed here")
+        self.assertIn("ValueError: boom", entry["exception"])
+        self.assertIn("Stack (most recent call last)", entry["stack"])
+
+
+class SamplingFilterTest(SimpleTestCase):
+
+    def test_keeps_records_at_or_above_level(self):
+        sampler = SamplingFilter(rate=0)
+        self.assertTrue(sampler.filter(make_record(logging.INFO)))
+        self.assertTrue(sampler.filter(make_record(logging.ERROR)))
+        self.assertFalse(sampler.filter(make_record(logging.DEBUG)))
+
+    def test_samples_records_below_level(self):
+        sampler = SamplingFilter(rate=0.5)
+        with mock.patch("app.config.random.random", side_effect=[0.2, 0.7]):
+            self.assertTrue(sampler.filter(make_record(logging.DEBUG)))
+            self.assertFalse(sampler.filter(make_record(logging.DEBUG)))
@@ -0,0 +1,30 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from transactions.models import Currency
+from tests.factories import UserFactory
+
+
+@override_settings(QUERY_INSTRUMENTATION=True)
+class QueryInstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.client.force_login(self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("transactions:list"))
+        timing = response["Server-Timing"]
+        self.assertIn('desc="3 queries"', timing)  # session, user and page
+        self.assertIn("total;dur=", timing)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=0)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs("app.middleware", "WARNING") as logs:
+            self.client.get(reverse("transactions:list"))
+        self.assertIn("transactions:list", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+    @override_settings(QUERY_INSTRUMENTATION=False)
+    def test_disabled(self):
+        response = self.client.get(reverse("transactions:list"))
+        self.assertNotIn("Server-Timing", response)
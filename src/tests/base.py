@@ -1,4 +1,7 @@
+from contextlib import contextmanager
+from django.db import connections
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -10,3 +13,23 @@ class BaseTestAccounts(TestCase):
     def create_user(self, email="test@example.com", password="mysecretpassword", **kwargs):
         """Create and return a user."""
         return User.objects.create_user(email=email, password=password, **kwargs)
+
+
+class QueryBudgetTestCase(TestCase):
+    """Test case with an assertion on the maximum number of queries."""
+
+    @contextmanager
+    def assertQueryBudget(self, budget, using="default"):
+        """
+        Fails if the block runs more than `budget` queries, listing them.
+        Unlike `assertNumQueries`, fewer queries pass.
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = "\n".join(
+                f"{index}. {query['sql']}"
+                for index, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f"{executed} queries executed, budget is {budget}:\n{queries}")
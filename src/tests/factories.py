@@ -1,5 +1,8 @@
+import datetime
 import factory
+from factory import fuzzy
 from django.contrib.auth import get_user_model
+from transactions.models import Currency, Category, CategoryUser, Transaction
 
 
 class UserFactory(factory.django.DjangoModelFactory):
@@ -12,3 +15,52 @@ class UserFactory(factory.django.DjangoModelFactory):
     password = factory.PostGenerationMethodCall(
         'set_password', 'mysecretpassword'
     )
+
+
+class CurrencyFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Currency
+        django_get_or_create = ("code",)
+
+    code = "BRL"
+    name = "Brazilian Real"
+
+
+class CategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Category
+        django_get_or_create = ("name",)
+
+    name = factory.Sequence(lambda n: f"categoria {n}")
+
+
+class CategoryUserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CategoryUser
+        django_get_or_create = ("user", "category")
+
+    user = factory.SubFactory(UserFactory)
+    category = factory.SubFactory(CategoryFactory)
+    color = factory.Faker("hex_color")
+
+
+class TransactionFactory(factory.django.DjangoModelFactory):
+    """An expense of the user, in one of the user's categories."""
+
+    class Meta:
+        model = Transaction
+
+    user = factory.SubFactory(UserFactory)
+    description = factory.Faker("sentence", nb_words=3)
+    amount = fuzzy.FuzzyDecimal(1, 500)
+    currency = factory.SubFactory(CurrencyFactory)
+    date = fuzzy.FuzzyDate(datetime.date.today() - datetime.timedelta(days=365))
+    payment_method = Transaction.PaymentMethod.DEBITO
+    transaction_type = Transaction.TransactionType.EXPENSE
+    category = factory.SubFactory(CategoryUserFactory, user=factory.SelfAttribute("..user"))
+
+    class Params:
+        income = factory.Trait(transaction_type=Transaction.TransactionType.INCOME)
+        transfer = factory.Trait(
+            transaction_type=Transaction.TransactionType.TRANSFER, payment_method=""
+        )
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.template.defaultfilters import floatformat
+from django.test import TestCase
+from django.urls import reverse
+from transactions.models import Currency, Transaction
+from tests.factories import UserFactory
+
+
+def money(amount):
+    """Formats an amount like the dashboard does, in the active locale."""
+    return floatformat(amount, 2)
+
+
+class HomePageDashboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.add_transaction("100.00", "income")
+        self.client.force_login(self.user)
+
+    def add_transaction(self, amount, transaction_type, user=None):
+        return Transaction.objects.create(
+            user=user or self.user,
+            description="Test",
+            amount=amount,
+            currency=self.currency,
+            date="2024-03-10",
+            payment_method="debito",
+            transaction_type=transaction_type,
+        )
+
+    def test_anonymous_users_get_no_dashboard(self):
+        self.client.logout()
+        response = self.client.get(reverse("home"))
+        self.assertNotContains(response, "dashboard-summary")
+
+    def test_summary_is_cached(self):
+        self.assertContains(self.client.get(reverse("home")), money(100))
+        with self.assertNumQueries(2):  # session and user
+            self.assertContains(self.client.get(reverse("home")), money(100))
+
+    def test_saving_a_transaction_invalidates_the_summary(self):
+        self.client.get(reverse("home"))
+        transaction = self.add_transaction("30.00", "expense")
+        self.assertContains(self.client.get(reverse("home")), money(70))
+        transaction.delete()
+        self.assertContains(self.client.get(reverse("home")), money(100))
+
+    def test_bulk_record_invalidates_the_summary(self):
+        self.client.get(reverse("home"))
+        Transaction.objects.bulk_record([Transaction(
+            user=self.user, description="Rent", amount="40.00", currency=self.currency,
+            date="2024-03-11", payment_method="debito", transaction_type="expense",
+        )])
+        self.assertContains(self.client.get(reverse("home")), money(60))
+
+    def test_other_users_changes_keep_the_cache(self):
+        self.client.get(reverse("home"))
+        self.add_transaction("30.00", "expense", user=UserFactory())
+        with self.assertNumQueries(2):  # session and user
+            self.assertContains(self.client.get(reverse("home")), money(100))
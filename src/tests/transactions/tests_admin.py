@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from transactions.admin import EstimatedCountPaginator
+from transactions.models import Currency, Category, CategoryUser, Transaction
+
+User = get_user_model()
+
+
+class TransactionAdminTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com", password="secret")
+        self.client.force_login(self.admin)
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category_user = CategoryUser.objects.create(
+            user=self.admin, category=Category.objects.create(name="alimentação")
+        )
+
+    def add_transactions(self, count):
+        Transaction.objects.bulk_record([
+            Transaction(
+                user=self.admin,
+                description=f"Transaction {index}",
+                amount=10,
+                currency=self.currency,
+                date="2024-03-10",
+                payment_method="debito",
+                transaction_type="expense",
+                category=self.category_user,
+                is_deleted=index == 0,
+            )
+            for index in range(count)
+        ])
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("admin:transactions_transaction_changelist"))
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelist_queries_do_not_depend_on_rows(self):
+        self.add_transactions(2)
+        few = self.changelist_queries()
+        self.add_transactions(20)
+        self.assertEqual(self.changelist_queries(), few)
+
+    def test_changelist_includes_deleted_transactions(self):
+        self.add_transactions(3)
+        response = self.client.get(
+            reverse("admin:transactions_transaction_changelist"), {"is_deleted__exact": "1"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+    def test_delete_selected_updates_rollups(self):
+        self.add_transactions(3)
+        selected = [str(pk) for pk in Transaction.all_objects.values_list("pk", flat=True)]
+        response = self.client.post(
+            reverse("admin:transactions_transaction_changelist"),
+            {"action": "delete_selected", "_selected_action": selected, "post": "yes"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Transaction.all_objects.exists())
+        self.assertEqual(Transaction.objects.summary(self.admin)["expense"], 0)
+        self.category_user.refresh_from_db()
+        self.assertEqual(self.category_user.transaction_count, 0)
+        self.assertEqual(self.category_user.total_amount, 0)
+
+    def test_category_user_changelist(self):
+        response = self.client.get(reverse("admin:transactions_categoryuser_changelist"))
+        self.assertContains(response, "alimentação")
+
+    def test_paginator_counts_exactly_outside_postgres(self):
+        self.add_transactions(3)
+        paginator = EstimatedCountPaginator(Transaction.all_objects.order_by("pk"), 2)
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
@@ -0,0 +1,87 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from transactions.benchmarks import (
+    RealisticSampler, benchmark_users, generate_transactions, regressions
+)
+from transactions.models import Transaction, MonthlyRollup
+from tests.factories import CategoryUserFactory, TransactionFactory, UserFactory
+
+
+class FactoriesTest(TestCase):
+    def test_transaction_category_belongs_to_user(self):
+        transaction = TransactionFactory()
+        self.assertEqual(transaction.category.user, transaction.user)
+
+    def test_traits(self):
+        user = UserFactory()
+        category = CategoryUserFactory(user=user)
+        transfer = TransactionFactory(user=user, category=category, transfer=True)
+        self.assertEqual(transfer.transaction_type, Transaction.TransactionType.TRANSFER)
+        self.assertEqual(transfer.payment_method, "")
+        self.assertEqual(TransactionFactory(user=user, category=category, income=True).category, category)
+
+
+class GenerateLoadTest(TestCase):
+    def test_generate_load(self):
+        users = benchmark_users(5)
+        self.assertEqual(generate_transactions(users, 300, batch_size=100, sampler=RealisticSampler), 300)
+        counts = sorted(
+            Transaction.all_objects.filter(user=user).count() for user in users
+        )
+        self.assertEqual(sum(counts), 300)
+        self.assertEqual(
+            sum(MonthlyRollup.objects.values_list("transaction_count", flat=True)),
+            Transaction.objects.count(),
+        )
+
+    def test_is_deterministic(self):
+        users = benchmark_users(2)
+        generate_transactions(users, 50, seed=1, sampler=RealisticSampler)
+        first = list(Transaction.all_objects.order_by("description").values_list("amount", "date"))
+        Transaction.all_objects.all().delete()
+        generate_transactions(users, 50, seed=1, sampler=RealisticSampler)
+        second = list(Transaction.all_objects.order_by("description").values_list("amount", "date"))
+        self.assertEqual(first, second)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("generate_load", "--rows", "40", "--users", "3", stdout=out)
+        self.assertIn("Generated 40 transactions for 3 users", out.getvalue())
+
+    def test_uniform_sampler(self):
+        users = benchmark_users(2)
+        self.assertEqual(generate_transactions(users, 50), 50)
+        self.assertEqual(set(Transaction.all_objects.values_list("currency__code", flat=True)), {"BRL"})
+
+
+class BenchmarkManagersTest(TestCase):
+    def test_regressions(self):
+        baseline = {"summary": 10.0, "page": 2.0, "gone": 1.0}
+        medians = {"summary": 20.0, "page": 3.0, "new": 50.0}
+        self.assertEqual(regressions(medians, baseline), {"summary": (10.0, 20.0)})
+
+    def test_requires_data(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark_managers", stdout=StringIO())
+
+    def test_baseline_round_trip(self):
+        generate_transactions(benchmark_users(2), 100, sampler=RealisticSampler)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "baseline.json"
+            out = StringIO()
+            call_command("benchmark_managers", "--repeat", "1", "--save", str(path), stdout=out)
+            medians = json.loads(path.read_text())["medians"]
+            self.assertIn("summary", medians)
+            self.assertIn("page (second)", out.getvalue())
+
+            path.write_text(json.dumps({"medians": dict.fromkeys(medians, 0.0)}))
+            with self.assertRaises(CommandError):
+                call_command(
+                    "benchmark_managers", "--repeat", "1", "--baseline", str(path),
+                    "--tolerance", "-2", stdout=StringIO(),
+                )
@@ -0,0 +1,167 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase, skipIfDBFeature
+from transactions.models import Currency, Category, CategoryUser, Transaction, Budget, MonthlyRollup
+from tests.factories import UserFactory
+
+
+class BudgetTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.food = CategoryUser.objects.create(
+            user=self.user, category=Category.objects.create(name="alimentação")
+        )
+        self.fun = CategoryUser.objects.create(
+            user=self.user, category=Category.objects.create(name="lazer")
+        )
+        self.budget = Budget.objects.create(
+            user=self.user, category=self.food, currency=self.currency,
+            month=datetime.date(2024, 3, 15), amount=500,
+        )
+
+    def create_transaction(self, **kwargs):
+        data = {
+            "user": self.user,
+            "description": "Groceries",
+            "amount": 100,
+            "currency": self.currency,
+            "date": datetime.date(2024, 3, 1),
+            "payment_method": "debito",
+            "transaction_type": Transaction.TransactionType.EXPENSE,
+            "category": self.food,
+        }
+        data.update(kwargs)
+        return Transaction.objects.create(**data)
+
+    def spent(self, budget=None):
+        return Budget.objects.values_list("spent", flat=True).get(pk=(budget or self.budget).pk)
+
+    def test_month_is_normalized(self):
+        self.assertEqual(self.budget.month, datetime.date(2024, 3, 1))
+
+    def test_save_edit_and_soft_delete(self):
+        transaction = self.create_transaction()
+        self.create_transaction(transaction_type="income")
+        self.create_transaction(date=datetime.date(2024, 4, 1))
+        self.assertEqual(self.spent(), Decimal("100"))
+
+        transaction.amount = 250
+        transaction.save()
+        self.assertEqual(self.spent(), Decimal("250"))
+
+        transaction.category = self.fun
+        transaction.save()
+        self.assertEqual(self.spent(), Decimal("0"))
+
+        transaction.category = self.food
+        transaction.save()
+        transaction.is_deleted = True
+        transaction.save()
+        self.assertEqual(self.spent(), Decimal("0"))
+
+    def test_delete(self):
+        transaction = self.create_transaction(amount=80)
+        transaction.delete()
+        self.assertEqual(self.spent(), Decimal("0"))
+
+    def test_bulk_record(self):
+        Transaction.objects.bulk_record([
+            Transaction(
+                user=self.user, description="Bulk", amount=amount, currency=self.currency,
+                date=datetime.date(2024, 3, 5), payment_method="pix",
+                transaction_type="expense", category=self.food,
+            )
+            for amount in (10, 20, 30)
+        ])
+        self.assertEqual(self.spent(), Decimal("60"))
+
+    def test_new_budget_starts_from_rollups(self):
+        self.create_transaction(category=self.fun, amount=70)
+        budget = Budget.objects.create(
+            user=self.user, category=self.fun, currency=self.currency,
+            month=datetime.date(2024, 3, 1), amount=50,
+        )
+        self.assertEqual(budget.spent, Decimal("70"))
+
+    def test_new_budget_locks_its_rollup_row(self):
+        """Test that the rollup row an expense writer updates first exists, so writers wait for the budget."""
+        Budget.objects.create(
+            user=self.user, category=self.fun, currency=self.currency,
+            month=datetime.date(2024, 6, 1), amount=50,
+        )
+        self.assertEqual(
+            list(MonthlyRollup.objects.filter(category=self.fun).values_list("month", "amount", "transaction_count")),
+            [(datetime.date(2024, 6, 1), Decimal("0"), 0)],
+        )
+
+    @skipIfDBFeature("supports_nulls_distinct_unique_constraints")
+    def test_new_budget_sums_duplicate_rollup_rows(self):
+        """Test that rollup rows written before the unique key existed are all counted."""
+        key = {
+            "user": self.user, "month": datetime.date(2024, 5, 1), "currency": self.currency,
+            "transaction_type": Transaction.TransactionType.EXPENSE, "category": self.fun,
+        }
+        MonthlyRollup.objects.bulk_create([
+            MonthlyRollup(amount=20, transaction_count=1, **key),
+            MonthlyRollup(amount=30, transaction_count=1, **key),
+        ])
+        budget = Budget.objects.create(
+            user=self.user, category=self.fun, currency=self.currency,
+            month=datetime.date(2024, 5, 1), amount=100,
+        )
+        self.assertEqual(budget.spent, Decimal("50"))
+
+    def test_moving_a_budget_recomputes_spent(self):
+        self.create_transaction(amount=50, category=self.fun)
+        budget = Budget.objects.create(
+            user=self.user, category=self.fun, currency=self.currency,
+            month=datetime.date(2024, 4, 1), amount=100,
+        )
+        self.assertEqual(budget.spent, Decimal("0"))
+        budget.month = datetime.date(2024, 3, 1)
+        budget.save()
+        self.assertEqual(self.spent(budget), Decimal("50"))
+        self.budget.delete()
+        budget.category = self.food
+        budget.save()
+        self.assertEqual(self.spent(budget), Decimal("0"))
+
+    def test_editing_the_limit_keeps_concurrent_spending(self):
+        stale = Budget.objects.get(pk=self.budget.pk)
+        self.create_transaction(amount=30)
+        stale.amount = 800
+        stale.save()
+        self.assertEqual(self.spent(), Decimal("30"))
+        self.assertEqual(Budget.objects.get(pk=self.budget.pk).amount, Decimal("800"))
+
+    def test_over_budget(self):
+        fun = Budget.objects.create(
+            user=self.user, category=self.fun, currency=self.currency,
+            month=datetime.date(2024, 3, 1), amount=50,
+        )
+        self.create_transaction(amount=400)
+        self.create_transaction(category=self.fun, amount=60)
+        with self.assertNumQueries(1):
+            over = list(Budget.objects.over_budget(self.user, "2024-03-20"))
+            self.assertEqual([budget.category.category.name for budget in over], ["lazer"])
+        self.assertEqual(over[0].pk, fun.pk)
+        self.assertEqual(over[0].remaining, Decimal("-10"))
+
+    def test_rebuild(self):
+        self.create_transaction(amount=90)
+        Budget.objects.update(spent=0)
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        self.assertIn("refreshed 1 budgets", out.getvalue())
+        self.assertEqual(self.spent(), Decimal("90"))
+
+    def test_category_must_belong_to_user(self):
+        with self.assertRaises(ValidationError):
+            Budget.objects.create(
+                user=UserFactory(), category=self.food, currency=self.currency,
+                month=datetime.date(2024, 3, 1), amount=10,
+            )
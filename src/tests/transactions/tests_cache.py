@@ -0,0 +1,94 @@
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from transactions.cache import ReferenceCache, currency_cache, category_cache
+from transactions.checks import check_shared_cache
+from transactions.models import Currency, Category, Transaction
+from tests.factories import UserFactory
+
+
+class ReferenceCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        currency_cache.clear()
+        category_cache.clear()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category = Category.objects.create(name="alimentação")
+        currency_cache.clear()
+        category_cache.clear()
+
+    def test_get_by_code_is_served_from_cache(self):
+        self.assertEqual(Currency.objects.get_by_code("BRL"), self.currency)
+        with self.assertNumQueries(0):
+            self.assertEqual(Currency.objects.get_by_code("BRL"), self.currency)
+        self.assertEqual(currency_cache.stats["misses"], 1)
+        self.assertEqual(currency_cache.stats["local_hits"], 1)
+
+    def test_missing_values_are_cached(self):
+        self.assertIsNone(Currency.objects.get_by_code("XYZ"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(Currency.objects.get_by_code("XYZ"))
+
+    def test_get_all_codes_returns_a_list(self):
+        self.assertEqual(Currency.objects.get_all_codes(), ["BRL"])
+        with self.assertNumQueries(0):
+            Currency.objects.get_all_codes()
+
+    def test_saving_a_currency_invalidates_the_cache(self):
+        Currency.objects.get_all_codes()
+        Currency.objects.create(code="USD", name="US Dollar")
+        self.assertEqual(sorted(Currency.objects.get_all_codes()), ["BRL", "USD"])
+
+    def test_deleting_a_category_invalidates_the_cache(self):
+        self.assertEqual(Category.objects.get_by_name(" Alimentação "), self.category)
+        self.category.delete()
+        self.assertIsNone(Category.objects.get_by_name("alimentação"))
+
+    def test_shared_tier_is_used_by_other_processes(self):
+        Currency.objects.get_by_code("BRL")
+        other_process = ReferenceCache("currencies")
+        with self.assertNumQueries(0):
+            self.assertEqual(other_process.get("code:BRL", lambda: None), self.currency)
+        self.assertEqual(other_process.stats["shared_hits"], 1)
+
+    @override_settings(REFERENCE_CACHE_LOCAL_TIMEOUT=0)
+    def test_invalidation_reaches_other_processes(self):
+        other_process = ReferenceCache("currencies")
+        other_process.get("codes", lambda: ["BRL"])
+        currency_cache.invalidate()
+        self.assertEqual(other_process.get("codes", lambda: ["BRL", "USD"]), ["BRL", "USD"])
+
+    def test_transaction_str_uses_cached_currency(self):
+        user = UserFactory()
+        Transaction.objects.create(
+            user=user, description="Lunch", amount="10.00", currency=self.currency,
+            date="2024-01-10", payment_method=Transaction.PaymentMethod.DEBITO,
+            transaction_type=Transaction.TransactionType.EXPENSE,
+        )
+        Currency.objects.get_cached(self.currency.pk)
+        transaction = Transaction.objects.get()
+        with self.assertNumQueries(0):
+            self.assertIn("BRL", str(transaction))
+
+
+class SharedCacheCheckTest(TestCase):
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        GUNICORN_WORKERS=4,
+    )
+    def test_warns_about_a_process_local_cache_with_several_workers(self):
+        self.assertEqual([message.id for message in check_shared_cache(None)], ["transactions.W001"])
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        GUNICORN_WORKERS=1,
+    )
+    def test_a_single_worker_may_use_a_process_local_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                            "LOCATION": "/tmp/expense-tracker-tests"}},
+        GUNICORN_WORKERS=4,
+    )
+    def test_shared_caches_pass(self):
+        self.assertEqual(check_shared_cache(None), [])
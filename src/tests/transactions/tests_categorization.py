@@ -0,0 +1,124 @@
+import time
+from decimal import Decimal
+from io import StringIO
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from transactions.cache import matcher_cache
+from transactions.categorization import RuleMatcher, matcher_for
+from transactions.importers import TransactionImporter, parse_ofx
+from transactions.models import CategorizationRule, Currency, Transaction
+from tests.factories import CategoryUserFactory, UserFactory
+from tests.transactions.tests_importers import OFX_STATEMENT
+
+
+class CategorizationRuleTest(TestCase):
+    def setUp(self):
+        matcher_cache.clear()
+        self.user = UserFactory()
+        self.transport = CategoryUserFactory(user=self.user, category__name="transporte")
+        self.food = CategoryUserFactory(user=self.user, category__name="alimentação")
+        self.salary = CategoryUserFactory(user=self.user, category__name="salário")
+        self.fun = CategoryUserFactory(user=self.user, category__name="lazer")
+        self.rule(pattern="uber", category=self.transport)
+        self.rule(pattern=r"ifood|uber\s*eats", is_regex=True, category=self.food, priority=10)
+        self.rule(pattern="", min_amount=1000, payment_method="pix", category=self.salary, priority=200)
+
+    def rule(self, **kwargs):
+        return CategorizationRule.objects.create(user=self.user, **kwargs)
+
+    def classify(self, description, amount=10, payment_method="debito"):
+        return matcher_for(self.user).classify(description, Decimal(amount), payment_method)
+
+    def test_keywords_are_case_insensitive(self):
+        self.assertEqual(self.classify("UBER *TRIP"), self.transport.pk)
+
+    def test_priority(self):
+        self.assertEqual(self.classify("Uber Eats pedido"), self.food.pk)
+        self.assertEqual(self.classify("iFood"), self.food.pk)
+
+    def test_keywords_are_literal(self):
+        self.rule(pattern="c++", category=self.food)
+        self.assertEqual(self.classify("livro c++"), self.food.pk)
+
+    def test_amount_and_payment_method(self):
+        self.assertEqual(self.classify("Empresa", 5000, "pix"), self.salary.pk)
+        self.assertIsNone(self.classify("Empresa", 5000, "debito"))
+        self.assertIsNone(self.classify("Empresa", 10, "pix"))
+
+    def test_falls_through_to_lower_priority_rules(self):
+        self.rule(pattern="uber", max_amount=5, category=self.food, priority=1)
+        self.assertEqual(self.classify("uber", 3), self.food.pk)
+        self.assertEqual(self.classify("uber", 30), self.transport.pk)
+
+    def test_no_rules(self):
+        self.assertIsNone(RuleMatcher([]).classify("uber", Decimal(1)))
+
+    def test_matcher_is_cached_until_rules_change(self):
+        matcher = matcher_for(self.user)
+        with self.assertNumQueries(0):
+            self.assertIs(matcher_for(self.user), matcher)
+        rule = CategorizationRule.objects.get(pattern="uber")
+        rule.is_active = False
+        rule.save()
+        self.assertIsNot(matcher_for(self.user), matcher)
+        self.assertIsNone(self.classify("uber trip"))
+
+    def test_other_users_are_not_affected(self):
+        other = UserFactory()
+        self.assertIsNone(matcher_for(other).classify("uber", Decimal(1)))
+
+    def test_validation(self):
+        with self.assertRaises(ValidationError):
+            self.rule(pattern="(unclosed", is_regex=True, category=self.food)
+        with self.assertRaises(ValidationError):
+            self.rule(pattern="x", min_amount=10, max_amount=1, category=self.food)
+        with self.assertRaises(ValidationError):
+            CategorizationRule.objects.create(user=UserFactory(), pattern="x", category=self.food)
+
+    def test_groups_and_backreferences_are_rejected(self):
+        for pattern in ["(?P<n>uber)", "(uber|99)", r"(a)b\1"]:
+            with self.subTest(pattern), self.assertRaises(ValidationError):
+                self.rule(pattern=pattern, is_regex=True, category=self.food)
+        self.rule(pattern="(?:uber|99) taxi", is_regex=True, category=self.food, priority=1)
+        self.assertEqual(self.classify("99 TAXI"), self.food.pk)
+
+    def test_rules_saved_with_groups_fall_back_to_one_by_one_matching(self):
+        # bulk_create skips clean(), like rules saved before it rejected groups.
+        CategorizationRule.objects.bulk_create([
+            CategorizationRule(
+                user=self.user, pattern=pattern, is_regex=True, category=category, priority=priority
+            )
+            for pattern, category, priority in [
+                ("(?P<n>99)", self.fun, 1),
+                ("(?P<n>taxi)", self.food, 2),
+                (r"(a)b\1", self.food, 3),
+            ]
+        ])
+        matcher = RuleMatcher(CategorizationRule.objects.filter(user=self.user))
+        self.assertIsNone(matcher.regex)
+        self.assertEqual(matcher.classify("99 pop", Decimal(1)), self.fun.pk)
+        self.assertEqual(matcher.classify("taxi", Decimal(1)), self.food.pk)
+        self.assertEqual(matcher.classify("Uber", Decimal(1)), self.transport.pk)
+        self.assertEqual(matcher.classify("aba", Decimal(1)), self.food.pk)
+        self.assertIsNone(matcher.classify("nothing", Decimal(1)))
+
+    def test_categorize_batch(self):
+        transactions = [
+            Transaction(description=f"UBER {index}", amount=Decimal(20), payment_method="pix")
+            for index in range(100_000)
+        ]
+        transactions[0].category_id = self.salary.pk
+        started = time.perf_counter()
+        categorized = matcher_for(self.user).categorize(transactions)
+        self.assertEqual(categorized, 99_999)
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertEqual(transactions[0].category_id, self.salary.pk)
+        self.assertEqual(transactions[1].category_id, self.transport.pk)
+
+    def test_importer_categorizes_rows(self):
+        Currency.objects.create(code="BRL", name="Brazilian Real")
+        TransactionImporter(self.user).run(parse_ofx(StringIO(OFX_STATEMENT)))
+        self.assertEqual(
+            Transaction.objects.get(user=self.user, description="Uber trip").category, self.transport
+        )
+        self.assertIsNone(Transaction.objects.get(user=self.user, description="Salary").category)
@@ -0,0 +1,102 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from transactions.models import CategoryUser, Transaction
+from tests.factories import CategoryUserFactory, CurrencyFactory, TransactionFactory, UserFactory
+
+
+class CategoryUsageTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.food = CategoryUserFactory(user=self.user)
+        self.fun = CategoryUserFactory(user=self.user)
+
+    def create(self, amount, date, category=None, **kwargs):
+        return TransactionFactory(
+            user=self.user, category=category or self.food, amount=Decimal(amount), date=date, **kwargs
+        )
+
+    def stats(self, category=None):
+        return CategoryUser.objects.values_list(
+            "transaction_count", "total_amount", "last_used"
+        ).get(pk=(category or self.food).pk)
+
+    def test_save(self):
+        self.create(10, datetime.date(2024, 3, 5))
+        self.create(15, datetime.date(2024, 2, 1), transfer=True)
+        self.assertEqual(self.stats(), (2, Decimal("25"), datetime.date(2024, 3, 5)))
+
+    def test_edit_and_move(self):
+        transaction = self.create(10, datetime.date(2024, 3, 5))
+        transaction.amount = Decimal(30)
+        transaction.date = datetime.date(2024, 4, 1)
+        transaction.save()
+        self.assertEqual(self.stats(), (1, Decimal("30"), datetime.date(2024, 4, 1)))
+
+        transaction.category = self.fun
+        transaction.save()
+        self.assertEqual(self.stats()[:2], (0, Decimal("0")))
+        self.assertEqual(self.stats(self.fun), (1, Decimal("30"), datetime.date(2024, 4, 1)))
+
+    def test_unchanged_contribution_writes_nothing(self):
+        transaction = self.create(10, datetime.date(2024, 3, 5))
+        transaction.description = "Renamed"
+        with CaptureQueriesContext(connection) as context:
+            transaction.save()
+        table = CategoryUser._meta.db_table
+        self.assertFalse([query for query in context.captured_queries if f'UPDATE "{table}"' in query["sql"]])
+        self.assertEqual(self.stats(), (1, Decimal("10"), datetime.date(2024, 3, 5)))
+
+    def test_moving_within_the_month_updates_last_used(self):
+        transaction = self.create(10, datetime.date(2024, 3, 5))
+        transaction.date = datetime.date(2024, 3, 20)
+        transaction.save()
+        self.assertEqual(self.stats(), (1, Decimal("10"), datetime.date(2024, 3, 20)))
+
+    def test_soft_delete_and_delete(self):
+        first = self.create(10, datetime.date(2024, 3, 5))
+        second = self.create(20, datetime.date(2024, 3, 6))
+        first.is_deleted = True
+        first.save()
+        self.assertEqual(self.stats()[:2], (1, Decimal("20")))
+        second.delete()
+        self.assertEqual(self.stats()[:2], (0, Decimal("0")))
+
+    def test_bulk_record(self):
+        currency = CurrencyFactory()
+        Transaction.objects.bulk_record([
+            TransactionFactory.build(
+                user=self.user, category=category, currency=currency, amount=Decimal(5), date=date
+            )
+            for category, date in [
+                (self.food, datetime.date(2024, 1, 1)),
+                (self.food, datetime.date(2024, 5, 1)),
+                (self.fun, datetime.date(2024, 2, 1)),
+            ]
+        ])
+        self.assertEqual(self.stats(), (2, Decimal("10"), datetime.date(2024, 5, 1)))
+        self.assertEqual(self.stats(self.fun), (1, Decimal("5"), datetime.date(2024, 2, 1)))
+
+    def test_sorted_by_usage(self):
+        self.create(10, datetime.date(2024, 3, 5), category=self.fun)
+        self.create(10, datetime.date(2024, 3, 6), category=self.fun)
+        self.create(10, datetime.date(2024, 3, 7))
+        by_count = CategoryUser.objects.filter(user=self.user).order_by("-transaction_count")
+        self.assertEqual(list(by_count), [self.fun, self.food])
+        by_date = CategoryUser.objects.filter(user=self.user).order_by("-last_used")
+        self.assertEqual(list(by_date), [self.food, self.fun])
+
+    def test_reconcile(self):
+        self.create(10, datetime.date(2024, 3, 5))
+        self.create(20, datetime.date(2024, 3, 9)).delete()
+        CategoryUser.objects.filter(pk=self.fun.pk).update(transaction_count=7)
+        out = StringIO()
+        call_command("reconcile_category_stats", "--batch-size", "1", stdout=out)
+        self.assertIn("Repaired 2 categories", out.getvalue())
+        self.assertEqual(self.stats(), (1, Decimal("10"), datetime.date(2024, 3, 5)))
+        self.assertEqual(self.stats(self.fun), (0, Decimal("0"), None))
+        self.assertEqual(CategoryUser.objects.reconcile(self.user), 0)
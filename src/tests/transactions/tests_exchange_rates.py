@@ -0,0 +1,106 @@
+import datetime
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from transactions.cache import currency_cache, rate_cache
+from transactions.models import Currency, ExchangeRate, Transaction
+from tests.factories import UserFactory
+
+
+class ExchangeRateTest(TestCase):
+    def setUp(self):
+        currency_cache.clear()
+        rate_cache.clear()
+        self.user = UserFactory()
+        self.brl = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.usd = Currency.objects.create(code="USD", name="US Dollar")
+        self.eur = Currency.objects.create(code="EUR", name="Euro")
+        ExchangeRate.objects.load([
+            ("USD", datetime.date(2024, 1, 1), Decimal("5.00")),
+            ("USD", datetime.date(2024, 2, 1), Decimal("4.00")),
+            ("EUR", datetime.date(2024, 1, 1), Decimal("6.00")),
+        ])
+        self.add("100.00", self.brl, "2024-01-10", "income")
+        self.add("10.00", self.usd, "2024-01-15", "expense")  # 50 BRL
+        self.add("10.00", self.usd, "2024-02-15", "expense")  # 40 BRL
+        self.add("5.00", self.eur, "2024-02-20", "expense")  # 30 BRL
+
+    def add(self, amount, currency, date, transaction_type):
+        return Transaction.objects.create(
+            user=self.user, description="Test", amount=amount, currency=currency,
+            date=date, payment_method="debito", transaction_type=transaction_type,
+        )
+
+    def test_summary_in_base_currency(self):
+        Currency.objects.get_by_code("BRL")  # Reference data is cached.
+        with self.assertNumQueries(1):
+            summary = Transaction.objects.summary_in("BRL", self.user)
+        self.assertEqual(summary["income"], Decimal("100.00"))
+        self.assertEqual(summary["expense"], Decimal("120.00"))
+        self.assertEqual(summary["net"], Decimal("-20.00"))
+        self.assertEqual(summary["unconverted_count"], 0)
+
+    def test_summary_in_other_currency(self):
+        summary = Transaction.objects.summary_in("USD", self.user, end="2024-01-31")
+        # 100 BRL at 5.00 BRL/USD, and the USD expense unchanged.
+        self.assertEqual(summary["income"], Decimal("20.00"))
+        self.assertEqual(summary["expense"], Decimal("10.00"))
+
+    def test_missing_rates_are_counted(self):
+        self.add("1.00", self.eur, "2023-12-31", "expense")
+        summary = Transaction.objects.summary_in("BRL", self.user)
+        self.assertEqual(summary["unconverted_count"], 1)
+        self.assertEqual(summary["expense"], Decimal("120.00"))
+
+    def test_unknown_currency(self):
+        with self.assertRaises(ValueError):
+            Transaction.objects.summary_in("XYZ")
+
+    def test_get_rate_uses_the_latest_rate_and_is_cached(self):
+        self.assertEqual(ExchangeRate.objects.get_rate("USD", datetime.date(2024, 1, 31)), Decimal("5"))
+        with self.assertNumQueries(0):
+            ExchangeRate.objects.get_rate("USD", datetime.date(2024, 1, 31))
+            self.assertEqual(ExchangeRate.objects.get_rate("BRL", datetime.date(2024, 1, 31)), 1)
+        self.assertIsNone(ExchangeRate.objects.get_rate("USD", datetime.date(2023, 1, 1)))
+        self.assertEqual(
+            ExchangeRate.objects.convert(Decimal("12.00"), "EUR", "USD", datetime.date(2024, 1, 5)),
+            Decimal("14.40"),
+        )
+
+    def test_saving_a_rate_clears_the_cache(self):
+        day = datetime.date(2024, 2, 10)
+        self.assertEqual(ExchangeRate.objects.get_rate("USD", day), Decimal("4"))
+        ExchangeRate.objects.create(currency=self.usd, date=day, rate=Decimal("4.50"))
+        self.assertEqual(ExchangeRate.objects.get_rate("USD", day), Decimal("4.5"))
+
+    def test_load_command_upserts(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete_on_close=False) as file:
+            file.write("date,currency,rate\n2024-01-01,usd,\"5,10\"\n2024-03-01,USD,3.9\n2024-03-01,XYZ,1\n")
+            file.close()
+            out = StringIO()
+            call_command("load_exchange_rates", file.name, stdout=out)
+        self.assertIn("Stored 2 exchange rates", out.getvalue())
+        self.assertEqual(
+            ExchangeRate.objects.get(currency=self.usd, date="2024-01-01").rate, Decimal("5.10")
+        )
+        self.assertEqual(ExchangeRate.objects.filter(currency=self.usd).count(), 3)
+
+    def test_load_rejects_rates_that_are_not_finite_and_positive(self):
+        for rate in [Decimal(0), Decimal("-1.5"), Decimal("NaN"), Decimal("Infinity"), "abc", None]:
+            with self.subTest(rate=rate), self.assertRaises(ValueError):
+                ExchangeRate.objects.load([
+                    ("USD", datetime.date(2024, 4, 1), Decimal("3.80")),
+                    ("USD", datetime.date(2024, 5, 1), rate),
+                ])
+        self.assertFalse(ExchangeRate.objects.filter(date__gte="2024-04-01").exists())
+
+    def test_load_command_rejects_invalid_rates(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete_on_close=False) as file:
+            file.write("date,currency,rate\n2024-04-01,USD,3.8\n2024-05-01,USD,0\n")
+            file.close()
+            with self.assertRaisesMessage(CommandError, "Line 3"):
+                call_command("load_exchange_rates", file.name, stdout=StringIO())
+        self.assertFalse(ExchangeRate.objects.filter(date__gte="2024-04-01").exists())
@@ -0,0 +1,77 @@
+import io
+import json
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from transactions.exporters import CSVExporter, JSONExporter, export, export_queryset
+from transactions.importers import parse_csv, TransactionImporter
+from transactions.models import Currency, Category, CategoryUser, Transaction
+from tests.factories import UserFactory
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category_user = CategoryUser.objects.create(
+            user=self.user,
+            category=Category.objects.create(name="alimentação"),
+        )
+        for day in range(1, 6):
+            Transaction.objects.create(
+                user=self.user,
+                description=f"Groceries, {day}",
+                amount=10 * day,
+                currency=self.currency,
+                date=f"2024-03-{day:02d}",
+                payment_method="debito",
+                transaction_type="expense",
+                category=self.category_user if day % 2 else None,
+                is_deleted=day == 5,
+            )
+
+    def test_csv_export_can_be_imported(self):
+        content = "".join(export(CSVExporter(), export_queryset(self.user), chunk_size=2))
+        other = UserFactory()
+        CategoryUser.objects.create(user=other, category=self.category_user.category)
+        importer = TransactionImporter(other)
+        self.assertEqual(importer.run(parse_csv(io.StringIO(content))), 4)
+        self.assertEqual(importer.rejected, [])
+        self.assertEqual(
+            Transaction.objects.summary(other)["expense"],
+            Transaction.objects.summary(self.user)["expense"],
+        )
+
+    def test_json_export(self):
+        content = "".join(export(JSONExporter(), export_queryset(self.user, end="2024-03-03")))
+        data = json.loads(content)
+        self.assertEqual([row["date"] for row in data], ["2024-03-01", "2024-03-02", "2024-03-03"])
+        self.assertEqual(data[0]["category"], "alimentação")
+        self.assertIsNone(data[1]["category"])
+
+    def test_empty_export(self):
+        self.assertEqual(json.loads("".join(export(JSONExporter(), export_queryset(UserFactory())))), [])
+
+    def test_export_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            list(export(CSVExporter(), export_queryset(self.user), chunk_size=2))
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("export_transactions", user=self.user.email, format="json", stdout=out)
+        self.assertEqual(len(json.loads(out.getvalue())), 4)
+
+    async def test_view_streams(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("transactions:export"), {"start": "2024-03-02"})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        content = b"".join([part async for part in response.streaming_content]).decode()
+        self.assertEqual(len(content.splitlines()), 4)  # header and 3 rows
+
+    async def test_view_validation(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("transactions:export"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get(reverse("transactions:export"), {"end": "yesterday"})
+        self.assertEqual(response.status_code, 400)
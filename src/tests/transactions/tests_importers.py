@@ -0,0 +1,108 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+from django.test import TestCase
+from transactions.importers import TransactionImporter, parse_csv, parse_ofx
+from transactions.models import Currency, Category, CategoryUser, Transaction, MonthlyRollup
+from tests.factories import UserFactory
+
+CSV_HEADER = "date,description,amount,currency,payment_method,transaction_type,category\n"
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>BRL
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240305120000[-3:BRT]<TRNAMT>-45,90<FITID>1<MEMO>Uber trip
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240306<TRNAMT>1500.00<FITID>2<NAME>Salary
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class TransactionImporterTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category = Category.objects.create(name="alimentação")
+        self.category_user = CategoryUser.objects.create(
+            user=self.user,
+            category=self.category,
+            color="#FF5733"
+        )
+
+    def csv_rows(self, count):
+        lines = [
+            f"2024-03-{day % 28 + 1:02d},Groceries {day},10.50,BRL,debito,expense,Alimentação\n"
+            for day in range(count)
+        ]
+        return parse_csv(StringIO(CSV_HEADER + "".join(lines)))
+
+    def test_import_csv(self):
+        """Test importing valid CSV rows."""
+        importer = TransactionImporter(self.user, batch_size=4)
+        imported = importer.run(self.csv_rows(10))
+        self.assertEqual(imported, 10)
+        self.assertEqual(importer.rejected, [])
+        self.assertEqual(Transaction.objects.for_user(self.user).count(), 10)
+        transaction = Transaction.objects.for_user(self.user).first()
+        self.assertEqual(transaction.category, self.category_user)
+        self.assertEqual(transaction.currency, self.currency)
+
+    def test_import_updates_rollups(self):
+        """Test that imported rows are added to the monthly rollups."""
+        TransactionImporter(self.user, batch_size=4).run(self.csv_rows(10))
+        rollup = MonthlyRollup.objects.get(user=self.user)
+        self.assertEqual(rollup.amount, 105)
+        self.assertEqual(rollup.transaction_count, 10)
+        self.assertEqual(Transaction.objects.total_expense(self.user), 105)
+
+    def test_validation_does_not_query_per_row(self):
+        """Test that the number of queries doesn't grow with the number of rows."""
+        importer = TransactionImporter(self.user, batch_size=100)
+        # The first import also inserts the month's rollup row.
+        with self.assertNumQueries(9):
+            importer.run(self.csv_rows(10))
+        importer = TransactionImporter(self.user, batch_size=100)
+        with self.assertNumQueries(6):
+            importer.run(self.csv_rows(40))
+
+    def test_rejects_malformed_rows(self):
+        """Test that malformed rows are reported and valid rows are kept."""
+        rows = parse_csv(StringIO(
+            CSV_HEADER
+            + "2024-03-01,Lunch,25.00,BRL,pix,expense,alimentação\n"
+            + "not a date,Dinner,25.00,BRL,pix,expense,\n"
+            + "2024-03-02,Bus,abc,BRL,pix,expense,\n"
+            + "2024-03-02,Taxi,30.00,XYZ,pix,expense,\n"
+            + "2024-03-02,Book,30.00,BRL,pix,expense,education\n"
+            + "2024-03-02,Savings,30.00,BRL,pix,transfer,\n"
+            + "2024-03-02,Unknown,NaN,BRL,pix,,\n"
+            + "2024-03-02,Huge,-Infinity,BRL,pix,,\n"
+        ))
+        importer = TransactionImporter(self.user)
+        importer.run(rows)
+        self.assertEqual(importer.imported, 1)
+        self.assertEqual([position for position, _, _ in importer.rejected], [3, 4, 5, 6, 7, 8, 9])
+
+    def test_import_ofx(self):
+        """Test importing an OFX statement using the sign of the amounts."""
+        importer = TransactionImporter(self.user)
+        importer.run(parse_ofx(StringIO(OFX_STATEMENT)))
+        self.assertEqual(importer.rejected, [])
+        expense = Transaction.objects.expense(self.user).get()
+        self.assertEqual(expense.description, "Uber trip")
+        self.assertEqual(expense.amount, Decimal("45.90"))
+        self.assertEqual(expense.date, datetime.date(2024, 3, 5))
+        self.assertEqual(expense.payment_method, "debito")
+        income = Transaction.objects.income(self.user).get()
+        self.assertEqual(income.description, "Salary")
+        self.assertEqual(income.amount, 1500)
+
+    def test_parse_ofx_across_chunks(self):
+        """Test that tags split between read chunks are parsed."""
+        stream = StringIO(OFX_STATEMENT)
+        original_read = stream.read
+        stream.read = lambda size: original_read(7)
+        rows = [row for _, row in parse_ofx(stream)]
+        self.assertEqual([row["amount"] for row in rows], ["-45,90", "1500.00"])
@@ -1,9 +1,16 @@
+import datetime
+from io import StringIO
+from unittest import mock, skipUnless
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from transactions.models import Currency, Category, CategoryUser, Transaction
 from transactions.managers import TransactionManager
-from tests.factories import UserFactory
+from tests.base import QueryBudgetTestCase
+from tests.factories import CategoryUserFactory, TransactionFactory, UserFactory
 
 User = get_user_model()
 
@@ -137,3 +144,275 @@ class TransactionManagerTest(TestCase):
         self.assertEqual(active_transactions.count(), 2)
         self.assertIn(self.expense_transaction, active_transactions)
         self.assertIn(self.transfer_transaction, active_transactions)
+
+    def test_summary(self):
+        """Test calculating every total and count in a single summary."""
+        summary = Transaction.objects.summary(self.user)
+        self.assertEqual(summary["income"], 1000.00)
+        self.assertEqual(summary["expense"], 200.00)
+        self.assertEqual(summary["transfer"], 300.00)
+        self.assertEqual(summary["total"], 1500.00)
+        self.assertEqual(summary["net"], 800.00)
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["income_count"], 1)
+        self.assertEqual(summary["expense_count"], 1)
+        self.assertEqual(summary["transfer_count"], 1)
+
+    def test_summary_runs_single_query(self):
+        """Test that the summary is computed with one aggregate query."""
+        with self.assertNumQueries(1):
+            Transaction.objects.summary(self.user)
+
+    def test_summary_excludes_deleted(self):
+        """Test that deleted transactions are ignored by the summary."""
+        self.expense_transaction.is_deleted = True
+        self.expense_transaction.save()
+        summary = Transaction.objects.summary(self.user)
+        self.assertEqual(summary["expense"], 0)
+        self.assertEqual(summary["expense_count"], 0)
+        self.assertEqual(summary["net"], 1000.00)
+
+    def test_summary_date_range(self):
+        """Test restricting the summary to a date range."""
+        today = timezone.now().date()
+        Transaction.objects.create(
+            user=self.user,
+            description="Old salary",
+            amount=500.00,
+            currency=self.currency,
+            date=today - timezone.timedelta(days=60),
+            payment_method="pix",
+            transaction_type=Transaction.TransactionType.INCOME,
+            category=self.category_user
+        )
+        summary = Transaction.objects.summary(self.user, start=today)
+        self.assertEqual(summary["income"], 1000.00)
+        summary = Transaction.objects.summary(self.user, end=today - timezone.timedelta(days=1))
+        self.assertEqual(summary["income"], 500.00)
+        self.assertEqual(summary["count"], 1)
+
+    def test_summary_for_user_without_transactions(self):
+        """Test that an empty summary returns zeros."""
+        summary = Transaction.objects.summary(UserFactory())
+        self.assertEqual(summary["total"], 0)
+        self.assertEqual(summary["net"], 0)
+        self.assertEqual(summary["count"], 0)
+
+    def test_page(self):
+        """Test paging through the history with cursors."""
+        transactions, cursor = Transaction.objects.page(self.user, size=2)
+        self.assertEqual(len(transactions), 2)
+        self.assertIsNotNone(cursor)
+        last_page, cursor = Transaction.objects.page(self.user, cursor=cursor, size=2)
+        self.assertEqual(len(last_page), 1)
+        self.assertIsNone(cursor)
+        self.assertCountEqual(
+            transactions + last_page,
+            [self.income_transaction, self.expense_transaction, self.transfer_transaction]
+        )
+
+    def test_page_is_stable_for_ties(self):
+        """Test that rows sharing date and creation time are neither skipped nor repeated."""
+        Transaction.objects.for_user(self.user).update(created_at=timezone.now())
+        seen = []
+        cursor = None
+        for _ in range(3):
+            transactions, cursor = Transaction.objects.page(self.user, cursor=cursor, size=1)
+            seen.extend(transactions)
+        self.assertIsNone(cursor)
+        self.assertEqual(len(set(t.pk for t in seen)), 3)
+
+    def test_page_invalid_cursor(self):
+        """Test that malformed cursors are rejected."""
+        with self.assertRaises(ValueError):
+            Transaction.objects.page(self.user, cursor="not-a-cursor")
+
+    def test_default_manager_excludes_deleted(self):
+        """Test that soft-deleted transactions are hidden unless all_objects is used."""
+        self.expense_transaction.is_deleted = True
+        self.expense_transaction.save()
+        self.assertNotIn(self.expense_transaction, Transaction.objects.for_user(self.user))
+        self.assertEqual(Transaction.objects.recent_transactions(user=self.user).count(), 2)
+        self.assertEqual(Transaction.objects.total_expense(self.user), 0)
+        self.assertIn(self.expense_transaction, Transaction.all_objects.for_user(self.user))
+
+    def test_chained_totals(self):
+        """Test composing filters before aggregating them."""
+        totals = Transaction.objects.for_user(self.user).expense().recent(30).totals()
+        self.assertEqual(totals["total"], 200.00)
+        self.assertEqual(totals["expense"], 200.00)
+        self.assertEqual(totals["count"], 1)
+        self.assertEqual(totals["income_count"], 0)
+
+    def test_chained_queryset_runs_single_query(self):
+        """Test that a composed queryset is evaluated with one query."""
+        with self.assertNumQueries(1):
+            list(Transaction.objects.for_user(self.user).income().recent(7))
+
+    def test_between(self):
+        """Test filtering transactions by an inclusive date range."""
+        today = timezone.now().date()
+        transactions = Transaction.objects.for_user(self.user).between(today, today)
+        self.assertEqual(transactions.count(), 3)
+        transactions = Transaction.objects.for_user(self.user).between(end=today - timezone.timedelta(days=1))
+        self.assertEqual(transactions.count(), 0)
+
+    def test_purge_deleted_transactions(self):
+        """Test that old soft-deleted transactions are hard-deleted in batches."""
+        old = timezone.now() - timezone.timedelta(days=120)
+        self.income_transaction.is_deleted = True
+        self.income_transaction.save()
+        self.expense_transaction.is_deleted = True
+        self.expense_transaction.save()
+        Transaction.all_objects.filter(pk=self.income_transaction.pk).update(updated_at=old)
+        call_command("purge_deleted_transactions", days=90, batch_size=1, stdout=StringIO())
+        self.assertFalse(Transaction.all_objects.filter(pk=self.income_transaction.pk).exists())
+        self.assertTrue(Transaction.all_objects.filter(pk=self.expense_transaction.pk).exists())
+        self.assertEqual(Transaction.objects.for_user(self.user).count(), 1)
+
+    def test_manager_methods_compose(self):
+        """Test that the manager methods return lazy querysets that compose into one query."""
+        today = timezone.now().date()
+        query = (
+            Transaction.objects.expense(self.user)
+            .by_payment_method("debito")
+            .by_category(self.category_user)
+            .between(today, today)
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(list(query), [self.expense_transaction])
+
+    def test_all_objects_queryset_methods(self):
+        """Test that all_objects exposes the same queryset methods."""
+        self.income_transaction.is_deleted = True
+        self.income_transaction.save()
+        self.assertEqual(list(Transaction.all_objects.income(self.user)), [self.income_transaction])
+        self.assertEqual(list(Transaction.all_objects.deleted_transactions(self.user)), [self.income_transaction])
+        self.assertEqual(Transaction.all_objects.active_transactions(self.user).count(), 2)
+
+    def test_no_registry_lookups_per_call(self):
+        """Test that the manager methods don't look models up in the apps registry."""
+        Transaction.objects.summary(self.user)
+        with mock.patch.object(apps, "get_model", side_effect=AssertionError):
+            Transaction.objects.summary(self.user)
+            Transaction.objects.total_income(self.user)
+            list(Transaction.objects.income(self.user))
+            list(Transaction.objects.transfer(self.user))
+
+
+class TransactionManagerQueryBudgetTest(QueryBudgetTestCase):
+    """Query budgets of `TransactionManager` methods, independent of the number of rows."""
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category_user = CategoryUser.objects.create(
+            user=self.user, category=Category.objects.create(name="alimentação")
+        )
+        self.transactions = Transaction.objects.bulk_record([
+            Transaction(
+                user=self.user,
+                description=f"Transaction {index}",
+                amount=10,
+                currency=self.currency,
+                date=timezone.now().date() - datetime.timedelta(days=index),
+                payment_method="debito",
+                transaction_type=Transaction.TransactionType.EXPENSE,
+                category=self.category_user,
+            )
+            for index in range(30)
+        ])
+
+    def test_reads(self):
+        budgets = {
+            "summary": (1, lambda: Transaction.objects.summary(self.user)),
+            "summary (range)": (1, lambda: Transaction.objects.summary(
+                self.user, start=timezone.now().date() - datetime.timedelta(days=3)
+            )),
+            "net_balance": (1, lambda: Transaction.objects.net_balance(self.user)),
+            "page": (1, lambda: Transaction.objects.page(self.user, size=10)),
+            "chained totals": (1, lambda: Transaction.objects.expense(self.user).recent(7).totals()),
+            "recent_transactions": (1, lambda: list(Transaction.objects.recent_transactions(30, self.user))),
+            "by_category": (1, lambda: list(Transaction.objects.by_category(self.category_user, self.user))),
+        }
+        for name, (budget, call) in budgets.items():
+            with self.subTest(name), self.assertQueryBudget(budget):
+                call()
+
+    def test_page_rows_need_no_extra_queries(self):
+        transactions, _ = Transaction.objects.page(self.user, size=20)
+        with self.assertQueryBudget(0):
+            [(t.currency.code, t.category.category.name) for t in transactions]
+
+    def test_bulk_record(self):
+        transactions = [
+            Transaction(
+                user=self.user, description="Bulk", amount=1, currency=self.currency,
+                date="2024-01-15", payment_method="debito",
+                transaction_type=Transaction.TransactionType.EXPENSE,
+            )
+            for _ in range(20)
+        ]
+        # Savepoint, insert, rollup update, rollup insert in its own
+        # savepoint, release.
+        with self.assertQueryBudget(7):
+            Transaction.objects.bulk_record(transactions)
+
+
+class TransactionSearchTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.category = CategoryUserFactory(user=self.user)
+        for index, description in enumerate([
+            "Uber para o trabalho",
+            "Uber Eats pizza",
+            "Mercado",
+            "uber aeroporto",
+        ]):
+            TransactionFactory(
+                user=self.user, category=self.category, description=description,
+                date=datetime.date(2024, 3, 1) + datetime.timedelta(days=index),
+            )
+        TransactionFactory(description="Uber de outro usuário")
+
+    def descriptions(self, rows):
+        return [row.description for row in rows]
+
+    def test_search(self):
+        rows, has_next = Transaction.objects.search(self.user, "uber")
+        self.assertCountEqual(
+            self.descriptions(rows),
+            ["Uber para o trabalho", "Uber Eats pizza", "uber aeroporto"],
+        )
+        self.assertFalse(has_next)
+
+    def test_every_word_must_match(self):
+        rows, _ = Transaction.objects.search(self.user, "uber pizza")
+        self.assertEqual(self.descriptions(rows), ["Uber Eats pizza"])
+
+    def test_pages(self):
+        first, has_next = Transaction.objects.search(self.user, "uber", size=2)
+        self.assertTrue(has_next)
+        second, has_next = Transaction.objects.search(self.user, "uber", page=2, size=2)
+        self.assertFalse(has_next)
+        self.assertEqual(len(set(self.descriptions(first + second))), 3)
+
+    def test_excludes_deleted(self):
+        Transaction.objects.filter(description="uber aeroporto").update(is_deleted=True)
+        rows, _ = Transaction.objects.search(self.user, "uber")
+        self.assertNotIn("uber aeroporto", self.descriptions(rows))
+
+    def test_blank_text(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(Transaction.objects.search(self.user, "  "), ([], False))
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            rows, _ = Transaction.objects.search(self.user, "uber")
+            [(row.currency.code, row.category.category.name) for row in rows]
+
+    @skipUnless(connection.vendor == "postgresql", "Uses the PostgreSQL search_vector column")
+    def test_ranks_and_uses_search_vector(self):
+        query = Transaction.objects._search_query(self.user, "uber")
+        self.assertIn("search_vector", str(query.query))
+        self.assertTrue(all(row.rank > 0 for row in query))
@@ -3,6 +3,7 @@ from django.utils.translation import gettext_lazy as _
 from tests.base import BaseTestAccounts
 from tests.factories import UserFactory
 from transactions.models import Currency, Category, CategoryUser, Transaction
+from transactions.ownership import category_ownership_cache
 
 
 class CurrencyModelTest(BaseTestAccounts):
@@ -175,3 +176,73 @@ class TransactionModelTest(BaseTestAccounts):
                 category=another_category_user  # Categoria de outro usuário
             )
             transaction.full_clean()
+
+    def test_transaction_without_category(self):
+        """Testa a criação de uma transação sem categoria."""
+        transaction = Transaction.objects.create(
+            user=self.user,
+            description="Supermercado",
+            amount=100.00,
+            currency=self.currency,
+            date="2024-03-01",
+            payment_method="debito",
+            transaction_type="expense",
+        )
+        self.assertIsNone(transaction.category)
+
+    def test_category_user_validation_by_id(self):
+        """Testa a validação de categoria de outro usuário informada pelo id."""
+        another_category_user = CategoryUser.objects.create(
+            user=UserFactory(),
+            category=self.category,
+        )
+        transaction = Transaction(
+            user=self.user,
+            description="Supermercado",
+            amount=100.00,
+            currency=self.currency,
+            date="2024-03-01",
+            payment_method="debito",
+            transaction_type="expense",
+            category_id=another_category_user.pk,
+        )
+        with self.assertRaises(ValidationError):
+            transaction.clean()
+
+    def test_create_transactions_query_count(self):
+        """Testa que criar N transações não busca a categoria nem o usuário dela."""
+        count = 10
+        # Savepoint, insert, rollup update, budget write, category
+        # statistics write and savepoint release. The first transaction
+        # also inserts its rollup row in a savepoint.
+        queries_per_transaction = 6
+        with self.assertNumQueries(count * queries_per_transaction + 3):
+            for _ in range(count):
+                Transaction.objects.create(
+                    user=self.user,
+                    description="Supermercado",
+                    amount=100.00,
+                    currency=self.currency,
+                    date="2024-03-01",
+                    payment_method="debito",
+                    transaction_type="expense",
+                    category=self.category_user
+                )
+
+    def test_create_transactions_by_category_id_query_count(self):
+        """Testa que o dono da categoria é buscado uma única vez por lote."""
+        count = 10
+        queries_per_transaction = 6
+        with self.assertNumQueries(count * queries_per_transaction + 3 + 1):
+            with category_ownership_cache():
+                for _ in range(count):
+                    Transaction.objects.create(
+                        user=self.user,
+                        description="Supermercado",
+                        amount=100.00,
+                        currency=self.currency,
+                        date="2024-03-01",
+                        payment_method="debito",
+                        transaction_type="expense",
+                        category_id=self.category_user.pk
+                    )
@@ -0,0 +1,57 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from transactions.cache import category_cache
+from transactions.models import Category, CategoryUser
+from transactions.provisioning import DEFAULT_CATEGORIES, default_categories, provision_categories
+from tests.factories import CategoryUserFactory, UserFactory
+
+
+class ProvisioningTest(TestCase):
+    def test_default_categories(self):
+        Category.objects.create(name="lazer")
+        categories = default_categories()
+        self.assertCountEqual([category.name for category in categories], DEFAULT_CATEGORIES)
+        self.assertEqual(Category.objects.count(), len(DEFAULT_CATEGORIES))
+
+    def test_default_categories_invalidate_the_cache(self):
+        category_cache.clear()
+        self.assertIsNone(Category.objects.get_by_name("saúde"))
+        default_categories()
+        self.assertEqual(Category.objects.get_by_name("saúde").name, "saúde")
+        with self.assertNumQueries(1):
+            default_categories()
+
+    def test_provision_categories(self):
+        users = UserFactory.create_batch(3)
+        categories = default_categories()
+        with self.assertNumQueries(1):
+            provision_categories(users, categories)
+        self.assertEqual(CategoryUser.objects.count(), 3 * len(DEFAULT_CATEGORIES))
+        link = CategoryUser.objects.filter(user=users[0], category__name="saúde").get()
+        self.assertTrue(link.is_default)
+        self.assertEqual(link.color, DEFAULT_CATEGORIES["saúde"])
+
+    def test_existing_links_are_kept(self):
+        user = UserFactory()
+        link = CategoryUserFactory(user=user, category__name="lazer", color="#000000")
+        provision_categories([user])
+        provision_categories([user])
+        self.assertEqual(CategoryUser.objects.filter(user=user).count(), len(DEFAULT_CATEGORIES))
+        link.refresh_from_db()
+        self.assertEqual(link.color, "#000000")
+
+    def test_backfill_command(self):
+        UserFactory.create_batch(5)
+        UserFactory(is_active=False)
+        out = StringIO()
+        call_command("provision_categories", "--batch-size", "2", stdout=out)
+        self.assertIn("Provisioned 5 users", out.getvalue())
+        self.assertEqual(CategoryUser.objects.count(), 5 * len(DEFAULT_CATEGORIES))
+
+    def test_populate_categories(self):
+        out = StringIO()
+        call_command("populate_categories", stdout=out)
+        call_command("populate_categories", stdout=out)
+        self.assertEqual(Category.objects.count(), len(DEFAULT_CATEGORIES))
+        self.assertIn("já existe", out.getvalue())
@@ -0,0 +1,115 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from transactions.models import (
+    Currency, Category, CategoryUser, Transaction, MonthlyRollup, RecurringTransaction
+)
+from tests.factories import UserFactory
+
+
+class RecurringTransactionTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category_user = CategoryUser.objects.create(
+            user=self.user, category=Category.objects.create(name="moradia")
+        )
+
+    def create_rule(self, **kwargs):
+        data = {
+            "user": self.user,
+            "description": "Rent",
+            "amount": 1500,
+            "currency": self.currency,
+            "payment_method": "pix",
+            "transaction_type": Transaction.TransactionType.EXPENSE,
+            "category": self.category_user,
+            "frequency": RecurringTransaction.Frequency.MONTHLY,
+            "start_date": datetime.date(2024, 1, 31),
+        }
+        data.update(kwargs)
+        return RecurringTransaction.objects.create(**data)
+
+    def dates(self):
+        return list(
+            Transaction.objects.filter(user=self.user).order_by("date").values_list("date", flat=True)
+        )
+
+    def test_next_run_starts_at_start_date(self):
+        self.assertEqual(self.create_rule().next_run, datetime.date(2024, 1, 31))
+
+    def test_monthly_occurrences_keep_the_start_day(self):
+        rule = self.create_rule()
+        created = RecurringTransaction.objects.materialize(datetime.date(2024, 4, 30))
+        self.assertEqual(created, 4)
+        self.assertEqual(self.dates(), [
+            datetime.date(2024, 1, 31),
+            datetime.date(2024, 2, 29),
+            datetime.date(2024, 3, 31),
+            datetime.date(2024, 4, 30),
+        ])
+        rule.refresh_from_db()
+        self.assertEqual(rule.next_run, datetime.date(2024, 5, 31))
+
+    def test_frequencies(self):
+        start = datetime.date(2024, 1, 1)
+        for frequency, interval, expected in [
+            ("daily", 3, datetime.date(2024, 1, 4)),
+            ("weekly", 2, datetime.date(2024, 1, 15)),
+            ("monthly", 3, datetime.date(2024, 4, 1)),
+            ("yearly", 1, datetime.date(2025, 1, 1)),
+        ]:
+            with self.subTest(frequency):
+                rule = RecurringTransaction(frequency=frequency, interval=interval, start_date=start)
+                self.assertEqual(rule.following(start), expected)
+
+    def test_materialize_is_idempotent(self):
+        self.create_rule()
+        self.create_rule(description="Salary", transaction_type="income", start_date=datetime.date(2024, 1, 5))
+        today = datetime.date(2024, 3, 10)
+        self.assertEqual(RecurringTransaction.objects.materialize(today), 5)
+        self.assertEqual(RecurringTransaction.objects.materialize(today), 0)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 5)
+
+    def test_materialize_batches_and_rollups(self):
+        for _ in range(5):
+            self.create_rule(start_date=datetime.date(2024, 3, 1))
+        with CaptureQueriesContext(connection) as queries:
+            created = RecurringTransaction.objects.materialize(datetime.date(2024, 3, 1), batch_size=2)
+        self.assertEqual(created, 5)
+        statements = [query["sql"].split(" (")[0] for query in queries]
+        # One insert and one update of next_run per batch of 2 rules.
+        self.assertEqual(statements.count('INSERT INTO "transactions_transaction"'), 3)
+        self.assertEqual(
+            sum(sql.startswith('UPDATE "transactions_recurringtransaction"') for sql in statements), 3
+        )
+        rollup = MonthlyRollup.objects.get(user=self.user)
+        self.assertEqual(rollup.amount, Decimal("7500"))
+        self.assertEqual(rollup.transaction_count, 5)
+
+    def test_end_date_deactivates_the_rule(self):
+        rule = self.create_rule(end_date=datetime.date(2024, 3, 15))
+        RecurringTransaction.objects.materialize(datetime.date(2024, 6, 1))
+        self.assertEqual(len(self.dates()), 2)
+        rule.refresh_from_db()
+        self.assertFalse(rule.is_active)
+        self.assertFalse(RecurringTransaction.objects.due(datetime.date(2024, 6, 1)).exists())
+
+    def test_validation(self):
+        with self.assertRaises(ValidationError):
+            self.create_rule(transaction_type="transfer")
+        with self.assertRaises(ValidationError):
+            self.create_rule(category=CategoryUser.objects.create(
+                user=UserFactory(), category=Category.objects.create(name="lazer")
+            ))
+
+    def test_command(self):
+        self.create_rule()
+        out = StringIO()
+        call_command("materialize_recurring_transactions", "--date", "2024-02-29", stdout=out)
+        self.assertIn("Created 2 transactions", out.getvalue())
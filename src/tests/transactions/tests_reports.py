@@ -0,0 +1,125 @@
+import datetime
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from transactions.models import Currency, Category, CategoryUser, Transaction
+from transactions.reports import periods, spending_report
+from tests.factories import UserFactory
+
+
+class SpendingReportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.brl = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.usd = Currency.objects.create(code="USD", name="US Dollar")
+        self.food = CategoryUser.objects.create(
+            user=self.user, category=Category.objects.create(name="alimentação")
+        )
+        self.add("2024-01-05", "10.00", "expense", category=self.food)
+        self.add("2024-01-20", "5.00", "expense", payment_method="pix")
+        self.add("2024-01-25", "100.00", "income", currency=self.usd)
+        self.add("2024-03-02", "7.50", "expense", category=self.food)
+        self.add("2024-03-03", "1.00", "expense", is_deleted=True)
+
+    def add(self, date, amount, transaction_type, user=None, currency=None, **kwargs):
+        kwargs.setdefault("payment_method", "debito")
+        return Transaction.objects.create(
+            user=user or self.user,
+            description="Test",
+            amount=amount,
+            currency=currency or self.brl,
+            date=date,
+            transaction_type=transaction_type,
+            **kwargs,
+        )
+
+    def report(self, *args, **kwargs):
+        return spending_report(
+            self.user, datetime.date(2024, 1, 1), datetime.date(2024, 3, 31), *args, **kwargs
+        )
+
+    def test_periods(self):
+        self.assertEqual(
+            list(periods(datetime.date(2024, 1, 3), datetime.date(2024, 1, 16), "week")),
+            [datetime.date(2024, 1, 1), datetime.date(2024, 1, 8), datetime.date(2024, 1, 15)],
+        )
+        self.assertEqual(
+            list(periods(datetime.date(2023, 12, 31), datetime.date(2024, 2, 1), "month")),
+            [datetime.date(2023, 12, 1), datetime.date(2024, 1, 1), datetime.date(2024, 2, 1)],
+        )
+
+    def test_monthly_report_fills_gaps(self):
+        report = self.report()
+        self.assertEqual(
+            [entry["period"] for entry in report],
+            [datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), datetime.date(2024, 3, 1)],
+        )
+        self.assertEqual(report[0]["expense"], Decimal("15.00"))
+        self.assertEqual(report[0]["net"], Decimal("85.00"))
+        self.assertEqual(report[0]["count"], 3)
+        self.assertEqual(report[1]["count"], 0)
+        self.assertEqual(report[1]["expense"], Decimal("0"))
+        self.assertEqual(report[2]["expense"], Decimal("7.50"))
+
+    def test_daily_and_yearly_buckets(self):
+        self.assertEqual(len(self.report("day")), 91)
+        (year,) = self.report("year")
+        self.assertEqual(year["period"], datetime.date(2024, 1, 1))
+        self.assertEqual(year["count"], 4)
+
+    def test_breakdowns(self):
+        january = self.report(by="category")[0]
+        self.assertEqual(
+            {item["key"]: item["expense"] for item in january["breakdown"]},
+            {"alimentação": Decimal("10.00"), None: Decimal("5.00")},
+        )
+        january = self.report(by="currency")[0]
+        self.assertEqual(
+            {item["key"]: item["net"] for item in january["breakdown"]},
+            {"BRL": Decimal("-15.00"), "USD": Decimal("100.00")},
+        )
+        january = self.report(by="payment_method")[0]
+        self.assertEqual({item["key"] for item in january["breakdown"]}, {"debito", "pix"})
+
+    def test_single_query_and_cache(self):
+        with self.assertNumQueries(1):
+            self.report("week", by="category")
+        with self.assertNumQueries(0):
+            self.report("week", by="category")
+
+    def test_changes_in_range_invalidate_the_cache(self):
+        self.report()
+        self.add("2024-02-10", "3.00", "expense")
+        self.assertEqual(self.report()[1]["expense"], Decimal("3.00"))
+
+        transaction = Transaction.objects.get(date="2024-03-02")
+        transaction.is_deleted = True
+        transaction.save()
+        self.assertEqual(self.report()[2]["count"], 0)
+
+    def test_changes_outside_the_range_keep_the_cache(self):
+        self.report()
+        self.add("2024-05-10", "3.00", "expense")
+        self.add("2024-02-10", "3.00", "expense", user=UserFactory())
+        with self.assertNumQueries(0):
+            self.report()
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            self.report("quarter")
+        with self.assertRaises(ValueError):
+            self.report(by="description")
+
+    def test_view(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("transactions:report"), {
+            "start": "2024-01-01", "end": "2024-03-31", "by": "category",
+        })
+        results = response.json()["results"]
+        self.assertEqual(results[0]["period"], "2024-01-01")
+        self.assertEqual(Decimal(results[0]["expense"]), Decimal("15"))
+        self.assertEqual(len(results[0]["breakdown"]), 2)
+        response = self.client.get(reverse("transactions:report"), {"start": "2024-01-01", "granularity": "hour"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,165 @@
+import datetime
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, skipUnlessDBFeature
+from transactions.models import Currency, Category, CategoryUser, Transaction, MonthlyRollup, Budget
+from tests.factories import UserFactory
+
+
+class MonthlyRollupTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category = Category.objects.create(name="alimentação")
+        self.category_user = CategoryUser.objects.create(
+            user=self.user,
+            category=self.category,
+            color="#FF5733"
+        )
+        self.expense = self.create_transaction(amount=200, date=datetime.date(2024, 3, 10))
+
+    def create_transaction(self, **kwargs):
+        data = {
+            "user": self.user,
+            "description": "Groceries",
+            "amount": 100,
+            "currency": self.currency,
+            "date": datetime.date(2024, 3, 1),
+            "payment_method": "debito",
+            "transaction_type": Transaction.TransactionType.EXPENSE,
+            "category": self.category_user,
+        }
+        data.update(kwargs)
+        return Transaction.objects.create(**data)
+
+    def rollups(self):
+        return list(
+            MonthlyRollup.objects.filter(user=self.user)
+            .order_by("month", "transaction_type")
+            .values_list("month", "transaction_type", "amount", "transaction_count")
+        )
+
+    def test_create_updates_rollup(self):
+        """Test that saving a new transaction adds it to its month."""
+        self.create_transaction(amount=50, date=datetime.date(2024, 3, 20))
+        self.assertEqual(self.rollups(), [(datetime.date(2024, 3, 1), "expense", 250, 2)])
+
+    def test_edit_amount_updates_rollup(self):
+        """Test that editing the amount applies only the difference."""
+        self.expense.amount = 120
+        self.expense.save()
+        self.assertEqual(self.rollups(), [(datetime.date(2024, 3, 1), "expense", 120, 1)])
+
+    def test_edit_date_moves_contribution(self):
+        """Test that moving a transaction to another month moves its contribution."""
+        self.expense.date = datetime.date(2024, 4, 2)
+        self.expense.save()
+        self.assertEqual(self.rollups(), [
+            (datetime.date(2024, 3, 1), "expense", 0, 0),
+            (datetime.date(2024, 4, 1), "expense", 200, 1),
+        ])
+
+    def test_edit_loaded_instance(self):
+        """Test that instances loaded from the database track their previous state."""
+        transaction = Transaction.objects.get(pk=self.expense.pk)
+        transaction.transaction_type = Transaction.TransactionType.INCOME
+        transaction.save()
+        self.assertEqual(self.rollups(), [
+            (datetime.date(2024, 3, 1), "expense", 0, 0),
+            (datetime.date(2024, 3, 1), "income", 200, 1),
+        ])
+
+    def test_concurrent_edits_of_stale_copies(self):
+        """Test that two copies of a row saved in turn apply their changes once each."""
+        budget = Budget.objects.create(
+            user=self.user, category=self.category_user, currency=self.currency,
+            month=datetime.date(2024, 3, 1), amount=1000,
+        )
+        first = Transaction.objects.get(pk=self.expense.pk)
+        second = Transaction.objects.get(pk=self.expense.pk)
+        first.amount = 20
+        first.save()
+        second.amount = 20
+        second.save()
+        self.assertEqual(self.rollups(), [(datetime.date(2024, 3, 1), "expense", 20, 1)])
+        self.assertEqual(Transaction.objects.summary(self.user)["expense"], 20)
+        budget.refresh_from_db()
+        self.assertEqual(budget.spent, 20)
+        self.category_user.refresh_from_db()
+        self.assertEqual(self.category_user.total_amount, 20)
+        self.assertEqual(self.category_user.transaction_count, 1)
+
+        first.delete()
+        second.delete()
+        self.assertEqual(self.rollups(), [(datetime.date(2024, 3, 1), "expense", 0, 0)])
+
+    def test_concurrent_first_writes_share_one_row(self):
+        """Test that a first write losing the insert race updates the winner's row."""
+        key = {
+            "user_id": self.user.pk, "month": datetime.date(2024, 5, 1), "currency_id": self.currency.pk,
+            "transaction_type": Transaction.TransactionType.INCOME, "category_id": None,
+        }
+        # The concurrent writer's row is committed after our UPDATE missed it.
+        MonthlyRollup.objects.create(amount=30, transaction_count=1, **key)
+        manager = MonthlyRollup.objects
+        missed = iter([manager.none()])
+        with mock.patch.object(manager, "filter", side_effect=lambda **kwargs: next(missed, None) or manager.get_queryset().filter(**kwargs)), \
+                mock.patch.object(manager, "create", side_effect=IntegrityError("duplicate key")):
+            manager.apply(key, 70, 1)
+        self.assertEqual(
+            list(MonthlyRollup.objects.filter(**key).values_list("amount", "transaction_count")),
+            [(100, 2)],
+        )
+
+    @skipUnlessDBFeature("supports_nulls_distinct_unique_constraints")
+    def test_key_is_unique_without_category(self):
+        key = {
+            "user": self.user, "month": datetime.date(2024, 5, 1), "currency": self.currency,
+            "transaction_type": Transaction.TransactionType.INCOME, "category": None,
+        }
+        MonthlyRollup.objects.create(**key)
+        with self.assertRaises(IntegrityError):
+            MonthlyRollup.objects.create(**key)
+
+    def test_soft_delete_and_restore(self):
+        """Test that flipping is_deleted removes and restores the contribution."""
+        self.expense.is_deleted = True
+        self.expense.save()
+        self.assertEqual(self.rollups(), [(datetime.date(2024, 3, 1), "expense", 0, 0)])
+        self.expense.is_deleted = False
+        self.expense.save()
+        self.assertEqual(self.rollups(), [(datetime.date(2024, 3, 1), "expense", 200, 1)])
+
+    def test_delete_updates_rollup(self):
+        """Test that deleting a transaction removes its contribution."""
+        Transaction.objects.get(pk=self.expense.pk).delete()
+        self.assertEqual(self.rollups(), [(datetime.date(2024, 3, 1), "expense", 0, 0)])
+
+    def test_rebuild(self):
+        """Test that rebuilding matches the incrementally maintained rollups."""
+        self.create_transaction(amount=10, date=datetime.date(2024, 5, 31))
+        self.create_transaction(amount=70, transaction_type="income", payment_method="pix")
+        expected = self.rollups()
+        MonthlyRollup.objects.all().delete()
+        call_command("rebuild_rollups", stdout=StringIO())
+        self.assertEqual(self.rollups(), expected)
+
+    def test_summary_uses_rollups_for_whole_months(self):
+        """Test that whole-month ranges are answered from the rollups."""
+        MonthlyRollup.objects.filter(user=self.user).update(amount=999)
+        summary = Transaction.objects.summary(
+            self.user, start=datetime.date(2024, 3, 1), end=datetime.date(2024, 3, 31)
+        )
+        self.assertEqual(summary["expense"], 999)
+        self.assertEqual(Transaction.objects.total_expense(self.user), 999)
+
+    def test_summary_scans_partial_months(self):
+        """Test that ranges that split a month are answered from the transactions."""
+        MonthlyRollup.objects.filter(user=self.user).update(amount=999)
+        summary = Transaction.objects.summary(
+            self.user, start=datetime.date(2024, 3, 5), end=datetime.date(2024, 3, 31)
+        )
+        self.assertEqual(summary["expense"], 200)
+        self.assertEqual(summary["expense_count"], 1)
@@ -0,0 +1,172 @@
+from decimal import Decimal
+from django.test import TestCase
+from django.urls import reverse
+from transactions.models import Currency, Category, CategoryUser, Transaction
+from tests.factories import UserFactory
+
+
+class TransactionListViewTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category_user = CategoryUser.objects.create(
+            user=self.user,
+            category=Category.objects.create(name="alimentação"),
+        )
+        for day in range(1, 6):
+            Transaction.objects.create(
+                user=self.user,
+                description=f"Groceries {day}",
+                amount=10,
+                currency=self.currency,
+                date=f"2024-03-{day:02d}",
+                payment_method="debito",
+                transaction_type="expense",
+                category=self.category_user,
+            )
+        self.client.force_login(self.user)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse("transactions:list"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_pages(self):
+        response = self.client.get(reverse("transactions:list"), {"size": 3})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [t["date"] for t in data["results"]], ["2024-03-05", "2024-03-04", "2024-03-03"]
+        )
+        self.assertEqual(data["results"][0]["currency"], "BRL")
+        self.assertEqual(data["results"][0]["category"], "alimentação")
+
+        response = self.client.get(reverse("transactions:list"), {"size": 3, "cursor": data["next"]})
+        data = response.json()
+        self.assertEqual([t["date"] for t in data["results"]], ["2024-03-02", "2024-03-01"])
+        self.assertIsNone(data["next"])
+
+    def test_page_queries_do_not_depend_on_depth(self):
+        cursor = self.client.get(reverse("transactions:list"), {"size": 1}).json()["next"]
+        with self.assertNumQueries(3):  # session, user and page
+            self.client.get(reverse("transactions:list"), {"size": 1, "cursor": cursor})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("transactions:list"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_own_transactions(self):
+        self.client.force_login(UserFactory())
+        response = self.client.get(reverse("transactions:list"))
+        self.assertEqual(response.json(), {"results": [], "next": None})
+
+
+class AsyncTransactionViewsTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.currency = Currency.objects.create(code="BRL", name="Brazilian Real")
+        self.category_user = CategoryUser.objects.create(
+            user=self.user,
+            category=Category.objects.create(name="alimentação"),
+        )
+        for day, transaction_type in ((1, "income"), (2, "expense"), (3, "expense")):
+            Transaction.objects.create(
+                user=self.user,
+                description=f"Transaction {day}",
+                amount=10 * day,
+                currency=self.currency,
+                date=f"2024-03-{day:02d}",
+                payment_method="debito",
+                transaction_type=transaction_type,
+                category=self.category_user,
+            )
+
+    async def test_requires_login(self):
+        for name in ("async-list", "summary", "create"):
+            response = await self.async_client.get(reverse(f"transactions:{name}"))
+            self.assertEqual(response.status_code, 302)
+
+    async def test_list_matches_sync_view(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("transactions:async-list"), {"size": 2})
+        data = response.json()
+        self.assertEqual([t["date"] for t in data["results"]], ["2024-03-03", "2024-03-02"])
+        response = await self.async_client.get(
+            reverse("transactions:async-list"), {"size": 2, "cursor": data["next"]}
+        )
+        self.assertEqual([t["date"] for t in response.json()["results"]], ["2024-03-01"])
+
+    async def test_summary(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("transactions:summary"))
+        data = response.json()
+        self.assertEqual(Decimal(data["income"]), Decimal("10"))
+        self.assertEqual(Decimal(data["expense"]), Decimal("50"))
+        self.assertEqual(data["count"], 3)
+
+        response = await self.async_client.get(
+            reverse("transactions:summary"), {"start": "2024-03-02", "end": "2024-03-02"}
+        )
+        self.assertEqual(Decimal(response.json()["expense"]), Decimal("20"))
+
+        response = await self.async_client.get(reverse("transactions:summary"), {"start": "soon"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_create(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            reverse("transactions:create"),
+            {
+                "description": "Lunch",
+                "amount": "12.50",
+                "date": "2024-03-04",
+                "payment_method": "debito",
+                "transaction_type": "expense",
+                "category": "Alimentação",
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["category"], "alimentação")
+        self.assertEqual(await Transaction.objects.filter(description="Lunch").acount(), 1)
+        summary = await Transaction.objects.asummary(self.user)
+        self.assertEqual(summary["expense"], Decimal("62.50"))
+
+    async def test_create_transfer_with_null_payment_method(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            reverse("transactions:create"),
+            {"description": "Move", "amount": 1, "date": "2024-03-04",
+             "payment_method": None, "transaction_type": "transfer"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["payment_method"], "")
+        self.assertEqual(response.json()["amount"], "1.00")
+        listed = await self.async_client.get(reverse("transactions:async-list"))
+        created = [row for row in listed.json()["results"] if row["id"] == response.json()["id"]]
+        self.assertEqual(created, [response.json()])
+
+    async def test_create_validation(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse("transactions:create")
+        response = await self.async_client.post(
+            url, {"amount": "1", "currency": "XYZ"}, content_type="application/json"
+        )
+        self.assertIn("currency", response.json()["errors"])
+        response = await self.async_client.post(
+            url,
+            {"description": "Move", "amount": "5", "date": "2024-03-04",
+             "payment_method": "pix", "transaction_type": "transfer"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post(url, "[1]", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        for field, value in [("date", 5), ("date", [1]), ("amount", True), ("category", {})]:
+            payload = {"description": "Lunch", "amount": "5", "date": "2024-03-04",
+                       "payment_method": "pix", "transaction_type": "expense", field: value}
+            response = await self.async_client.post(url, payload, content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()["errors"], {field: ["Invalid type."]})
+        self.assertEqual(await Transaction.objects.acount(), 3)
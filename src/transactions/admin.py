@@ -1,7 +1,138 @@
 from django.contrib import admin
-from .models import Currency, Category, CategoryUser, Transaction
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from .models import Currency, Category, CategoryUser, Transaction, ExchangeRate, RecurringTransaction, Budget, CategorizationRule
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the row count of unfiltered querysets from
+    PostgreSQL's planner statistics (`pg_class.reltuples`) instead of
+    running `COUNT(*)` over the whole table. Small tables, filtered
+    querysets and other databases are counted exactly.
+    """
+
+    # Below this estimate an exact count is cheap enough.
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = self.object_list
+        connection = connections[query.db]
+        if connection.vendor == "postgresql" and not query.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [query.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.threshold:
+                return row[0]
+        return super().count
+
+
+@admin.register(Transaction)
+class TransactionAdmin(admin.ModelAdmin):
+    list_display = (
+        "date",
+        "description",
+        "amount",
+        "currency_code",
+        "transaction_type",
+        "payment_method",
+        "category_name",
+        "user",
+        "is_deleted",
+    )
+    # `Transaction.__str__` (the action checkbox label) reads the category's
+    # user and name.
+    list_select_related = ("user", "currency", "category__category", "category__user")
+    # Filters on low-cardinality, indexed columns; no per-user or
+    # per-category dropdowns, which would list whole tables.
+    list_filter = ("transaction_type", "payment_method", "is_deleted", "currency")
+    date_hierarchy = "date"
+    search_fields = ("=user__email", "description")
+    ordering = ("-date", "-created_at", "-id")
+    raw_id_fields = ("user", "category")
+    readonly_fields = ("created_at", "updated_at")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    list_max_show_all = 200
+
+    def get_queryset(self, request):
+        # Includes soft-deleted transactions, which `is_deleted` filters.
+        return Transaction.all_objects.all()
+
+    def delete_queryset(self, request, queryset):
+        # Row by row, so `Transaction.delete()` keeps the rollups, budgets,
+        # category statistics and cached dashboards in sync.
+        with transaction.atomic():
+            for obj in queryset.select_related(None).iterator():
+                obj.delete()
+
+    @admin.display(description=_("Currency"), ordering="currency__code")
+    def currency_code(self, obj):
+        return obj.currency.code
+
+    @admin.display(description=_("Category"), ordering="category__category__name")
+    def category_name(self, obj):
+        return obj.category.category.name if obj.category else None
+
+
+@admin.register(CategoryUser)
+class CategoryUserAdmin(admin.ModelAdmin):
+    list_display = (
+        "category", "user", "color", "icon", "is_default",
+        "transaction_count", "total_amount", "last_used",
+    )
+    list_select_related = ("category", "user")
+    list_filter = ("is_default",)
+    search_fields = ("=user__email", "category__name")
+    raw_id_fields = ("user", "category")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ("date", "currency", "rate")
+    list_select_related = ("currency",)
+    list_filter = ("currency",)
+    date_hierarchy = "date"
+
+
+@admin.register(RecurringTransaction)
+class RecurringTransactionAdmin(admin.ModelAdmin):
+    list_display = ("description", "amount", "frequency", "interval", "next_run", "user", "is_active")
+    list_select_related = ("user",)
+    list_filter = ("frequency", "is_active")
+    search_fields = ("=user__email", "description")
+    raw_id_fields = ("user", "category")
+    readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(Budget)
+class BudgetAdmin(admin.ModelAdmin):
+    list_display = ("month", "category", "amount", "spent", "currency")
+    list_select_related = ("category__category", "category__user", "currency")
+    date_hierarchy = "month"
+    search_fields = ("=user__email", "category__category__name")
+    raw_id_fields = ("user", "category")
+
+
+@admin.register(CategorizationRule)
+class CategorizationRuleAdmin(admin.ModelAdmin):
+    list_display = ("pattern", "is_regex", "category", "min_amount", "max_amount", "payment_method", "priority", "is_active")
+    list_select_related = ("category__category", "category__user")
+    list_filter = ("is_regex", "is_active")
+    search_fields = ("=user__email", "pattern")
+    raw_id_fields = ("user", "category")
+    ordering = ("user", "priority", "pk")
+
 
 admin.site.register(Currency)
 admin.site.register(Category)
-admin.site.register(CategoryUser)
-admin.site.register(Transaction)
@@ -0,0 +1,339 @@
+"""Synthetic data and timing helpers for benchmarking the transactions app."""
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import datetime
+import statistics
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, override_settings
+from django.utils import timezone
+
+from .models import Currency, Category, CategoryUser, Transaction
+
+logger = logging.getLogger('transactions.benchmarks')
+
+BENCHMARK_EMAIL = "benchmark-{}@example.com"
+BENCHMARK_CATEGORIES = (
+    "alimentação", "transporte", "lazer", "educação",
+    "saúde", "moradia", "investimentos", "outros",
+)
+
+
+def benchmark_users(count):
+    """Returns `count` benchmark users, creating the missing ones."""
+    User = get_user_model()
+    emails = [BENCHMARK_EMAIL.format(index) for index in range(count)]
+    User.objects.bulk_create(
+        [User(email=email, password="!") for email in emails],
+        ignore_conflicts=True,
+    )
+    return list(User.objects.filter(email__in=emails).order_by("email"))
+
+
+def benchmark_categories(users):
+    """Returns {user id: [CategoryUser id, ...]} creating the missing links."""
+    categories = [Category.objects.get_or_create_by_name(name)[0] for name in BENCHMARK_CATEGORIES]
+    CategoryUser.objects.bulk_create(
+        [CategoryUser(user=user, category=category) for user in users for category in categories],
+        ignore_conflicts=True,
+    )
+    links = {user.pk: [] for user in users}
+    for pk, user_id in CategoryUser.objects.filter(user__in=users).values_list("pk", "user_id"):
+        links[user_id].append(pk)
+    return links
+
+
+class UniformSampler:
+    """
+    Draws transaction fields uniformly: every user, day, category and
+    amount between 1.00 and 5000.00 is equally likely, in BRL.
+    """
+
+    transaction_types = (
+        Transaction.TransactionType.EXPENSE,
+        Transaction.TransactionType.INCOME,
+        Transaction.TransactionType.TRANSFER,
+    )
+    transaction_type_weights = (80, 15, 5)
+    deleted_share = 0.03
+
+    def __init__(self, rng, users, categories, days):
+        self.rng = rng
+        self.users = users
+        self.categories = categories
+        self.days = days
+        self.brl = Currency.objects.get_or_create(code="BRL", defaults={"name": "Brazilian Real"})[0]
+
+    def user(self):
+        return self.rng.choice(self.users)
+
+    def transaction_type(self):
+        return self.rng.choices(self.transaction_types, weights=self.transaction_type_weights)[0]
+
+    def amount(self, transaction_type):  # pylint: disable=unused-argument
+        return Decimal(self.rng.randint(100, 500000)) / 100
+
+    def days_ago(self):
+        return self.rng.randrange(self.days)
+
+    def category(self, user):
+        return self.rng.choice(self.categories[user.pk])
+
+    def currency(self):
+        return self.brl
+
+    def is_deleted(self):
+        return self.rng.random() < self.deleted_share
+
+
+# Median amount and spread (sigma of the log) of each transaction type.
+AMOUNT_DISTRIBUTIONS = {
+    Transaction.TransactionType.EXPENSE: (60, 1.1),
+    Transaction.TransactionType.INCOME: (3000, 0.6),
+    Transaction.TransactionType.TRANSFER: (500, 1.0),
+}
+# Currency codes and the share of transactions in each.
+BENCHMARK_CURRENCIES = {"BRL": 90, "USD": 7, "EUR": 3}
+
+
+class RealisticSampler(UniformSampler):
+    """
+    Draws transaction fields from skewed distributions resembling real
+    usage: a few heavy users own most transactions, amounts are
+    log-normal per type, recent dates and popular categories are more
+    frequent, and a small share of transactions use foreign currencies.
+    """
+
+    transaction_type_weights = (85, 12, 3)
+    deleted_share = 0.02
+
+    def __init__(self, rng, users, categories, days):
+        super().__init__(rng, users, categories, days)
+        self.user_weights = list(_cumulative(rng.paretovariate(1.2) for _ in users))
+        self.currencies = [
+            Currency.objects.get_or_create(code=code, defaults={"name": code})[0]
+            for code in BENCHMARK_CURRENCIES
+        ]
+        self.currency_weights = list(_cumulative(BENCHMARK_CURRENCIES.values()))
+
+    def user(self):
+        return self.rng.choices(self.users, cum_weights=self.user_weights)[0]
+
+    def amount(self, transaction_type):
+        median, sigma = AMOUNT_DISTRIBUTIONS[transaction_type]
+        amount = self.rng.lognormvariate(math.log(median), sigma)
+        return Decimal(min(max(amount, 1), 99_999_999) * 100).quantize(Decimal(1)) / 100
+
+    def days_ago(self):
+        # Exponential decay: half of the transactions fall in the most
+        # recent fifth of the range.
+        return min(int(self.rng.expovariate(math.log(2) * 5 / self.days)), self.days - 1)
+
+    def category(self, user):
+        links = self.categories[user.pk]
+        # Zipf-like: the first categories of a user are the most used.
+        return self.rng.choices(links, weights=[1 / (rank + 1) for rank in range(len(links))])[0]
+
+    def currency(self):
+        return self.rng.choices(self.currencies, cum_weights=self.currency_weights)[0]
+
+
+SAMPLERS = {"uniform": UniformSampler, "realistic": RealisticSampler}
+
+
+def _cumulative(weights):
+    total = 0
+    for weight in weights:
+        total += weight
+        yield total
+
+
+def generate_transactions(users, rows, batch_size=10000, seed=0, days=3650, sampler=UniformSampler):
+    """
+    Inserts `rows` transactions for `users` over the last `days` days, in
+    batches of `batch_size`, through `bulk_record` so rollups and budgets
+    stay consistent. Fields are drawn by `sampler` (`UniformSampler` or
+    `RealisticSampler`). Returns the number of rows.
+    """
+    rng = random.Random(seed)
+    sampler = sampler(rng, users, benchmark_categories(users), days)
+    today = timezone.now().date()
+    methods = [value for value, _ in Transaction.PaymentMethod.choices]
+    created = 0
+    while created < rows:
+        batch = []
+        for _ in range(min(batch_size, rows - created)):
+            user = sampler.user()
+            transaction_type = sampler.transaction_type()
+            batch.append(Transaction(
+                user=user,
+                description=f"Benchmark transaction {created + len(batch)}",
+                amount=sampler.amount(transaction_type),
+                currency=sampler.currency(),
+                date=today - datetime.timedelta(days=sampler.days_ago()),
+                payment_method=(
+                    "" if transaction_type == Transaction.TransactionType.TRANSFER
+                    else rng.choice(methods)
+                ),
+                transaction_type=transaction_type,
+                category_id=sampler.category(user) if rng.random() < 0.9 else None,
+                is_deleted=sampler.is_deleted(),
+            ))
+        Transaction.objects.bulk_record(batch, batch_size=batch_size)
+        created += len(batch)
+        logger.info("Generated %d/%d benchmark transactions.", created, rows)
+    return created
+
+
+def query_shapes(user):
+    """
+    Returns {name: queryset} with the query shapes issued by
+    `TransactionManager` for a user.
+    """
+    today = timezone.now().date()
+    last_month = today - datetime.timedelta(days=30)
+    category = CategoryUser.objects.filter(user=user).first()
+    return {
+        "for_user (latest 50)": Transaction.objects.for_user(user)[:50],
+        "active_transactions (latest 50)": Transaction.objects.active_transactions(user)[:50],
+        "income (latest 50)": Transaction.objects.income(user)[:50],
+        "by_category (latest 50)": Transaction.objects.by_category(category, user)[:50],
+        "recent_transactions (30 days)": Transaction.objects.recent_transactions(30, user),
+        "summary (partial month)": (
+            Transaction.objects.filter(user=user, is_deleted=False, date__gte=last_month)
+            .order_by()
+            .values("transaction_type")
+            .annotate(total=Sum("amount"))
+        ),
+        "page (first page)": (
+            Transaction.objects.for_user(user).order_by("-date", "-created_at", "-id")[:51]
+        ),
+    }
+
+
+def explain(queryset):
+    """Returns the query plan of a queryset, executed on PostgreSQL."""
+    if connection.vendor == "postgresql":
+        return queryset.explain(analyze=True, buffers=True)
+    return queryset.explain()
+
+
+def time_queryset(queryset, repeat=5):
+    """Returns the median and minimum time in milliseconds to fetch a queryset."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(queryset.all())
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+async def benchmark_endpoint(user, url, requests=500, concurrency=16):
+    """
+    Sends `requests` GET requests to `url`, logged in as `user`, from
+    `concurrency` concurrent clients through the ASGI handler. Returns
+    the throughput in requests per second and the p50 and p99 latencies
+    in milliseconds.
+    """
+    login = AsyncClient()
+    await login.aforce_login(user)
+    timings = []
+
+    async def client(count):
+        session = AsyncClient()
+        session.cookies = login.cookies
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await session.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}.")
+
+    per_client, extra = divmod(requests, concurrency)
+    # The test client sends requests to the "testserver" host.
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client(per_client + (index < extra)) for index in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return requests / elapsed, p50, p99
+
+
+def manager_calls(user):
+    """
+    Returns {name: callable} running every `TransactionManager` read
+    method for a user, with querysets fully evaluated.
+    """
+    manager = Transaction.objects
+    today = timezone.now().date()
+    start = today.replace(day=1) - datetime.timedelta(days=365)
+    category = CategoryUser.objects.filter(user=user).first()
+    month_end = today.replace(day=1) - datetime.timedelta(days=1)
+    _, cursor = manager.page(user)
+    return {
+        "for_user": lambda: list(manager.for_user(user)[:50]),
+        "income": lambda: list(manager.income(user)[:50]),
+        "expense": lambda: list(manager.expense(user)[:50]),
+        "transfer": lambda: list(manager.transfer(user)[:50]),
+        "by_payment_method": lambda: list(manager.by_payment_method("pix", user)[:50]),
+        "by_category": lambda: list(manager.by_category(category, user)[:50]),
+        "between": lambda: list(manager.for_user(user).between(start, today)[:50]),
+        "recent_transactions": lambda: list(manager.recent_transactions(30, user)),
+        "active_transactions": lambda: list(manager.active_transactions(user)[:50]),
+        "deleted_transactions": lambda: list(manager.deleted_transactions(user)[:50]),
+        "totals": lambda: manager.for_user(user).between(start, today).totals(),
+        "page (first)": lambda: manager.page(user),
+        "page (second)": lambda: manager.page(user, cursor),
+        "summary": lambda: manager.summary(user),
+        "summary (whole months)": lambda: manager.summary(user, start, month_end),
+        "summary (partial range)": lambda: manager.summary(user, start.replace(day=10), today),
+        "summary_in": lambda: manager.summary_in("USD", user, start, today),
+        "bucketed": lambda: list(manager.for_user(user).bucketed("month", "category")),
+        "total_amount": lambda: manager.total_amount(user),
+        "net_balance": lambda: manager.net_balance(user),
+    }
+
+
+def time_call(function, repeat=5):
+    """Returns the median and minimum time in milliseconds of calling `function`."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def load_baseline(path):
+    """Returns {name: median milliseconds} stored by `save_baseline`."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["medians"]
+
+
+def save_baseline(path, medians):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"vendor": connection.vendor, "medians": medians}, file, indent=2, sort_keys=True)
+
+
+def regressions(medians, baseline, tolerance=0.2, floor=1.0):
+    """
+    Returns {name: (baseline, current)} for the calls whose median grew
+    by more than `tolerance` (a fraction) and `floor` milliseconds.
+    """
+    return {
+        name: (baseline[name], median)
+        for name, median in medians.items()
+        if name in baseline and median > baseline[name] * (1 + tolerance) + floor
+    }
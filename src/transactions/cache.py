@@ -0,0 +1,229 @@
+"""
+Read-through caches for small, nearly static reference tables.
+
+Each `ReferenceCache` has two tiers: a process-local dictionary in front of
+Django's cache framework. Invalidation bumps a version stored in the shared
+cache, so every process stops using the old entries once its local entries
+expire (`REFERENCE_CACHE_LOCAL_TIMEOUT` seconds). Cached model instances
+are shared between callers and must be treated as read-only.
+
+The per-user dashboard fragments (`pages/home.html`) are versioned the same
+way, through `dashboard_version` and `invalidate_dashboard`, and the
+spending reports by the version of each (user, month) they cover, through
+`report_versions` and `invalidate_reports`. Compiled categorization rules
+are kept per process in `matcher_cache`, keyed by `rules_version`.
+
+All of these versions live in Django's default cache. With a process-local
+backend (locmem) a bump only reaches the process that made it, so the
+settings cap the timeouts of the versioned entries and the
+`transactions.W001` deploy check asks for a shared backend.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger('transactions.cache')
+
+_MISSING = object()
+
+
+class ReferenceCache:
+
+    def __init__(self, prefix, timeout=None, local_timeout=None):
+        self.prefix = prefix
+        self.timeout = timeout or getattr(settings, "REFERENCE_CACHE_TIMEOUT", 3600)
+        self.local_timeout = (
+            local_timeout if local_timeout is not None
+            else getattr(settings, "REFERENCE_CACHE_LOCAL_TIMEOUT", 60)
+        )
+        self._local = {}
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    @property
+    def _version_key(self):
+        return f"{self.prefix}:version"
+
+    def _count(self, counter):
+        with self._lock:
+            self.stats[counter] += 1
+
+    def get(self, key, loader):
+        """
+        Returns the value cached under `key`, calling `loader()` to compute
+        and store it on a miss. None is a valid, cached value.
+        """
+        entry = self._local.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._count("local_hits")
+            return entry[0]
+
+        version = cache.get_or_set(self._version_key, 1, timeout=None)
+        value = cache.get(f"{self.prefix}:{key}", _MISSING, version=version)
+        if value is _MISSING:
+            self._count("misses")
+            value = loader()
+            cache.set(f"{self.prefix}:{key}", value, self.timeout, version=version)
+        else:
+            self._count("shared_hits")
+        self._local[key] = (value, time.monotonic() + self.local_timeout)
+        return value
+
+    def invalidate(self):
+        """
+        Drops every entry, now and again once the current database
+        transaction commits, so concurrent readers can't cache stale rows.
+        """
+        self._invalidate()
+        transaction.on_commit(self._invalidate)
+
+    def _invalidate(self):
+        self._local.clear()
+        try:
+            cache.incr(self._version_key)
+        except ValueError:
+            cache.set(self._version_key, 1, timeout=None)
+        logger.debug("Invalidated the %s reference cache.", self.prefix)
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        self._invalidate()
+        with self._lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+
+
+class LRUCache:
+    """
+    Process-local cache keeping the `maxsize` most recently used entries,
+    each for at most `timeout` seconds.
+    """
+
+    def __init__(self, maxsize=1024, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = (
+            timeout if timeout is not None
+            else getattr(settings, "REFERENCE_CACHE_LOCAL_TIMEOUT", 60)
+        )
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key, loader):
+        """
+        Returns the value cached under `key`, calling `loader()` to compute
+        and store it on a miss. None is a valid, cached value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[0]
+            self.stats["misses"] += 1
+        value = loader()
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+
+
+currency_cache = ReferenceCache("currencies")
+category_cache = ReferenceCache("categories")
+rate_cache = LRUCache(maxsize=4096)
+matcher_cache = LRUCache(maxsize=1024, timeout=getattr(settings, "MATCHER_CACHE_TIMEOUT", 3600))
+
+
+DASHBOARD_VERSION_KEY = "dashboard:{}:version"
+
+
+def dashboard_version(user_id):
+    """
+    Returns the current version of a user's dashboard fragments. Use it as
+    a `{% cache %}` vary-on argument so a bump orphans the old fragments.
+    """
+    return cache.get_or_set(DASHBOARD_VERSION_KEY.format(user_id), time.time_ns, timeout=None)
+
+
+def invalidate_dashboard(*user_ids):
+    """
+    Orphans the cached dashboard fragments of the given users, now and
+    again once the current database transaction commits.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many(
+            {DASHBOARD_VERSION_KEY.format(user_id): version for user_id in user_ids},
+            timeout=None,
+        )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+REPORT_VERSION_KEY = "report:{}:{:%Y-%m}:version"
+
+
+def report_versions(user_id, months):
+    """Returns the current versions of a user's reports for the given months."""
+    keys = [REPORT_VERSION_KEY.format(user_id, month) for month in months]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_reports(*user_months):
+    """
+    Orphans the cached reports covering the given (user id, month) pairs,
+    now and again once the current database transaction commits.
+    """
+    keys = {REPORT_VERSION_KEY.format(user_id, month) for user_id, month in user_months}
+    if not keys:
+        return
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many(dict.fromkeys(keys, version), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+RULES_VERSION_KEY = "rules:{}:version"
+
+
+def rules_version(user_id):
+    """Returns the current version of a user's categorization rules."""
+    return cache.get_or_set(RULES_VERSION_KEY.format(user_id), time.time_ns, timeout=None)
+
+
+def invalidate_rules(user_id):
+    """
+    Makes every process recompile a user's categorization rules, now and
+    again once the current database transaction commits.
+    """
+
+    def bump():
+        cache.set(RULES_VERSION_KEY.format(user_id), time.time_ns(), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
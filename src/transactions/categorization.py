@@ -0,0 +1,92 @@
+"""
+Rule-based categorization of transactions.
+
+A user's active `CategorizationRule`s are compiled into a single regular
+expression: an alternation of lookaheads, one per rule, tried in priority
+order, so one `match()` call at the start of a description finds the
+highest-priority rule whose pattern occurs in it. Compiled matchers are
+cached per process and recompiled only when the user's rules change
+(`cache.rules_version`).
+"""
+import re
+import logging
+
+from .cache import matcher_cache, rules_version
+from .models import CategorizationRule
+
+logger = logging.getLogger('transactions.categorization')
+
+
+class RuleMatcher:
+
+    def __init__(self, rules):
+        self.rules = []
+        # Used when the first matching rule rejects the amount or payment
+        # method, and for every rule when the combined regex can't compile.
+        self._patterns = []
+        for rule in rules:
+            try:
+                self._patterns.append(re.compile(rule.expression, re.IGNORECASE))
+            except re.error as error:
+                logger.warning("Skipping invalid categorization rule %s: %s", rule.pk, error)
+                continue
+            self.rules.append(rule)
+        self.regex = None
+        if self.rules:
+            try:
+                self.regex = re.compile(
+                    "|".join(
+                        f"(?P<_rule{index}>(?=.*?(?:{rule.expression})))"
+                        for index, rule in enumerate(self.rules)
+                    ),
+                    re.IGNORECASE | re.DOTALL,
+                )
+            except re.error as error:
+                # Groups or backreferences saved before `clean()` rejected
+                # them; match rule by rule instead.
+                logger.warning("Matching categorization rules one by one: %s", error)
+
+    def classify(self, description, amount, payment_method=""):
+        """Returns the category id of the first matching rule, or None."""
+        index = 0
+        if self.regex is not None:
+            match = self.regex.match(description)
+            if match is None:
+                return None
+            index = int(match.lastgroup[len("_rule"):])
+        for position, (rule, pattern) in enumerate(zip(self.rules, self._patterns)):
+            if position < index or not rule.matches(amount, payment_method):
+                continue
+            if (self.regex is not None and position == index) or pattern.search(description):
+                return rule.category_id
+        return None
+
+    def categorize(self, transactions):
+        """
+        Sets the category of the uncategorized transactions in one pass.
+        Returns the number of transactions categorized.
+        """
+        categorized = 0
+        for transaction in transactions:
+            if transaction.category_id is not None:
+                continue
+            category_id = self.classify(
+                transaction.description, transaction.amount, transaction.payment_method
+            )
+            if category_id is not None:
+                transaction.category_id = category_id
+                categorized += 1
+        return categorized
+
+
+def _compile(user_id):
+    rules = CategorizationRule.objects.filter(user_id=user_id, is_active=True).order_by("priority", "pk")
+    matcher = RuleMatcher(rules)
+    logger.debug("Compiled %d categorization rules of user %s.", len(matcher.rules), user_id)
+    return matcher
+
+
+def matcher_for(user):
+    """Returns the compiled rule matcher of a user, compiling it if the rules changed."""
+    user_id = getattr(user, "pk", user)
+    return matcher_cache.get((user_id, rules_version(user_id)), lambda: _compile(user_id))
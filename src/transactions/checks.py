@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register  # pylint: disable=redefined-builtin
+
+PROCESS_LOCAL_CACHES = {"django.core.cache.backends.locmem.LocMemCache"}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):  # pylint: disable=unused-argument
+    """
+    Warns when several workers share a process-local default cache: the
+    versions that invalidate dashboards, reports, compiled rules and
+    reference data would only be bumped in the worker that wrote.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PROCESS_LOCAL_CACHES or getattr(settings, "GUNICORN_WORKERS", 1) <= 1:
+        return []
+    return [
+        Warning(
+            f"The default cache ({backend}) is local to each of the "
+            f"{settings.GUNICORN_WORKERS} workers, so cache invalidations "
+            "don't reach the other workers.",
+            hint="Set CACHE_URL to a shared backend (filecache://, dbcache:// or redis://).",
+            id="transactions.W001",
+        )
+    ]
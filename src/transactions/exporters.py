@@ -0,0 +1,102 @@
+"""
+Streaming export of a user's transactions (CSV and JSON).
+
+Transactions are read with `QuerySet.iterator()` (or `aiterator()`) in
+chunks and written out as they are produced, so memory use doesn't grow
+with the size of the history. CSV exports use the columns read by
+`importers.parse_csv`, so they can be imported back.
+"""
+import csv
+import json
+
+from .importers import CSV_COLUMNS
+from .models import Transaction
+from .serializers import transaction_to_dict
+
+
+class _Echo:
+    """File-like object whose `write` returns the value, for `csv.writer`."""
+
+    def write(self, value):
+        return value
+
+
+class CSVExporter:
+    content_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self):
+        self.writer = csv.writer(_Echo())
+
+    def header(self):
+        return self.writer.writerow(CSV_COLUMNS)
+
+    def row(self, transaction, index):
+        data = transaction_to_dict(transaction)
+        return self.writer.writerow([data[column] or "" for column in CSV_COLUMNS])
+
+    def footer(self):
+        return ""
+
+
+class JSONExporter:
+    content_type = "application/json"
+    extension = "json"
+
+    def header(self):
+        return "[\n"
+
+    def row(self, transaction, index):
+        separator = ",\n" if index else ""
+        return separator + json.dumps(transaction_to_dict(transaction), ensure_ascii=False)
+
+    def footer(self):
+        return "\n]\n"
+
+
+EXPORTERS = {
+    "csv": CSVExporter,
+    "json": JSONExporter,
+}
+
+
+def export_queryset(user, start=None, end=None):
+    """Returns a user's transactions to export, oldest first."""
+    return (
+        Transaction.objects.for_user(user)
+        .between(start, end)
+        .select_related('currency', 'category__category')
+        .order_by('date', 'created_at', 'id')
+    )
+
+
+def export(exporter, queryset, chunk_size=2000):
+    """
+    Yields the export of `queryset` as strings of up to `chunk_size`
+    rows, reading the rows `chunk_size` at a time.
+    """
+    yield exporter.header()
+    lines = []
+    for index, transaction in enumerate(queryset.iterator(chunk_size=chunk_size)):
+        lines.append(exporter.row(transaction, index))
+        if len(lines) == chunk_size:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines) + exporter.footer()
+
+
+async def aexport(exporter, queryset, chunk_size=2000):
+    """
+    Asynchronous version of `export()`. ASGI servers need it to stream:
+    Django buffers synchronous iterators of streaming responses.
+    """
+    yield exporter.header()
+    lines = []
+    index = 0
+    async for transaction in queryset.aiterator(chunk_size=chunk_size):
+        lines.append(exporter.row(transaction, index))
+        index += 1
+        if len(lines) == chunk_size:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines) + exporter.footer()
@@ -0,0 +1,197 @@
+"""Streaming import of bank statements (CSV and OFX) into transactions."""
+import re
+import csv
+import logging
+from decimal import Decimal, InvalidOperation
+from itertools import batched
+
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+from .categorization import matcher_for
+from .models import Currency, CategoryUser, Transaction
+from .ownership import category_ownership_cache
+
+logger = logging.getLogger('transactions.importers')
+
+CSV_COLUMNS = (
+    "date", "description", "amount", "currency",
+    "payment_method", "transaction_type", "category",
+)
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def parse_csv(stream):
+    """
+    Yields (line number, row) pairs from a CSV file with a header line.
+    See `CSV_COLUMNS` for the recognized columns; only `date`,
+    `description` and `amount` are required.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        row = {
+            key.strip().lower(): (value or "").strip()
+            for key, value in row.items() if key
+        }
+        yield reader.line_num, row
+
+
+def _ofx_tokens(stream, chunk_size=64 * 1024):
+    """Yields (closing, tag, value) tokens from an OFX (SGML or XML) stream."""
+    buffer = ""
+    for chunk in iter(lambda: stream.read(chunk_size), ""):
+        buffer += chunk
+        cut = buffer.rfind("<")
+        if cut <= 0:
+            continue
+        complete, buffer = buffer[:cut], buffer[cut:]
+        yield from _OFX_TAG.findall(complete)
+    yield from _OFX_TAG.findall(buffer)
+
+
+def parse_ofx(stream):
+    """
+    Yields (statement entry number, row) pairs from an OFX file.
+    Amounts keep their sign, which defines the transaction type.
+    """
+    currency = ""
+    record = None
+    position = 0
+    for closing, tag, value in _ofx_tokens(stream):
+        tag, value = tag.upper(), value.strip()
+        if tag == "STMTTRN":
+            if closing and record is not None:
+                yield position, record
+                record = None
+            elif not closing:
+                position += 1
+                record = {"currency": currency}
+        elif tag == "CURDEF" and not closing:
+            currency = value
+        elif record is not None and not closing:
+            if tag == "DTPOSTED":
+                record["date"] = f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+            elif tag == "TRNAMT":
+                record["amount"] = value
+            elif tag == "MEMO" or (tag == "NAME" and not record.get("description")):
+                record["description"] = value
+
+
+PARSERS = {
+    "csv": parse_csv,
+    "ofx": parse_ofx,
+}
+
+
+class TransactionImporter:
+    """
+    Validates and inserts parsed rows for a user in chunks of `batch_size`.
+
+    The user's categories, categorization rules and the active currencies
+    are loaded once, so validating a row never touches the database. Rows
+    without a category are categorized by the user's rules. Rows that fail
+    validation are collected in `rejected` as (position, row, error).
+    """
+
+    def __init__(
+        self, user, batch_size=1000, currency="BRL",
+        payment_method=Transaction.PaymentMethod.DEBITO
+    ):
+        self.user = user
+        self.batch_size = batch_size
+        self.default_currency = currency
+        self.default_payment_method = payment_method
+        self.categories = {
+            category_user.category.name: category_user
+            for category_user in CategoryUser.objects.filter(
+                user=user
+            ).select_related("category")
+        }
+        self.categories_by_id = {
+            category_user.pk: category_user for category_user in self.categories.values()
+        }
+        self.matcher = matcher_for(user)
+        self.currencies = {
+            currency.code: currency for currency in Currency.objects.filter(is_active=True)
+        }
+        self.imported = 0
+        self.rejected = []
+
+    def build(self, row):
+        """Returns an unsaved, validated transaction for a parsed row."""
+        amount = (row.get("amount") or "").replace(" ", "")
+        if "," in amount and "." not in amount:
+            amount = amount.replace(",", ".")
+        try:
+            amount = Decimal(amount)
+        except InvalidOperation as error:
+            raise ValidationError(_("Invalid amount: %s") % row.get("amount")) from error
+        if not amount.is_finite():
+            raise ValidationError(_("Invalid amount: %s") % row.get("amount"))
+
+        transaction_type = (row.get("transaction_type") or "").lower()
+        if not transaction_type:
+            transaction_type = (
+                Transaction.TransactionType.EXPENSE if amount < 0
+                else Transaction.TransactionType.INCOME
+            )
+        payment_method = (row.get("payment_method") or "").lower()
+        if not payment_method and transaction_type != Transaction.TransactionType.TRANSFER:
+            payment_method = self.default_payment_method
+
+        code = (row.get("currency") or self.default_currency).upper()
+        currency = self.currencies.get(code)
+        if currency is None:
+            raise ValidationError(_("Unknown currency: %s") % code)
+
+        category = None
+        name = (row.get("category") or "").strip().lower()
+        if name:
+            category = self.categories.get(name)
+            if category is None:
+                raise ValidationError(_("Unknown category: %s") % name)
+        else:
+            category = self.categories_by_id.get(
+                self.matcher.classify(row.get("description", ""), abs(amount), payment_method)
+            )
+
+        transaction = Transaction(
+            user=self.user,
+            description=row.get("description", ""),
+            amount=abs(amount),
+            currency=currency,
+            date=row.get("date", ""),
+            payment_method=payment_method,
+            transaction_type=transaction_type,
+            category=category,
+        )
+        # Related objects come from the prefetched maps; transfers have no
+        # payment method, which `clean()` validates instead.
+        exclude = ["user", "currency", "category"]
+        if not payment_method:
+            exclude.append("payment_method")
+        transaction.clean_fields(exclude=exclude)
+        transaction.clean()
+        return transaction
+
+    def run(self, rows):
+        """
+        Imports (position, row) pairs as produced by the parsers.
+        Returns the number of imported transactions.
+        """
+        for chunk in batched(rows, self.batch_size):
+            transactions = []
+            with category_ownership_cache(self.categories.values()):
+                for position, row in chunk:
+                    try:
+                        transactions.append(self.build(row))
+                    except ValidationError as error:
+                        self.rejected.append((position, row, "; ".join(error.messages)))
+            Transaction.objects.bulk_record(transactions, batch_size=self.batch_size)
+            self.imported += len(transactions)
+            logger.info(
+                "Imported %d transactions for %s (%d rejected).",
+                self.imported, self.user, len(self.rejected)
+            )
+        return self.imported
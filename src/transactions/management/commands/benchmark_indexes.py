@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from transactions.benchmarks import (
+    SAMPLERS, benchmark_users, generate_transactions, query_shapes, explain, time_queryset
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a synthetic transactions dataset and prints the query plan "
+        "and timings of each TransactionManager query shape"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=5_000_000, help="Number of transactions to generate"
+        )
+        parser.add_argument(
+            "--users", type=int, default=1000, help="Number of users sharing the transactions"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="Number of rows inserted per query"
+        )
+        parser.add_argument(
+            "--sampler", choices=SAMPLERS, default="uniform",
+            help="Distribution of the generated users, amounts, dates, categories and currencies"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Number of timed runs of each query"
+        )
+        parser.add_argument(
+            "--skip-generate", action="store_true",
+            help="Reuse the benchmark data generated by a previous run"
+        )
+
+    def handle(self, *args, **options):
+        users = benchmark_users(options["users"])
+        if not options["skip_generate"]:
+            self.stdout.write(f"Generating {options['rows']} transactions...")
+            generate_transactions(
+                users, options["rows"], batch_size=options["batch_size"],
+                sampler=SAMPLERS[options["sampler"]],
+            )
+
+        for name, queryset in query_shapes(users[0]).items():
+            median, fastest = time_queryset(queryset, repeat=options["repeat"])
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(explain(queryset))
+            self.stdout.write(
+                self.style.SUCCESS(f"median {median:.2f} ms, min {fastest:.2f} ms\n")
+            )
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.contrib.auth import get_user_model
+from transactions.benchmarks import (
+    BENCHMARK_EMAIL, manager_calls, time_call, load_baseline, save_baseline, regressions
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times every TransactionManager read method for the busiest benchmark user "
+        "and reports regressions against a baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Number of timed runs of each method"
+        )
+        parser.add_argument(
+            "--baseline", help="JSON file of a previous run to compare against"
+        )
+        parser.add_argument(
+            "--save", help="Write the medians of this run to this JSON file"
+        )
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Allowed slowdown over the baseline, as a fraction (0.2 = 20%%)"
+        )
+
+    def handle(self, *args, **options):
+        user = (
+            get_user_model().objects
+            .filter(email__startswith=BENCHMARK_EMAIL.split("{")[0])
+            .annotate(transaction_count=Count("user_transactions"))
+            .order_by("-transaction_count")
+            .first()
+        )
+        if user is None:
+            raise CommandError("No benchmark data; run generate_load first")
+        self.stdout.write(f"Benchmarking {user} ({user.transaction_count} transactions)")
+
+        baseline = load_baseline(options["baseline"]) if options["baseline"] else {}
+        medians = {}
+        for name, call in manager_calls(user).items():
+            call()  # warm-up
+            medians[name], fastest = time_call(call, options["repeat"])
+            line = f"{name:<24} median {medians[name]:9.2f} ms  min {fastest:9.2f} ms"
+            if name in baseline:
+                line += f"  baseline {baseline[name]:9.2f} ms"
+            self.stdout.write(line)
+
+        if options["save"]:
+            save_baseline(options["save"], medians)
+            self.stdout.write(f"Saved the medians to {options['save']}")
+        slower = regressions(medians, baseline, options["tolerance"])
+        for name, (before, after) in slower.items():
+            self.stdout.write(self.style.ERROR(
+                f"Regression: {name} took {after:.2f} ms, {before:.2f} ms in the baseline"
+            ))
+        if slower:
+            raise CommandError(f"{len(slower)} methods regressed")
+        if baseline:
+            self.stdout.write(self.style.SUCCESS("No regressions"))
@@ -0,0 +1,47 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from transactions.benchmarks import benchmark_users, generate_transactions, benchmark_endpoint
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of the sync and async transaction endpoints "
+        "under concurrent clients"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Number of requests per endpoint and level"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, nargs="+", default=[1, 8, 32],
+            help="Numbers of concurrent clients to measure"
+        )
+        parser.add_argument(
+            "--rows", type=int, default=1000,
+            help="Number of transactions generated for the benchmark user if it has none"
+        )
+
+    def handle(self, *args, **options):
+        user = benchmark_users(1)[0]
+        if not Transaction.objects.for_user(user).exists():
+            self.stdout.write(f"Generating {options['rows']} transactions...")
+            generate_transactions([user], options["rows"], days=365)
+
+        endpoints = {
+            "list (sync)": reverse("transactions:list"),
+            "list (async)": reverse("transactions:async-list"),
+            "summary (async)": reverse("transactions:summary"),
+        }
+        for concurrency in options["concurrency"]:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{concurrency} concurrent clients"))
+            for name, url in endpoints.items():
+                throughput, p50, p99 = asyncio.run(
+                    benchmark_endpoint(user, url, options["requests"], concurrency)
+                )
+                self.stdout.write(
+                    f"{name:<16} {throughput:8.1f} req/s  p50 {p50:7.2f} ms  p99 {p99:7.2f} ms"
+                )
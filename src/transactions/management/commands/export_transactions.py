@@ -0,0 +1,42 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from transactions.exporters import EXPORTERS, export_queryset, export
+
+
+class Command(BaseCommand):
+    help = "Streams a user's transactions to a CSV or JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Email of the owner of the transactions")
+        parser.add_argument(
+            "--format", choices=sorted(EXPORTERS), default="csv", help="Export format"
+        )
+        parser.add_argument("--output", help="Path of the export file (stdout by default)")
+        parser.add_argument(
+            "--start", type=datetime.date.fromisoformat, help="First date to export (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--end", type=datetime.date.fromisoformat, help="Last date to export (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000,
+            help="Number of rows fetched from the database at a time"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist as error:
+            raise CommandError(f"User {options['user']} does not exist") from error
+
+        queryset = export_queryset(user, options["start"], options["end"])
+        exporter = EXPORTERS[options["format"]]()
+        parts = export(exporter, queryset, options["chunk_size"])
+        if not options["output"]:
+            for part in parts:
+                self.stdout.write(part, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            output.writelines(parts)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from transactions.benchmarks import RealisticSampler, benchmark_users, generate_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-creates benchmark users and transactions with realistic distributions "
+        "of users, amounts, dates, categories and currencies"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=1_000_000, help="Number of transactions to generate"
+        )
+        parser.add_argument(
+            "--users", type=int, default=1000, help="Number of users sharing the transactions"
+        )
+        parser.add_argument(
+            "--days", type=int, default=3650, help="Number of past days the dates are spread over"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="Number of rows inserted per query"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the random generator"
+        )
+
+    def handle(self, *args, **options):
+        users = benchmark_users(options["users"])
+        created = generate_transactions(
+            users, options["rows"], batch_size=options["batch_size"],
+            seed=options["seed"], days=options["days"], sampler=RealisticSampler,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {created} transactions for {len(users)} users"
+        ))
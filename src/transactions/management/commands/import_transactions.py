@@ -0,0 +1,61 @@
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from transactions.importers import PARSERS, TransactionImporter
+
+
+class Command(BaseCommand):
+    help = "Imports transactions for a user from a CSV or OFX bank statement"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the statement file")
+        parser.add_argument("--user", required=True, help="Email of the owner of the transactions")
+        parser.add_argument(
+            "--format", choices=sorted(PARSERS),
+            help="Statement format (guessed from the file extension by default)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of rows validated and inserted at a time"
+        )
+        parser.add_argument(
+            "--currency", default="BRL", help="Currency code for rows that don't define one"
+        )
+        parser.add_argument(
+            "--payment-method", default="debito",
+            help="Payment method for income and expense rows that don't define one"
+        )
+        parser.add_argument("--encoding", default="utf-8-sig", help="Statement file encoding")
+        parser.add_argument("--rejects", help="Path of a CSV report of the rejected rows")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in PARSERS:
+            raise CommandError(f"Unknown statement format '{file_format}'")
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist as error:
+            raise CommandError(f"User {options['user']} does not exist") from error
+
+        importer = TransactionImporter(
+            user,
+            batch_size=options["batch_size"],
+            currency=options["currency"],
+            payment_method=options["payment_method"],
+        )
+        with path.open(encoding=options["encoding"], newline="") as stream:
+            importer.run(PARSERS[file_format](stream))
+
+        if importer.rejected and options["rejects"]:
+            with open(options["rejects"], "w", encoding="utf-8", newline="") as report:
+                writer = csv.writer(report)
+                writer.writerow(["position", "error", "row"])
+                for position, row, error in importer.rejected:
+                    writer.writerow([position, error, row])
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {importer.imported} transactions"))
+        if importer.rejected:
+            self.stdout.write(self.style.WARNING(f"Rejected {len(importer.rejected)} rows"))
@@ -0,0 +1,48 @@
+import csv
+import datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from transactions.models import ExchangeRate
+
+
+class Command(BaseCommand):
+    help = (
+        "Loads exchange rates from a CSV file with `date`, `currency` and `rate` "
+        "columns, the rate being the value of one unit of the currency in the "
+        "base currency (EXCHANGE_BASE_CURRENCY)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the CSV file")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Number of rates written per query"
+        )
+        parser.add_argument("--encoding", default="utf-8-sig", help="File encoding")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"File {path} does not exist")
+        with path.open(encoding=options["encoding"], newline="") as stream:
+            reader = csv.DictReader(stream)
+            try:
+                stored = ExchangeRate.objects.load(self.parse(reader), batch_size=options["batch_size"])
+            except ValueError as error:
+                raise CommandError(f"{error} Line {reader.line_num}; no rates were stored") from error
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stored} exchange rates to {settings.EXCHANGE_BASE_CURRENCY}"
+        ))
+
+    def parse(self, reader):
+        for row in reader:
+            try:
+                yield (
+                    row["currency"].strip().upper(),
+                    datetime.date.fromisoformat(row["date"].strip()),
+                    Decimal(row["rate"].strip().replace(",", ".")),
+                )
+            except (KeyError, AttributeError, ValueError, InvalidOperation) as error:
+                raise CommandError(f"Invalid row at line {reader.line_num}: {row}") from error
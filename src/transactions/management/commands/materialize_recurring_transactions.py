@@ -0,0 +1,24 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from transactions.models import RecurringTransaction
+
+
+class Command(BaseCommand):
+    help = "Creates the transactions of every due recurring transaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date", type=datetime.date.fromisoformat,
+            help="Materialize occurrences up to this date (YYYY-MM-DD), today by default"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Number of recurring transactions claimed per database transaction"
+        )
+
+    def handle(self, *args, **options):
+        created = RecurringTransaction.objects.materialize(
+            options["date"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Created {created} transactions"))
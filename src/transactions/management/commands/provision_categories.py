@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from transactions.provisioning import default_categories, provision_categories
+
+
+class Command(BaseCommand):
+    help = "Links the default categories to existing users, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Number of users provisioned per query"
+        )
+        parser.add_argument(
+            "--verified-only", action="store_true",
+            help="Only provision users who confirmed their email address"
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(is_active=True).order_by("pk")
+        if options["verified_only"]:
+            users = users.filter(is_verified=True)
+        categories = default_categories()
+        provisioned = 0
+        last_pk = None
+        while True:
+            batch = users.filter(pk__gt=last_pk) if last_pk is not None else users
+            batch = list(batch.only("pk")[:options["batch_size"]])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            provision_categories(batch, categories)
+            provisioned += len(batch)
+            self.stdout.write(f"Provisioned {provisioned} users...")
+        self.stdout.write(self.style.SUCCESS(f"Provisioned {provisioned} users"))
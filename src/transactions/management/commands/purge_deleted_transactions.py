@@ -0,0 +1,38 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = "Hard-deletes transactions soft-deleted more than a given number of days ago"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=90,
+            help="Purge transactions deleted (last updated) more than this many days ago"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Number of rows deleted per query"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count the transactions to purge"
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options["days"])
+        expired = Transaction.all_objects.filter(is_deleted=True, updated_at__lt=cutoff)
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} transactions would be purged")
+            return
+
+        purged = 0
+        while True:
+            batch = list(expired.order_by().values_list("pk", flat=True)[:options["batch_size"]])
+            if not batch:
+                break
+            Transaction.all_objects.filter(pk__in=batch).delete()
+            purged += len(batch)
+            self.stdout.write(f"Purged {purged} transactions...")
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} transactions"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from transactions.models import MonthlyRollup, Budget
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the monthly transaction rollups from scratch and refreshes the budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", help="Email of a single user whose rollups should be rebuilt"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of rollup rows inserted per query"
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(email=options["user"])
+            except get_user_model().DoesNotExist as error:
+                raise CommandError(f"User {options['user']} does not exist") from error
+        created = MonthlyRollup.objects.rebuild(user, batch_size=options["batch_size"])
+        budgets = Budget.objects.rebuild(user)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {created} rollup rows and refreshed {budgets} budgets"
+        ))
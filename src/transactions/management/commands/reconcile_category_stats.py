@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from transactions.models import CategoryUser
+
+
+class Command(BaseCommand):
+    help = "Recomputes the usage statistics of user categories and repairs drifted ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", help="Email of a single user whose categories should be reconciled"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Number of categories checked per batch"
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(email=options["user"])
+            except get_user_model().DoesNotExist as error:
+                raise CommandError(f"User {options['user']} does not exist") from error
+        repaired = CategoryUser.objects.reconcile(user, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} categories"))
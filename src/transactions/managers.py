@@ -1,39 +1,108 @@
+import json
+import uuid
+import base64
+import functools
 import logging
-from django.db import models
+import datetime
+from decimal import Decimal, InvalidOperation
+from django.db import IntegrityError, connections, models, transaction
 from django.utils import timezone
-from django.db.models import Sum
+from django.conf import settings
+from django.db.models import (
+    Case, Count, DateField, DecimalField, F, Max, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Trunc, TruncMonth
 from django.core.exceptions import ObjectDoesNotExist
 
 from django.apps import apps
 
+from .cache import currency_cache, category_cache, rate_cache, invalidate_dashboard, invalidate_reports
+
 
 logger = logging.getLogger('transactions.managers')
 
+# Text search configuration of the `search_vector` column created by
+# migration 0008 on PostgreSQL.
+SEARCH_CONFIG = 'portuguese'
+
 
 class CurrencyManager(models.Manager):
     def get_by_code(self, code):
-        """Get a currency by its code."""
+        """Get a currency by its code (cached)."""
+        return currency_cache.get(f"code:{code}", lambda: self._get_by_code(code))
+
+    def _get_by_code(self, code):
         try:
             return self.get(code=code)
         except ObjectDoesNotExist:
             logger.warning("Currency with code %s does not exist.", code)
             return None
 
+    def get_cached(self, pk):
+        """Get a currency by its primary key (cached), or None if it doesn't exist."""
+        return currency_cache.get(f"pk:{pk}", lambda: self.filter(pk=pk).first())
+
     def get_all_codes(self):
-        """Get all available currency codes."""
-        return self.values_list('code', flat=True)
+        """Get all available currency codes (cached)."""
+        return currency_cache.get("codes", lambda: list(self.values_list('code', flat=True)))
 
     def get_active_currencies(self):
         """Get all active currencies."""
         return self.filter(is_active=True)
 
+
+def _to_date(value):
+    """Coerces ISO strings and datetimes to dates, keeping None."""
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def _covers_whole_months(start, end):
+    """Tells if the inclusive range [start, end] is made of whole months."""
+    starts_on_month = start is None or start.day == 1
+    ends_on_month = end is None or (end + datetime.timedelta(days=1)).day == 1
+    return starts_on_month and ends_on_month
+
+
+def encode_cursor(transaction):
+    """Returns an opaque cursor pointing right after `transaction`."""
+    position = [
+        transaction.date.isoformat(),
+        transaction.created_at.isoformat(),
+        str(transaction.pk),
+    ]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns the (date, created_at, id) of a cursor, raising ValueError if invalid."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            datetime.date.fromisoformat(date),
+            datetime.datetime.fromisoformat(created_at),
+            uuid.UUID(pk),
+        )
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid cursor: {cursor}") from error
+
+
 class CategoryManager(models.Manager):
     def get_by_name(self, name):
         """
-        Retorna uma categoria pelo nome (case-insensitive).
+        Retorna uma categoria pelo nome (case-insensitive), usando o cache.
         """
+        name = name.strip().lower()
+        return category_cache.get(f"name:{name}", lambda: self._get_by_name(name))
+
+    def _get_by_name(self, name):
         try:
-            return self.get(name__iexact=name.strip().lower())
+            return self.get(name__iexact=name)
         except ObjectDoesNotExist:
             logger.warning("Categoria '%s' não encontrada.", name)
             return None
@@ -55,88 +124,744 @@ class CategoryManager(models.Manager):
         return self.filter(is_active=True)
 
 
-class TransactionManager(models.Manager):
+@functools.cache
+def _model(name):
+    """Returns a model of this app, looked up in the registry only once."""
+    return apps.get_model('transactions', name)
+
+
+def _totals_aggregates(model, amount, count, aggregate):
+    """
+    Returns the aggregate expressions of the totals returned by
+    `TransactionManager.summary()`. `amount` is summed and `count` is
+    counted with `aggregate` per transaction type, using the
+    `TransactionType` of `model`.
+    """
+    TransactionType = model.TransactionType
+
+    def total(condition=None):
+        return Coalesce(
+            Sum(amount, filter=condition),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+
+    def counter(condition=None):
+        return Coalesce(aggregate(count, filter=condition), Value(0))
+
+    income = Q(transaction_type=TransactionType.INCOME)
+    expense = Q(transaction_type=TransactionType.EXPENSE)
+    transfer = Q(transaction_type=TransactionType.TRANSFER)
+    return {
+        'total': total(),
+        'income': total(income),
+        'expense': total(expense),
+        'transfer': total(transfer),
+        'count': counter(),
+        'income_count': counter(income),
+        'expense_count': counter(expense),
+        'transfer_count': counter(transfer),
+    }
+
+
+def _totals(query, amount, count, aggregate):
+    """Aggregates `query` into the totals returned by `TransactionManager.summary()`."""
+    totals = query.order_by().aggregate(**_totals_aggregates(query.model, amount, count, aggregate))
+    totals['net'] = totals['income'] - totals['expense']
+    return totals
+
+
+async def _atotals(query, amount, count, aggregate):
+    """Asynchronous version of `_totals()`."""
+    totals = await query.order_by().aaggregate(
+        **_totals_aggregates(query.model, amount, count, aggregate)
+    )
+    totals['net'] = totals['income'] - totals['expense']
+    return totals
+
+
+# Fields transactions can be broken down by in `TransactionQuerySet.bucketed()`.
+BREAKDOWNS = {
+    'category': 'category__category__name',
+    'payment_method': 'payment_method',
+    'currency': 'currency__code',
+}
+
+
+class CategoryUserManager(models.Manager):
+    def _apply(self, changes):
+        """
+        Applies {category id: (amount, count, last date)} to the usage
+        statistics, with one UPDATE per category.
+        """
+        for category_id, (amount, count, date) in changes.items():
+            values = {}
+            if amount:
+                values['total_amount'] = F('total_amount') + amount
+            if count:
+                values['transaction_count'] = F('transaction_count') + count
+            if date is not None:
+                values['last_used'] = Case(
+                    When(Q(last_used__isnull=True) | Q(last_used__lt=date), then=Value(date)),
+                    default=F('last_used'),
+                )
+            if values:
+                self.filter(pk=category_id).update(**values)
+
+    def apply_change(self, previous, current, date=None, previous_date=None):
+        """
+        Moves a transaction's contribution (see
+        `Transaction.rollup_contribution()`) from `previous` to `current`,
+        where `date` and `previous_date` are the transaction's current and
+        stored dates. Nothing is written when neither the contribution nor
+        the date changed. Deleting a transaction does not move `last_used`
+        back; `reconcile()` does.
+        """
+        if previous == current and date == previous_date:
+            return
+        changes = {}
+        if previous and previous[0]['category_id'] is not None:
+            changes[previous[0]['category_id']] = (-previous[1], -1, None)
+        if current and current[0]['category_id'] is not None:
+            amount, count, _ = changes.get(current[0]['category_id'], (0, 0, None))
+            changes[current[0]['category_id']] = (amount + current[1], count + 1, date)
+        self._apply(changes)
+
+    def apply_many(self, contributions):
+        """Adds many (contribution, date) pairs at once, with one update per category."""
+        changes = {}
+        for contribution, date in contributions:
+            if contribution is None or contribution[0]['category_id'] is None:
+                continue
+            category_id = contribution[0]['category_id']
+            date = _to_date(date)
+            amount, count, last = changes.get(category_id, (0, 0, None))
+            changes[category_id] = (amount + contribution[1], count + 1, max(filter(None, (last, date))))
+        self._apply(changes)
+
+    def reconcile(self, user=None, batch_size=500):
+        """
+        Recomputes the usage statistics from the transactions, one batch
+        of `batch_size` categories at a time, and saves the ones that
+        drifted. Returns the number of repaired categories.
+        """
+        categories = self.filter(user=user) if user else self.all()
+        repaired = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                categories.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'transaction_count', 'total_amount', 'last_used')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            stats = {
+                row['category_id']: row for row in
+                _model('Transaction').objects.filter(category__in=batch).order_by()
+                .values('category_id')
+                .annotate(count=Count('pk'), total=Sum('amount'), last=Max('date'))
+            }
+            drifted = []
+            for category in batch:
+                row = stats.get(category.pk, {'count': 0, 'total': Decimal(0), 'last': None})
+                # SQLite sums decimals as floats.
+                actual = (row['count'], row['total'].quantize(Decimal('0.01')), row['last'])
+                if (category.transaction_count, category.total_amount, category.last_used) != actual:
+                    category.transaction_count, category.total_amount, category.last_used = actual
+                    drifted.append(category)
+            self.bulk_update(drifted, ['transaction_count', 'total_amount', 'last_used'])
+            repaired += len(drifted)
+            logger.info("Reconciled category statistics up to id %s (%d repaired).", last_pk, repaired)
+        return repaired
+
+
+class TransactionQuerySet(models.QuerySet):
+    """
+    Chainable, lazy filters over transactions. Composed filters run as a
+    single query, e.g.
+    `Transaction.objects.expense(user).recent(30).totals()`.
+    """
+
     def for_user(self, user):
         """Returns transactions for a specific user."""
         return self.filter(user=user)
 
+    def _for_optional_user(self, query, user):
+        return query.filter(user=user) if user else query
+
     def income(self, user=None):
         """Returns income transactions (optionally for a specific user)."""
-        Transaction = apps.get_model('transactions', 'Transaction')  # Lazy reference
-        query = self.filter(transaction_type=Transaction.TransactionType.INCOME)
-        if user:
-            query = query.filter(user=user)
-        return query
+        query = self.filter(transaction_type=self.model.TransactionType.INCOME)
+        return self._for_optional_user(query, user)
 
     def expense(self, user=None):
         """Returns expense transactions (optionally for a specific user)."""
-        Transaction = apps.get_model('transactions', 'Transaction')  # Lazy reference
-        query = self.filter(transaction_type=Transaction.TransactionType.EXPENSE)
-        if user:
-            query = query.filter(user=user)
-        return query
+        query = self.filter(transaction_type=self.model.TransactionType.EXPENSE)
+        return self._for_optional_user(query, user)
 
     def transfer(self, user=None):
         """Returns transfer transactions (optionally for a specific user)."""
-        Transaction = apps.get_model('transactions', 'Transaction')  # Lazy reference
-        query = self.filter(transaction_type=Transaction.TransactionType.TRANSFER)
-        if user:
-            query = query.filter(user=user)
-        return query
+        query = self.filter(transaction_type=self.model.TransactionType.TRANSFER)
+        return self._for_optional_user(query, user)
 
     def by_payment_method(self, payment_method, user=None):
         """Returns transactions by payment method (optionally for a specific user)."""
-        query = self.filter(payment_method=payment_method)
-        if user:
-            query = query.filter(user=user)
-        return query
+        return self._for_optional_user(self.filter(payment_method=payment_method), user)
 
     def by_category(self, category, user=None):
         """Returns transactions by category (optionally for a specific user)."""
-        query = self.filter(category=category)
+        return self._for_optional_user(self.filter(category=category), user)
+
+    def between(self, start=None, end=None):
+        """Returns transactions dated within the inclusive range [start, end]."""
+        query = self
+        if start:
+            query = query.filter(date__gte=start)
+        if end:
+            query = query.filter(date__lte=end)
+        return query
+
+    def recent(self, days=30):
+        """Returns transactions from the last `days` days."""
+        return self.filter(date__gte=timezone.localdate() - datetime.timedelta(days=days))
+
+    def recent_transactions(self, days=30, user=None):
+        """Returns transactions from the last `days` days (optionally for a specific user)."""
+        return self._for_optional_user(self.recent(days), user)
+
+    def active_transactions(self, user=None):
+        """Returns non-deleted transactions (optionally for a specific user)."""
+        return self._for_optional_user(self.filter(is_deleted=False), user)
+
+    def deleted_transactions(self, user=None):
+        """Returns deleted transactions (optionally for a specific user)."""
+        return self._for_optional_user(self.filter(is_deleted=True), user)
+
+    def totals(self):
+        """Returns the totals and counts of the queryset, as in `TransactionManager.summary()`."""
+        return _totals(self, 'amount', 'pk', Count)
+
+    async def atotals(self):
+        """Asynchronous version of `totals()`."""
+        return await _atotals(self, 'amount', 'pk', Count)
+
+    def in_currency(self, code):
+        """
+        Annotates `converted_amount`, the amount in the currency `code`,
+        using the latest `ExchangeRate` on or before each transaction's
+        date (None when a rate is missing). The rates are looked up by
+        correlated subqueries, so conversions run inside the same query.
+        """
+        Currency = _model('Currency')
+        target = Currency.objects.get_by_code(code)
+        if target is None:
+            raise ValueError(f"Unknown currency '{code}'.")
+        base = Currency.objects.get_by_code(settings.EXCHANGE_BASE_CURRENCY)
+        rate_field = DecimalField(max_digits=18, decimal_places=8)
+        one = Value(Decimal(1), output_field=rate_field)
+
+        def latest_rate(currency):
+            return Subquery(
+                _model('ExchangeRate').objects.filter(
+                    currency=currency, date__lte=OuterRef('date')
+                ).order_by('-date').values('rate')[:1],
+                output_field=rate_field,
+            )
+
+        source_rate, target_rate = latest_rate(OuterRef('currency')), latest_rate(target.pk)
+        if base is not None:
+            source_rate = Case(
+                When(currency=base, then=one), default=source_rate, output_field=rate_field
+            )
+            if target == base:
+                target_rate = one
+        return self.annotate(converted_amount=Case(
+            When(currency=target, then=F('amount')),
+            default=F('amount') * source_rate / target_rate,
+            output_field=DecimalField(max_digits=20, decimal_places=8),
+        ))
+
+    def totals_in(self, code):
+        """
+        Returns the totals of `totals()` converted to the currency `code`
+        in a single query (see `in_currency()`), plus `unconverted_count`:
+        the number of transactions left out for lack of an exchange rate.
+        """
+        # Grouping by type keeps the rate subqueries to two per row.
+        rows = self.in_currency(code).order_by().values('transaction_type').annotate(
+            converted_total=Sum('converted_amount'),
+            converted_count=Count('converted_amount'),
+            row_count=Count('pk'),
+        )
+        cent = Decimal('0.01')
+        totals = {
+            'total': Decimal('0'), 'income': Decimal('0'),
+            'expense': Decimal('0'), 'transfer': Decimal('0'),
+            'count': 0, 'income_count': 0, 'expense_count': 0, 'transfer_count': 0,
+            'unconverted_count': 0,
+        }
+        for row in rows:
+            amount = (row['converted_total'] or Decimal('0')).quantize(cent)
+            totals[row['transaction_type']] += amount
+            totals[f"{row['transaction_type']}_count"] += row['row_count']
+            totals['total'] += amount
+            totals['count'] += row['row_count']
+            totals['unconverted_count'] += row['row_count'] - row['converted_count']
+        totals['net'] = totals['income'] - totals['expense']
+        totals['currency'] = code
+        return totals
+
+    def bucketed(self, granularity, by=None):
+        """
+        Groups the queryset into `granularity` ('day', 'week', 'month' or
+        'year') buckets of `date`, returned as `period`, and optionally by
+        one of `BREAKDOWNS`, returned as `key`. Each row holds the totals
+        and counts of `totals()`, except `net`.
+        """
+        query = self.order_by().annotate(
+            period=Trunc('date', granularity, output_field=DateField())
+        )
+        fields = ['period']
+        if by:
+            query = query.annotate(key=F(BREAKDOWNS[by]))
+            fields.append('key')
+        return query.values(*fields).annotate(
+            **_totals_aggregates(self.model, 'amount', 'pk', Count)
+        ).order_by(*fields)
+
+
+class TransactionManager(models.Manager.from_queryset(TransactionQuerySet)):
+    """
+    Default manager of `Transaction`. Soft-deleted transactions are excluded;
+    `Transaction.all_objects` (`TransactionQuerySet.as_manager()`) includes them.
+
+    Filters come from `TransactionQuerySet`; this class only adds the
+    methods that need the monthly rollups or that span both managers.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+    def deleted_transactions(self, user=None):
+        """Returns deleted transactions (optionally for a specific user)."""
+        return self.model.all_objects.deleted_transactions(user)
+
+    def _page_query(self, user, cursor, size):
+        query = self.for_user(user).order_by('-date', '-created_at', '-id')
+        if cursor:
+            date, created_at, pk = decode_cursor(cursor)
+            query = query.filter(date__lte=date).filter(
+                Q(date__lt=date)
+                | Q(created_at__lt=created_at)
+                | Q(created_at=created_at, id__lt=pk)
+            )
+        return query.select_related('currency', 'category__category')[:size + 1]
+
+    @staticmethod
+    def _split_page(rows, size):
+        next_cursor = encode_cursor(rows[size - 1]) if len(rows) > size else None
+        return rows[:size], next_cursor
+
+    def page(self, user, cursor=None, size=50):
+        """
+        Returns a page of a user's transactions, newest first, and the cursor
+        of the next page (None on the last page).
+
+        Pages are selected by keyset over (date, created_at, id) instead of
+        OFFSET, so every page costs the same and rows sharing a date are
+        never skipped or repeated.
+        """
+        return self._split_page(list(self._page_query(user, cursor, size)), size)
+
+    async def apage(self, user, cursor=None, size=50):
+        """Asynchronous version of `page()`."""
+        rows = [row async for row in self._page_query(user, cursor, size)]
+        return self._split_page(rows, size)
+
+    def _search_query(self, user, text):
+        query = self.for_user(user)
+        if connections[query.db].vendor == 'postgresql':
+            from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+            # Stored generated column, indexed with GIN; not a model field,
+            # so it is never loaded with the rows.
+            table = connections[self.db].ops.quote_name(self.model._meta.db_table)
+            vector = RawSQL(f'{table}."search_vector"', [], output_field=SearchVectorField())
+            search = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+            return query.alias(search_vector=vector).filter(search_vector=search).annotate(
+                rank=SearchRank(vector, search)
+            ).order_by('-rank', '-date', '-id')
+        # Fallback for other databases (tests): every word must appear.
+        for word in text.split():
+            query = query.filter(description__icontains=word)
+        return query.annotate(rank=Value(1.0)).order_by('-date', '-id')
+
+    def search(self, user, text, page=1, size=50):
+        """
+        Returns a page (1-based) of a user's transactions whose description
+        matches `text`, best matches first, and whether there is a next page.
+
+        On PostgreSQL, `text` is parsed as a web search (quoted phrases,
+        `or`, `-word`) and matched with the GIN-indexed `search_vector`
+        column; elsewhere, each word is matched with `icontains`.
+        """
+        if not text.strip():
+            return [], False
+        start = (max(page, 1) - 1) * size
+        rows = list(
+            self._search_query(user, text)
+            .select_related('currency', 'category__category')[start:start + size + 1]
+        )
+        return rows[:size], len(rows) > size
+
+    def _summary_query(self, user, start, end):
+        """
+        Returns the queryset and the `_totals()` arguments answering
+        `summary()`: the monthly rollups for whole-month ranges, the
+        transactions otherwise.
+        """
+        start, end = _to_date(start), _to_date(end)
+        if not _covers_whole_months(start, end):
+            query = self.between(start, end)
+            if user:
+                query = query.for_user(user)
+            return query, 'amount', 'pk', Count
+
+        query = _model('MonthlyRollup').objects.all()
+        if start:
+            query = query.filter(month__gte=start)
+        if end:
+            query = query.filter(month__lte=end.replace(day=1))
         if user:
             query = query.filter(user=user)
-        return query
+        return query, 'amount', 'transaction_count', Sum
+
+    def summary(self, user=None, start=None, end=None):
+        """
+        Returns income, expense, transfer and net totals plus counts
+        (optionally for a specific user and date range) in a single query.
+
+        Deleted transactions are ignored. `start` and `end` are inclusive.
+        Ranges made of whole months are answered from the monthly rollups.
+        """
+        return _totals(*self._summary_query(user, start, end))
+
+    async def asummary(self, user=None, start=None, end=None):
+        """Asynchronous version of `summary()`."""
+        return await _atotals(*self._summary_query(user, start, end))
+
+    def summary_in(self, currency, user=None, start=None, end=None):
+        """
+        Returns the totals of `summary()` converted to `currency` (a code)
+        with the exchange rate of each transaction's date, plus the
+        `unconverted_count` of transactions without a rate.
+        """
+        query = self.between(_to_date(start), _to_date(end))
+        if user:
+            query = query.for_user(user)
+        return query.totals_in(currency)
+
+    def bulk_record(self, transactions, batch_size=None):
+        """
+        Inserts already validated transactions with `bulk_create`, adds
+        them to the monthly rollups and invalidates the owners' cached
+        dashboards and reports. Returns the created transactions.
+        """
+        with transaction.atomic():
+            created = self.bulk_create(transactions, batch_size=batch_size)
+            contributions = [t.rollup_contribution() for t in created]
+            _model('MonthlyRollup').objects.apply_many(contributions)
+            _model('Budget').objects.apply_many(contributions)
+            _model('CategoryUser').objects.apply_many(zip(contributions, (t.date for t in created)))
+            invalidate_dashboard(*{t.user_id for t in created})
+            invalidate_reports(*{
+                (key['user_id'], key['month']) for key, _ in filter(None, contributions)
+            })
+        return created
 
     def total_amount(self, user=None):
         """Returns the total amount of all transactions (optionally for a specific user)."""
-        query = self.all()
-        if user:
-            query = query.filter(user=user)
-        return query.aggregate(total_amount=Sum('amount'))['total_amount'] or 0
+        return self.summary(user)['total']
 
     def total_income(self, user=None):
         """Returns the total income amount (optionally for a specific user)."""
-        return self.income(user).aggregate(total_income=Sum('amount'))['total_income'] or 0
+        return self.summary(user)['income']
 
     def total_expense(self, user=None):
         """Returns the total expense amount (optionally for a specific user)."""
-        return self.expense(user).aggregate(total_expense=Sum('amount'))['total_expense'] or 0
+        return self.summary(user)['expense']
 
     def net_balance(self, user=None):
         """Returns the net balance (income - expense) for a user."""
-        total_income = self.total_income(user)
-        total_expense = self.total_expense(user)
-        return total_income - total_expense
+        return self.summary(user)['net']
 
-    def recent_transactions(self, days=30, user=None):
-        """Returns transactions from the last `days` days (optionally for a specific user)."""
-        start_date = timezone.now() - timezone.timedelta(days=days)
-        query = self.filter(date__gte=start_date)
-        if user:
-            query = query.filter(user=user)
-        return query
 
-    def deleted_transactions(self, user=None):
-        """Returns deleted transactions (optionally for a specific user)."""
-        query = self.filter(is_deleted=True)
-        if user:
-            query = query.filter(user=user)
-        return query
+class MonthlyRollupManager(models.Manager):
+    def apply(self, key, amount, count):
+        """
+        Adds `amount` and `count` to the rollup row identified by `key`,
+        creating it when missing. A concurrent first write of the same key
+        makes the insert fail on the unique key; the row it created is then
+        updated instead.
+        """
+        values = {
+            'amount': F('amount') + amount,
+            'transaction_count': F('transaction_count') + count,
+        }
+        if self.filter(**key).update(**values):
+            return
+        try:
+            with transaction.atomic():
+                self.create(amount=amount, transaction_count=count, **key)
+        except IntegrityError:
+            self.filter(**key).update(**values)
 
-    def active_transactions(self, user=None):
-        """Returns non-deleted transactions (optionally for a specific user)."""
-        query = self.filter(is_deleted=False)
+    def apply_change(self, previous, current):
+        """
+        Moves a transaction's contribution from `previous` to `current`.
+        Both are `(key, amount)` pairs as returned by
+        `Transaction.rollup_contribution()`, or None.
+        """
+        if previous == current:
+            return
+        if previous and current and previous[0] == current[0]:
+            self.apply(current[0], current[1] - previous[1], 0)
+            return
+        if previous:
+            self.apply(previous[0], -previous[1], -1)
+        if current:
+            self.apply(current[0], current[1], 1)
+
+    def apply_many(self, contributions):
+        """
+        Adds many contributions at once, issuing one update per distinct
+        rollup key instead of one per transaction.
+        """
+        grouped = {}
+        for contribution in contributions:
+            if contribution is None:
+                continue
+            key, amount = contribution
+            key = tuple(sorted(key.items()))
+            total, count = grouped.get(key, (0, 0))
+            grouped[key] = (total + amount, count + 1)
+        for key, (amount, count) in grouped.items():
+            self.apply(dict(key), amount, count)
+
+    def rebuild(self, user=None, batch_size=1000):
+        """
+        Recomputes the rollups from scratch (optionally for a specific user).
+        Returns the number of rollup rows created.
+        """
+        transactions = _model('Transaction').objects.all()
+        rollups = self.all()
         if user:
-            query = query.filter(user=user)
-        return query
+            transactions = transactions.filter(user=user)
+            rollups = rollups.filter(user=user)
+        rows = (
+            transactions.order_by()
+            .annotate(month=TruncMonth('date'))
+            .values('user_id', 'month', 'currency_id', 'transaction_type', 'category_id')
+            .annotate(total=Sum('amount'), transaction_count=Count('pk'))
+        )
+        created = 0
+        with transaction.atomic():
+            rollups.delete()
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(self.model(amount=row.pop('total'), **row))
+                if len(batch) >= batch_size:
+                    created += len(self.bulk_create(batch))
+                    batch = []
+            if batch:
+                created += len(self.bulk_create(batch))
+        logger.info("Rebuilt %d monthly rollup rows.", created)
+        return created
+
+
+class BudgetManager(models.Manager):
+    def _apply(self, deltas):
+        """Adds each amount in `deltas` ({rollup key: amount}) to the matching budget."""
+        for key, amount in deltas.items():
+            if amount:
+                self.filter(**dict(key)).update(spent=F('spent') + amount)
+
+    @staticmethod
+    def _key(contribution):
+        """Returns the budget key of an expense contribution, or None."""
+        if contribution is None:
+            return None
+        key, _ = contribution
+        if key['transaction_type'] != 'expense' or key['category_id'] is None:
+            return None
+        return tuple(sorted(
+            (name, value) for name, value in key.items() if name != 'transaction_type'
+        ))
+
+    def apply_change(self, previous, current):
+        """
+        Moves a transaction's contribution from `previous` to `current`, as
+        `MonthlyRollupManager.apply_change` does.
+        """
+        if previous == current:
+            return
+        deltas = {}
+        for contribution, sign in ((previous, -1), (current, 1)):
+            key = self._key(contribution)
+            if key is not None:
+                deltas[key] = deltas.get(key, 0) + sign * contribution[1]
+        self._apply(deltas)
+
+    def apply_many(self, contributions):
+        """Adds many contributions at once, issuing one update per budget."""
+        deltas = {}
+        for contribution in contributions:
+            key = self._key(contribution)
+            if key is not None:
+                deltas[key] = deltas.get(key, 0) + contribution[1]
+        self._apply(deltas)
+
+    def rebuild(self, user=None):
+        """
+        Resets `spent` from the monthly rollups (optionally for a specific
+        user) in a single UPDATE. Returns the number of budgets.
+        """
+        rollups = _model('MonthlyRollup').objects.filter(
+            user_id=OuterRef('user_id'),
+            month=OuterRef('month'),
+            category_id=OuterRef('category_id'),
+            currency_id=OuterRef('currency_id'),
+            transaction_type='expense',
+        ).values('amount')[:1]
+        budgets = self.filter(user=user) if user else self.all()
+        return budgets.update(spent=Coalesce(Subquery(rollups), Value(Decimal(0))))
+
+    def over_budget(self, user, month=None):
+        """
+        Returns the user's budgets of `month` (this month) whose spending
+        exceeds the limit, read through the unique (user, month, ...) index.
+        """
+        month = (_to_date(month) or timezone.localdate()).replace(day=1)
+        return self.filter(user=user, month=month, spent__gt=F('amount')).select_related(
+            'category__category', 'currency'
+        )
+
+
+class ExchangeRateManager(models.Manager):
+    def get_rate(self, code, date):
+        """
+        Returns the value of one unit of the currency `code` in the base
+        currency on `date` (the latest rate on or before it), or None.
+        Recently used rates are kept in an in-memory LRU cache.
+        """
+        if code == settings.EXCHANGE_BASE_CURRENCY:
+            return Decimal(1)
+        return rate_cache.get((code, date), lambda: self.filter(
+            currency__code=code, date__lte=date
+        ).order_by('-date').values_list('rate', flat=True).first())
+
+    def convert(self, amount, from_code, to_code, date):
+        """Converts `amount` between two currencies at `date`, or returns None without a rate."""
+        if from_code == to_code:
+            return amount
+        source, target = self.get_rate(from_code, date), self.get_rate(to_code, date)
+        if source is None or not target:
+            return None
+        return (amount * source / target).quantize(Decimal('0.01'))
+
+    def load(self, rates, batch_size=1000):
+        """
+        Inserts or updates `(currency code, date, rate)` rows. Returns the
+        number of stored rates; rows of unknown currencies are skipped.
+        Raises ValueError, storing nothing, when a rate isn't a finite
+        positive number (`bulk_create` skips the field validators).
+        """
+        currencies = dict(_model('Currency').objects.values_list('code', 'pk'))
+        stored = 0
+        batch = []
+        with transaction.atomic():
+            for code, date, rate in rates:
+                if code not in currencies:
+                    logger.warning("Skipping the rate of unknown currency %s.", code)
+                    continue
+                batch.append(self.model(currency_id=currencies[code], date=date, rate=_positive(rate)))
+                if len(batch) == batch_size:
+                    stored += len(self._upsert(batch))
+                    batch = []
+            stored += len(self._upsert(batch))
+        rate_cache.clear()
+        return stored
+
+    def _upsert(self, batch):
+        return self.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['currency', 'date'],
+            update_fields=['rate'],
+        )
+
+
+def _positive(rate):
+    """Returns `rate` as a Decimal, or raises ValueError unless it is finite and positive."""
+    try:
+        value = Decimal(rate)
+    except (TypeError, ValueError, InvalidOperation):
+        value = None
+    if value is None or not value.is_finite() or value <= 0:
+        raise ValueError(f"Invalid exchange rate: {rate!r}.")
+    return value
+
+
+class RecurringTransactionManager(models.Manager):
+    def due(self, date=None):
+        """Returns the active rules with an occurrence on or before `date` (today)."""
+        return self.filter(is_active=True, next_run__lte=date or timezone.localdate())
+
+    def materialize(self, date=None, batch_size=500):
+        """
+        Creates the transactions of every occurrence due on or before
+        `date` (today), across all users. Returns the number created.
+
+        Rules are claimed in batches of `batch_size` with
+        `SELECT ... FOR UPDATE SKIP LOCKED`, and each batch's transactions
+        are inserted with `bulk_record` and its `next_run` dates moved by a
+        single UPDATE, in one database transaction. Concurrent runs
+        therefore share the backlog without creating an occurrence twice.
+        """
+        date = date or timezone.localdate()
+        created = 0
+        while True:
+            with transaction.atomic():
+                rules = list(
+                    self.due(date).select_for_update(skip_locked=True).order_by('pk')[:batch_size]
+                )
+                if not rules:
+                    break
+                transactions = []
+                next_runs = {}
+                for rule in rules:
+                    occurrence = None
+                    for occurrence in rule.occurrences(date):
+                        transactions.append(rule.build(occurrence))
+                    next_runs[rule.pk] = rule.following(occurrence) if occurrence else rule.next_run
+                _model('Transaction').objects.bulk_record(transactions, batch_size=batch_size)
+                changes = {
+                    'next_run': Case(
+                        *(When(pk=pk, then=Value(next_run)) for pk, next_run in next_runs.items()),
+                        output_field=DateField(),
+                    ),
+                    'updated_at': timezone.now(),
+                }
+                ended = [
+                    rule.pk for rule in rules
+                    if rule.end_date is not None and next_runs[rule.pk] > rule.end_date
+                ]
+                if ended:
+                    changes['is_active'] = Case(
+                        When(pk__in=ended, then=Value(False)), default=Value(True)
+                    )
+                self.filter(pk__in=next_runs).update(**changes)
+            created += len(transactions)
+            logger.info("Materialized %d recurring transactions.", created)
+        return created
@@ -0,0 +1,25 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .ownership import category_ownership_cache
+
+
+class CategoryOwnershipMiddleware:
+    """Scopes the category ownership cache to a single request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with category_ownership_cache():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with category_ownership_cache():
+            return await self.get_response(request)
@@ -0,0 +1,111 @@
+# Generated by Django 5.1.15 on 2026-10-18 16:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    Transaction = apps.get_model("transactions", "Transaction")
+    MonthlyRollup = apps.get_model("transactions", "MonthlyRollup")
+    rows = (
+        Transaction.objects.filter(is_deleted=False)
+        .order_by()
+        .annotate(month=TruncMonth("date"))
+        .values("user_id", "month", "currency_id", "transaction_type", "category_id")
+        .annotate(total=Sum("amount"), transaction_count=Count("pk"))
+    )
+    MonthlyRollup.objects.bulk_create(
+        (MonthlyRollup(amount=row.pop("total"), **row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="Month")),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        choices=[
+                            ("income", "Income"),
+                            ("expense", "Expense"),
+                            ("transfer", "Tranfer"),
+                        ],
+                        max_length=10,
+                        verbose_name="Transaction Type",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Amount",
+                    ),
+                ),
+                (
+                    "transaction_count",
+                    models.IntegerField(default=0, verbose_name="Transaction Count"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="transactions.categoryuser",
+                        verbose_name="Category",
+                    ),
+                ),
+                (
+                    "currency",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="transactions.currency",
+                        verbose_name="Currency",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Monthly Rollup",
+                "verbose_name_plural": "Monthly Rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "month"], name="transaction_user_id_deed3f_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
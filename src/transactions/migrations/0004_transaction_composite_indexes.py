@@ -0,0 +1,63 @@
+# Generated by Django 5.1.15 on 2026-10-18 16:47
+
+from django.conf import settings
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0003_transaction_history_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_user_id_b60ed6_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_categor_e3f163_idx",
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "is_deleted", "date"],
+                name="transaction_user_id_4244c7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "transaction_type", "date"],
+                name="transaction_user_id_26764d_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "category", "date"],
+                name="transaction_user_id_9fff81_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["user", "date"],
+                name="transaction_active_user_date",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="user_transactions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
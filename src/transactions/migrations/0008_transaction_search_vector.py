@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# Keep the text search configuration in sync with managers.SEARCH_CONFIG.
+# Adding the stored column rewrites the table under an ACCESS EXCLUSIVE
+# lock; the index is then built concurrently, outside of a transaction, so
+# it doesn't block writes. Each statement commits on its own and can be
+# re-run: drop an INVALID index left by a failed build before retrying.
+FORWARD = [
+    """
+    ALTER TABLE transactions_transaction
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('portuguese', coalesce(description, ''))) STORED
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS transaction_search_vector
+    ON transactions_transaction USING gin (search_vector)
+    """,
+]
+BACKWARD = [
+    "DROP INDEX CONCURRENTLY IF EXISTS transaction_search_vector",
+    "ALTER TABLE transactions_transaction DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        # The column backs full-text search on PostgreSQL only; other
+        # databases fall back to `icontains`.
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block.
+    atomic = False
+
+    dependencies = [
+        ("transactions", "0007_budget"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(FORWARD), run(BACKWARD)),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_usage(apps, schema_editor):
+    CategoryUser = apps.get_model("transactions", "CategoryUser")
+    Transaction = apps.get_model("transactions", "Transaction")
+    usage = (
+        Transaction.objects.filter(category=OuterRef("pk"), is_deleted=False)
+        .order_by()
+        .values("category")
+    )
+    CategoryUser.objects.update(
+        transaction_count=Coalesce(
+            Subquery(usage.annotate(value=Count("pk")).values("value")), Value(0)
+        ),
+        total_amount=Coalesce(
+            Subquery(usage.annotate(value=Sum("amount")).values("value")),
+            Value(0),
+            output_field=models.DecimalField(),
+        ),
+        last_used=Subquery(usage.annotate(value=Max("date")).values("value")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0009_categorizationrule"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="categoryuser",
+            name="last_used",
+            field=models.DateField(
+                blank=True, editable=False, null=True, verbose_name="Last Used"
+            ),
+        ),
+        migrations.AddField(
+            model_name="categoryuser",
+            name="total_amount",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                editable=False,
+                max_digits=14,
+                verbose_name="Total Amount",
+            ),
+        ),
+        migrations.AddField(
+            model_name="categoryuser",
+            name="transaction_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="Transaction Count"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="categoryuser",
+            index=models.Index(
+                fields=["user", "-transaction_count"],
+                name="transaction_user_id_b83546_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="categoryuser",
+            index=models.Index(
+                fields=["user", "-last_used"], name="transaction_user_id_1eeff8_idx"
+            ),
+        ),
+        migrations.RunPython(fill_usage, migrations.RunPython.noop),
+    ]
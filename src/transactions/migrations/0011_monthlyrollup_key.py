@@ -0,0 +1,49 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+KEY = ("user", "month", "currency", "transaction_type", "category")
+
+
+def merge_duplicates(apps, schema_editor):
+    """Folds rollup rows sharing a key into the oldest one."""
+    MonthlyRollup = apps.get_model("transactions", "MonthlyRollup")
+    duplicates = (
+        MonthlyRollup.objects.order_by()
+        .values(*KEY)
+        .annotate(
+            rows=Count("pk"),
+            first=Min("pk"),
+            total=Sum("amount"),
+            count=Sum("transaction_count"),
+        )
+        .filter(rows__gt=1)
+    )
+    for row in list(duplicates):
+        key = {name: row[name] for name in KEY}
+        MonthlyRollup.objects.filter(**key).exclude(pk=row["first"]).delete()
+        MonthlyRollup.objects.filter(pk=row["first"]).update(
+            amount=row["total"], transaction_count=row["count"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0010_categoryuser_usage"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="monthlyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("user", "month", "currency", "transaction_type", "category"),
+                name="monthly_rollup_key",
+                nulls_distinct=False,
+            ),
+        ),
+    ]
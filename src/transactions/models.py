@@ -1,11 +1,32 @@
+import re
 import uuid
-from django.db import models
+import calendar
+import datetime
+from decimal import Decimal
+from django.db import models, transaction as db_transaction
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.core.validators import MinValueValidator, RegexValidator
 from django.core.exceptions import ValidationError
 
-from .managers import CurrencyManager, CategoryManager, TransactionManager
+from .cache import invalidate_dashboard, invalidate_reports
+from .ownership import category_owner_id
+from .managers import (
+    CurrencyManager,
+    CategoryManager,
+    TransactionManager,
+    TransactionQuerySet,
+    MonthlyRollupManager,
+    ExchangeRateManager,
+    RecurringTransactionManager,
+    BudgetManager,
+    CategoryUserManager,
+)
+
+
+def _report_months(*contributions):
+    """Returns the (user id, month) pairs of the given rollup contributions."""
+    return {(key["user_id"], key["month"]) for key, _ in filter(None, contributions)}
 
 
 class Currency(models.Model):
@@ -75,6 +96,19 @@ class CategoryUser(models.Model):
     icon = models.CharField(
         max_length=50, blank=True, null=True, verbose_name=_("Icon")
     )
+    # Usage statistics of non-deleted transactions, maintained by
+    # `Transaction.save()`, `Transaction.delete()` and `bulk_record()`.
+    transaction_count = models.IntegerField(
+        default=0, editable=False, verbose_name=_("Transaction Count")
+    )
+    total_amount = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, editable=False, verbose_name=_("Total Amount")
+    )
+    last_used = models.DateField(
+        null=True, blank=True, editable=False, verbose_name=_("Last Used")
+    )
+
+    objects = CategoryUserManager()
 
     class Meta:
         verbose_name = _("User Category")
@@ -83,6 +117,8 @@ class CategoryUser(models.Model):
         indexes = [
             models.Index(fields=["user"]),
             models.Index(fields=["category"]),
+            models.Index(fields=["user", "-transaction_count"]),
+            models.Index(fields=["user", "-last_used"]),
         ]
 
     def __str__(self):
@@ -104,7 +140,9 @@ class Transaction(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name="user_transactions"
+        related_name="user_transactions",
+        # Served by the composite indexes that start with `user` (see Meta).
+        db_index=False,
     )
     description = models.TextField(verbose_name=_("Description"))
     amount = models.DecimalField(
@@ -144,30 +182,553 @@ class Transaction(models.Model):
     is_deleted = models.BooleanField(default=False, verbose_name=_("Deleted"))
 
     objects = TransactionManager()
+    all_objects = TransactionQuerySet.as_manager()
+
     class Meta:
         ordering = ["-date"]
         verbose_name = _("Transaction")
         verbose_name_plural = _("Transactions")
+        # `category` is indexed as a foreign key. `user` isn't: every
+        # per-user query, and the cascade from users, is served by one of
+        # the composite indexes below.
         indexes = [
-            models.Index(fields=["user"]),
             models.Index(fields=["date"]),
             models.Index(fields=["payment_method"]),
-            models.Index(fields=["category"]),
+            models.Index(fields=["user", "is_deleted", "date"]),
+            models.Index(fields=["user", "transaction_type", "date"]),
+            models.Index(fields=["user", "category", "date"]),
+            models.Index(fields=["user", "-date", "-created_at", "-id"]),
+            models.Index(
+                fields=["user", "date"],
+                condition=models.Q(is_deleted=False),
+                name="transaction_active_user_date",
+            ),
         ]
 
     def __str__(self):
-        code = getattr(self.currency, "code")
+        code = getattr(self.cached_currency, "code", None)
         return f"({self.category}) {self.description} - {code} {self.amount}"
 
+    @property
+    def cached_currency(self):
+        """The currency, read from the reference cache unless already loaded."""
+        if self._meta.get_field("currency").is_cached(self):
+            return self.currency
+        return Currency.objects.get_cached(self.currency_id)
+
+    @classmethod
+    def _rollup_fields(cls):
+        names = ("user", "date", "currency", "transaction_type", "category", "amount", "is_deleted")
+        return [cls._meta.get_field(name) for name in names]
+
+    def rollup_contribution(self):
+        """
+        Returns the (key, amount) pair this transaction adds to the monthly
+        rollups, or None when it does not count (deleted transactions).
+        """
+        if self.is_deleted:
+            return None
+        date = self._meta.get_field("date").to_python(self.date)
+        amount = self._meta.get_field("amount").to_python(self.amount)
+        key = {
+            "user_id": self.user_id,
+            "month": date.replace(day=1),
+            "currency_id": self.currency_id,
+            "transaction_type": self.transaction_type,
+            "category_id": self.category_id,
+        }
+        return key, amount
+
+    def _stored_copy(self):
+        """
+        Returns an unsaved copy of the rollup fields of the row as currently
+        stored, or None, locking the row until the current database
+        transaction ends so that concurrent edits of the same row apply
+        their changes in turn.
+        """
+        if self._state.adding:
+            return None
+        attnames = [f.attname for f in self._rollup_fields()]
+        values = (
+            type(self)._base_manager.select_for_update()
+            .filter(pk=self.pk).values(*attnames).first()
+        )
+        if values is None:
+            return None
+        return type(self)(**values)
+
     def clean(self):
-        """Ensure TRANSFER transactions don’t have a payment method."""
+        """
+        Ensure TRANSFER transactions don’t have a payment method and that the
+        category belongs to the user, without loading the category's user.
+        """
         if self.transaction_type == self.TransactionType.TRANSFER and self.payment_method:
             raise ValidationError(_("Transfers should not have a payment method."))
         elif self.transaction_type in [self.TransactionType.INCOME, self.TransactionType.EXPENSE] and not self.payment_method:
             raise ValidationError(_("Income and expense transactions must have a payment method."))
-        category_user = getattr(self.category, "user")
-        if self.category and category_user != self.user:
+        if self.category_id is not None:
+            if self._meta.get_field("category").is_cached(self):
+                owner_id = self.category.user_id
+            else:
+                owner_id = category_owner_id(self.category_id)
+            if owner_id != self.user_id:
+                raise ValidationError(_("Category does not belong to the user."))
+
+    def save(self, *args, **kwargs):
+        """
+        Run model validation before saving and keep the rollups, budgets,
+        category statistics and the cached dashboard and reports in sync.
+        """
+        self.clean()
+        with db_transaction.atomic():
+            stored = self._stored_copy()
+            previous = stored and stored.rollup_contribution()
+            super().save(*args, **kwargs)
+            current = self.rollup_contribution()
+            MonthlyRollup.objects.apply_change(previous, current)
+            Budget.objects.apply_change(previous, current)
+            CategoryUser.objects.apply_change(
+                previous, current, self._meta.get_field("date").to_python(self.date),
+                previous_date=stored and stored.date,
+            )
+            invalidate_dashboard(self.user_id, previous and previous[0]["user_id"])
+            invalidate_reports(*_report_months(previous, current))
+
+    def delete(self, *args, **kwargs):
+        """Delete the transaction and remove it from the rollups."""
+        with db_transaction.atomic():
+            stored = self._stored_copy()
+            previous = stored and stored.rollup_contribution()
+            result = super().delete(*args, **kwargs)
+            MonthlyRollup.objects.apply_change(previous, None)
+            Budget.objects.apply_change(previous, None)
+            CategoryUser.objects.apply_change(previous, None)
+            invalidate_dashboard(self.user_id)
+            invalidate_reports(*_report_months(previous))
+        return result
+
+
+class MonthlyRollup(models.Model):
+    """
+    Per-user monthly totals of non-deleted transactions, maintained
+    incrementally by `Transaction.save()` and `Transaction.delete()`.
+
+    Bulk operations that bypass `save()` (`QuerySet.update`, `bulk_create`)
+    must be followed by `MonthlyRollup.objects.rebuild()`.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="monthly_rollups",
+        verbose_name=_("User")
+    )
+    month = models.DateField(verbose_name=_("Month"))
+    currency = models.ForeignKey(
+        Currency,
+        on_delete=models.CASCADE,
+        verbose_name=_("Currency")
+    )
+    transaction_type = models.CharField(
+        max_length=10,
+        choices=Transaction.TransactionType.choices,
+        verbose_name=_("Transaction Type")
+    )
+    category = models.ForeignKey(
+        CategoryUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("Category")
+    )
+    amount = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name=_("Amount")
+    )
+    transaction_count = models.IntegerField(
+        default=0, verbose_name=_("Transaction Count")
+    )
+
+    TransactionType = Transaction.TransactionType
+
+    objects = MonthlyRollupManager()
+
+    class Meta:
+        verbose_name = _("Monthly Rollup")
+        verbose_name_plural = _("Monthly Rollups")
+        indexes = [
+            models.Index(fields=["user", "month"]),
+        ]
+        constraints = [
+            # Rows without a category share a key too, so NULLs must match.
+            models.UniqueConstraint(
+                fields=["user", "month", "currency", "transaction_type", "category"],
+                name="monthly_rollup_key",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.month:%Y-%m} {self.transaction_type} {self.amount}"
+
+
+class Budget(models.Model):
+    """
+    Monthly spending limit of a user's category. `spent` is the sum of the
+    month's non-deleted expenses in the category and currency, maintained
+    incrementally alongside the rollups.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="budgets",
+        verbose_name=_("User")
+    )
+    category = models.ForeignKey(
+        CategoryUser,
+        on_delete=models.CASCADE,
+        related_name="budgets",
+        verbose_name=_("Category")
+    )
+    currency = models.ForeignKey(
+        Currency,
+        on_delete=models.PROTECT,
+        verbose_name=_("Currency"),
+        default=1
+    )
+    month = models.DateField(verbose_name=_("Month"))
+    amount = models.DecimalField(
+        max_digits=14, decimal_places=2, verbose_name=_("Amount"),
+        validators=[MinValueValidator(0)]
+    )
+    spent = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, editable=False, verbose_name=_("Spent")
+    )
+
+    objects = BudgetManager()
+
+    class Meta:
+        ordering = ["-month"]
+        verbose_name = _("Budget")
+        verbose_name_plural = _("Budgets")
+        constraints = [
+            # Also serves the per-user, per-month lookups.
+            models.UniqueConstraint(
+                fields=["user", "month", "category", "currency"], name="budget_user_month_category"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.category} {self.month:%Y-%m}: {self.spent}/{self.amount}"
+
+    @property
+    def remaining(self):
+        return self.amount - self.spent
+
+    def clean(self):
+        """Ensure the category belongs to the user."""
+        if self.category_id is not None and category_owner_id(self.category_id) != self.user_id:
+            raise ValidationError(_("Category does not belong to the user."))
+
+    def save(self, *args, **kwargs):
+        """
+        Normalize the month and, when the budget is created or moved to
+        another month, category or currency, start `spent` from the
+        matching rollup. Otherwise `spent` is left to the counter updates.
+        """
+        self.clean()
+        self.month = self._meta.get_field("month").to_python(self.month).replace(day=1)
+        key = ("user_id", "month", "category_id", "currency_id")
+        with db_transaction.atomic():
+            stored = None
+            if not self._state.adding:
+                stored = type(self)._base_manager.select_for_update().filter(
+                    pk=self.pk
+                ).values(*key).first()
+            if stored is None or stored != {name: getattr(self, name) for name in key}:
+                self.spent = self._rollup_spent()
+            elif kwargs.get("update_fields") is None:
+                # Don't overwrite concurrent increments with a stale value.
+                kwargs["update_fields"] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name != "spent"
+                ]
+            super().save(*args, **kwargs)
+
+    def _rollup_spent(self):
+        """
+        Returns the month's expenses in the budget's category and currency.
+        Expense writers update the rollup row before the budget, so locking
+        that row (creating it when missing) until the budget is saved makes
+        a concurrent expense either counted here or wait for this budget.
+        """
+        key = {
+            "user_id": self.user_id,
+            "month": self.month,
+            "currency_id": self.currency_id,
+            "transaction_type": Transaction.TransactionType.EXPENSE,
+            "category_id": self.category_id,
+        }
+        MonthlyRollup.objects.apply(key, 0, 0)
+        return MonthlyRollup.objects.filter(**key).aggregate(spent=models.Sum("amount"))["spent"] or 0
+
+
+class ExchangeRate(models.Model):
+    """
+    Value of one unit of `currency` in `settings.EXCHANGE_BASE_CURRENCY` on
+    `date`. A transaction is converted with the latest rate on or before
+    its date; the base currency implicitly has a rate of 1.
+    """
+
+    currency = models.ForeignKey(
+        Currency,
+        on_delete=models.CASCADE,
+        related_name="exchange_rates",
+        verbose_name=_("Currency")
+    )
+    date = models.DateField(verbose_name=_("Date"))
+    rate = models.DecimalField(
+        max_digits=18,
+        decimal_places=8,
+        validators=[MinValueValidator(Decimal("0.00000001"))],
+        verbose_name=_("Rate")
+    )
+
+    objects = ExchangeRateManager()
+
+    class Meta:
+        ordering = ["currency", "-date"]
+        verbose_name = _("Exchange Rate")
+        verbose_name_plural = _("Exchange Rates")
+        constraints = [
+            # Also serves the "latest rate on or before a date" lookups.
+            models.UniqueConstraint(fields=["currency", "date"], name="exchange_rate_currency_date"),
+        ]
+
+    def __str__(self):
+        return f"{self.currency_id} {self.date} {self.rate}"
+
+
+class RecurringTransaction(models.Model):
+    """
+    Template of a transaction repeated every `interval` days, weeks, months
+    or years from `start_date`. `next_run` is the date of the next
+    occurrence to materialize; monthly and yearly occurrences keep the day
+    of `start_date`, or the month's last day when it is shorter.
+    """
+
+    class Frequency(models.TextChoices):
+        DAILY = "daily", _("Daily")
+        WEEKLY = "weekly", _("Weekly")
+        MONTHLY = "monthly", _("Monthly")
+        YEARLY = "yearly", _("Yearly")
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="recurring_transactions",
+        verbose_name=_("User")
+    )
+    description = models.TextField(verbose_name=_("Description"))
+    amount = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name=_("Amount"),
+        validators=[MinValueValidator(0)]
+    )
+    currency = models.ForeignKey(
+        Currency,
+        on_delete=models.PROTECT,
+        verbose_name=_("Currency"),
+        default=1
+    )
+    payment_method = models.CharField(
+        max_length=20,
+        blank=True,
+        choices=Transaction.PaymentMethod.choices,
+        verbose_name=_("Payment Method")
+    )
+    transaction_type = models.CharField(
+        max_length=10,
+        choices=Transaction.TransactionType.choices,
+        verbose_name=_("Transaction Type")
+    )
+    category = models.ForeignKey(
+        CategoryUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("Category")
+    )
+    frequency = models.CharField(
+        max_length=10,
+        choices=Frequency.choices,
+        default=Frequency.MONTHLY,
+        verbose_name=_("Frequency")
+    )
+    interval = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1)], verbose_name=_("Interval")
+    )
+    start_date = models.DateField(verbose_name=_("Start Date"))
+    end_date = models.DateField(null=True, blank=True, verbose_name=_("End Date"))
+    next_run = models.DateField(verbose_name=_("Next Run"))
+    is_active = models.BooleanField(default=True, verbose_name=_("Is Active"))
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name=_("Created at")
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Updated at")
+    )
+
+    objects = RecurringTransactionManager()
+
+    class Meta:
+        ordering = ["next_run"]
+        verbose_name = _("Recurring Transaction")
+        verbose_name_plural = _("Recurring Transactions")
+        indexes = [
+            # Serves the scheduler's scan for due rules.
+            models.Index(
+                fields=["next_run"],
+                condition=models.Q(is_active=True),
+                name="recurring_active_next_run",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.description} ({self.get_frequency_display()}) - {self.amount}"
+
+    def following(self, date):
+        """Returns the date of the occurrence after the one on `date`."""
+        if self.frequency == self.Frequency.DAILY:
+            return date + datetime.timedelta(days=self.interval)
+        if self.frequency == self.Frequency.WEEKLY:
+            return date + datetime.timedelta(weeks=self.interval)
+        months = self.interval * (12 if self.frequency == self.Frequency.YEARLY else 1)
+        year, month = divmod(date.year * 12 + date.month - 1 + months, 12)
+        day = min(self.start_date.day, calendar.monthrange(year, month + 1)[1])
+        return datetime.date(year, month + 1, day)
+
+    def occurrences(self, until):
+        """Yields the dates of the pending occurrences up to `until`."""
+        date = self.next_run
+        while date <= until and (self.end_date is None or date <= self.end_date):
+            yield date
+            date = self.following(date)
+
+    def build(self, date):
+        """Returns the unsaved transaction of the occurrence on `date`."""
+        return Transaction(
+            user_id=self.user_id,
+            description=self.description,
+            amount=self.amount,
+            currency_id=self.currency_id,
+            date=date,
+            payment_method=self.payment_method,
+            transaction_type=self.transaction_type,
+            category_id=self.category_id,
+        )
+
+    def clean(self):
+        """
+        Validate the template as a transaction, and the dates.
+        """
+        self.build(self.start_date).clean()
+        if self.end_date and self.end_date < self.start_date:
+            raise ValidationError(_("The end date must not be before the start date."))
+
+    def save(self, *args, **kwargs):
+        """Run model validation and schedule the first occurrence before saving."""
+        self.clean()
+        if self.next_run is None:
+            self.next_run = self.start_date
+        super().save(*args, **kwargs)
+
+
+class CategorizationRule(models.Model):
+    """
+    Assigns `category` to a user's uncategorized transactions whose
+    description contains `pattern` (a keyword, or a regular expression
+    when `is_regex` is set; case-insensitive), optionally restricted to an
+    amount range and a payment method. Rules are tried by ascending
+    `priority`; see `transactions.categorization`.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="categorization_rules",
+        verbose_name=_("User")
+    )
+    category = models.ForeignKey(
+        CategoryUser,
+        on_delete=models.CASCADE,
+        related_name="categorization_rules",
+        verbose_name=_("Category")
+    )
+    pattern = models.CharField(max_length=200, blank=True, verbose_name=_("Pattern"))
+    is_regex = models.BooleanField(default=False, verbose_name=_("Regular Expression"))
+    min_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, verbose_name=_("Minimum Amount")
+    )
+    max_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, verbose_name=_("Maximum Amount")
+    )
+    payment_method = models.CharField(
+        max_length=20,
+        blank=True,
+        choices=Transaction.PaymentMethod.choices,
+        verbose_name=_("Payment Method")
+    )
+    priority = models.PositiveSmallIntegerField(default=100, verbose_name=_("Priority"))
+    is_active = models.BooleanField(default=True, verbose_name=_("Is Active"))
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name=_("Created at")
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Updated at")
+    )
+
+    class Meta:
+        ordering = ["priority", "pk"]
+        verbose_name = _("Categorization Rule")
+        verbose_name_plural = _("Categorization Rules")
+
+    def __str__(self):
+        return f"{self.pattern or '*'} -> {self.category_id}"
+
+    @property
+    def expression(self):
+        """The rule's pattern as a regular expression."""
+        return self.pattern if self.is_regex else re.escape(self.pattern)
+
+    def matches(self, amount, payment_method):
+        """Tells if the amount and payment method satisfy the rule."""
+        return (
+            (self.min_amount is None or amount >= self.min_amount)
+            and (self.max_amount is None or amount <= self.max_amount)
+            and (not self.payment_method or payment_method == self.payment_method)
+        )
+
+    def clean(self):
+        """
+        Ensure the category belongs to the user, the pattern compiles and
+        the amount range is not empty.
+        """
+        if self.category_id is not None and category_owner_id(self.category_id) != self.user_id:
             raise ValidationError(_("Category does not belong to the user."))
+        if self.is_regex:
+            try:
+                compiled = re.compile(f"(?:{self.pattern})")
+            except re.error as error:
+                raise ValidationError(_("Invalid regular expression: %s") % error) from error
+            # Rules are combined into one regular expression, where group
+            # names and numbers would clash.
+            if compiled.groups:
+                raise ValidationError(_(
+                    "Regular expressions can't contain groups or backreferences; "
+                    "use non-capturing groups: (?:...)."
+                ))
+        if self.min_amount is not None and self.max_amount is not None and self.min_amount > self.max_amount:
+            raise ValidationError(_("The minimum amount must not exceed the maximum amount."))
 
     def save(self, *args, **kwargs):
         """Run model validation before saving."""
@@ -0,0 +1,45 @@
+"""
+Cache of category ownership used to validate transactions.
+
+`Transaction.clean()` only needs the owner id of the transaction's
+category. Inside a `category_ownership_cache()` block (opened per request
+by `CategoryOwnershipMiddleware` and per batch by bulk operations) each
+category is looked up at most once.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+
+_owners = ContextVar("category_owners", default=None)
+
+
+@contextmanager
+def category_ownership_cache(category_users=()):
+    """
+    Caches category owners for the duration of the block, seeded with the
+    given `CategoryUser` instances. Nested blocks share the outer cache.
+    """
+    seed = {category_user.pk: category_user.user_id for category_user in category_users}
+    owners = _owners.get()
+    if owners is not None:
+        owners.update(seed)
+        yield
+        return
+    token = _owners.set(seed)
+    try:
+        yield
+    finally:
+        _owners.reset(token)
+
+
+def category_owner_id(category_id):
+    """Returns the id of the user owning a category, or None if it doesn't exist."""
+    owners = _owners.get()
+    if owners is not None and category_id in owners:
+        return owners[category_id]
+    CategoryUser = apps.get_model('transactions', 'CategoryUser')  # Lazy reference
+    owner_id = CategoryUser.objects.filter(pk=category_id).values_list('user_id', flat=True).first()
+    if owners is not None:
+        owners[category_id] = owner_id
+    return owner_id
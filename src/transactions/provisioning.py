@@ -0,0 +1,54 @@
+"""Provisioning of the default categories of new users."""
+import logging
+
+from .cache import category_cache
+from .models import Category, CategoryUser
+
+logger = logging.getLogger('transactions.provisioning')
+
+# Name and color of the categories every user starts with.
+DEFAULT_CATEGORIES = {
+    "alimentação": "#E67E22",
+    "transporte": "#3498DB",
+    "lazer": "#9B59B6",
+    "educação": "#1ABC9C",
+    "saúde": "#E74C3C",
+    "moradia": "#795548",
+    "investimentos": "#27AE60",
+    "outros": "#95A5A6",
+}
+
+
+def default_categories():
+    """
+    Returns the default `Category` rows, creating the missing ones with a
+    single `bulk_create`. `bulk_create` sends no `post_save` signals, so
+    the category cache is invalidated here when rows were missing.
+    """
+    categories = list(Category.objects.filter(name__in=DEFAULT_CATEGORIES))
+    if len(categories) == len(DEFAULT_CATEGORIES):
+        return categories
+    Category.objects.bulk_create(
+        [Category(name=name) for name in DEFAULT_CATEGORIES], ignore_conflicts=True
+    )
+    category_cache.invalidate()
+    return list(Category.objects.filter(name__in=DEFAULT_CATEGORIES))
+
+
+def provision_categories(users, categories=None):
+    """
+    Links the default categories to each of `users` with a single
+    `bulk_create`, skipping the links that already exist. Returns the
+    number of links attempted.
+    """
+    categories = categories if categories is not None else default_categories()
+    links = [
+        CategoryUser(
+            user=user, category=category, is_default=True, color=DEFAULT_CATEGORIES[category.name]
+        )
+        for user in users
+        for category in categories
+    ]
+    CategoryUser.objects.bulk_create(links, ignore_conflicts=True)
+    logger.info("Provisioned %d default categories for %d users.", len(categories), len(users))
+    return len(links)
@@ -0,0 +1,115 @@
+"""
+Spending reports: a user's totals bucketed by day, week, month or year.
+
+A report is computed with a single grouped query
+(`TransactionQuerySet.bucketed()`), and buckets without transactions are
+filled in Python. Reports are cached per (user, range, granularity,
+breakdown) under the versions of the months they cover, which are bumped
+whenever a transaction of that user and month changes.
+"""
+import hashlib
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import report_versions
+from .managers import BREAKDOWNS
+from .models import Transaction
+
+GRANULARITIES = ("day", "week", "month", "year")
+
+AMOUNTS = ("total", "income", "expense", "transfer", "net")
+COUNTS = ("count", "income_count", "expense_count", "transfer_count")
+
+
+def bucket_start(day, granularity):
+    """Returns the first day of the bucket containing `day`. Weeks start on Monday."""
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def periods(start, end, granularity):
+    """Yields the first day of every bucket overlapping [start, end]."""
+    period = bucket_start(start, granularity)
+    while period <= end:
+        yield period
+        if granularity == "day":
+            period += datetime.timedelta(days=1)
+        elif granularity == "week":
+            period += datetime.timedelta(weeks=1)
+        elif granularity == "month":
+            period = (period + datetime.timedelta(days=32)).replace(day=1)
+        else:
+            period = period.replace(year=period.year + 1)
+
+
+def months(start, end):
+    """Yields the first day of every month overlapping [start, end]."""
+    return periods(start, end, "month")
+
+
+def _empty_totals():
+    return {**dict.fromkeys(AMOUNTS, Decimal("0")), **dict.fromkeys(COUNTS, 0)}
+
+
+def _add(totals, row):
+    for name in AMOUNTS[:-1] + COUNTS:
+        totals[name] += row[name]
+    totals["net"] = totals["income"] - totals["expense"]
+
+
+def _cache_key(user, start, end, granularity, by):
+    versions = report_versions(user.pk, months(start, end))
+    digest = hashlib.md5(repr(versions).encode(), usedforsecurity=False).hexdigest()
+    return f"report:{user.pk}:{start}:{end}:{granularity}:{by}:{digest}"
+
+
+def spending_report(user, start, end, granularity="month", by=None):
+    """
+    Returns a list with one entry per `granularity` bucket between `start`
+    and `end` (inclusive dates), oldest first, including empty buckets:
+
+        {"period": date, "total": Decimal, "income": ..., "expense": ...,
+         "transfer": ..., "net": ..., "count": int, "income_count": ...,
+         "expense_count": ..., "transfer_count": ...}
+
+    With `by` ('category', 'payment_method' or 'currency'), each entry also
+    holds a `breakdown` list of {"key": value, <totals>} for the values
+    with transactions in the bucket. Amounts in different currencies are
+    added together unless broken down by currency.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'.")
+    if by is not None and by not in BREAKDOWNS:
+        raise ValueError(f"Unknown breakdown '{by}'.")
+    if start > end:
+        raise ValueError("The start of the range is after its end.")
+
+    key = _cache_key(user, start, end, granularity, by)
+    report = cache.get(key)
+    if report is not None:
+        return report
+
+    buckets = {
+        period: {"period": period, **_empty_totals(), **({"breakdown": []} if by else {})}
+        for period in periods(start, end, granularity)
+    }
+    rows = Transaction.objects.for_user(user).between(start, end).bucketed(granularity, by)
+    for row in rows:
+        bucket = buckets[row["period"]]
+        _add(bucket, row)
+        if by:
+            totals = {"key": row["key"], **_empty_totals()}
+            _add(totals, row)
+            bucket["breakdown"].append(totals)
+
+    report = list(buckets.values())
+    cache.set(key, report, getattr(settings, "REPORT_CACHE_TIMEOUT", 3600))
+    return report
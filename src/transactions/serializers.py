@@ -0,0 +1,16 @@
+def transaction_to_dict(transaction):
+    """
+    Returns a JSON serializable representation of a transaction.
+    Expects `currency` and `category__category` to be selected.
+    """
+    category = transaction.category
+    return {
+        "id": str(transaction.pk),
+        "date": transaction.date.isoformat(),
+        "description": transaction.description,
+        "amount": str(transaction.amount),
+        "currency": transaction.currency.code,
+        "payment_method": transaction.payment_method,
+        "transaction_type": transaction.transaction_type,
+        "category": category.category.name if category else None,
+    }
@@ -0,0 +1,30 @@
+# pylint: disable=unused-argument
+import logging
+
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+
+from .cache import currency_cache, category_cache, rate_cache, invalidate_rules
+from .models import Currency, Category, ExchangeRate, CategorizationRule
+
+logger = logging.getLogger('transactions.signals')
+
+
+@receiver([post_save, post_delete], sender=Currency)
+def invalidate_currency_cache(sender, **kwargs):
+    currency_cache.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    category_cache.invalidate()
+
+
+@receiver([post_save, post_delete], sender=ExchangeRate)
+def clear_rate_cache(sender, **kwargs):
+    rate_cache.clear()
+
+
+@receiver([post_save, post_delete], sender=CategorizationRule)
+def invalidate_categorization_rules(sender, instance, **kwargs):
+    invalidate_rules(instance.user_id)
@@ -0,0 +1,20 @@
+from django.urls import path
+from .views import (
+    TransactionListView,
+    AsyncTransactionListView,
+    TransactionSummaryView,
+    TransactionCreateView,
+    TransactionExportView,
+    TransactionReportView,
+)
+
+app_name = 'transactions'
+
+urlpatterns = [
+    path('', TransactionListView.as_view(), name='list'),
+    path('async/', AsyncTransactionListView.as_view(), name='async-list'),
+    path('summary/', TransactionSummaryView.as_view(), name='summary'),
+    path('new/', TransactionCreateView.as_view(), name='create'),
+    path('export/', TransactionExportView.as_view(), name='export'),
+    path('report/', TransactionReportView.as_view(), name='report'),
+]
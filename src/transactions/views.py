@@ -1,3 +1,227 @@
-from django.shortcuts import render
+import json
+import datetime
+from decimal import Decimal
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
+
+from app.mixins import AsyncLoginRequiredMixin
+from .exporters import EXPORTERS, export_queryset, aexport
+from .models import Currency, CategoryUser, Transaction
+from .reports import AMOUNTS, spending_report
+from .serializers import transaction_to_dict
+
+# JSON types accepted for each field of the create payload; anything else
+# (numbers for dates, lists, objects) is rejected before model validation.
+CREATE_FIELD_TYPES = {
+    "description": (str,),
+    "amount": (str, int, float),
+    "currency": (str,),
+    "date": (str,),
+    "payment_method": (str,),
+    "transaction_type": (str,),
+    "category": (str,),
+}
+
+
+class TransactionListView(LoginRequiredMixin, View):
+    """
+    Pages through the user's transactions, newest first. The `next` cursor
+    of a response is passed back as `?cursor=` to get the following page.
+    """
+
+    page_size = 50
+    max_page_size = 100
+
+    def get(self, request, *args, **kwargs):
+        try:
+            size = int(request.GET.get("size", self.page_size))
+            transactions, cursor = Transaction.objects.page(
+                request.user,
+                cursor=request.GET.get("cursor"),
+                size=max(1, min(size, self.max_page_size)),
+            )
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        return JsonResponse({
+            "results": [transaction_to_dict(transaction) for transaction in transactions],
+            "next": cursor,
+        })
+
+
+class AsyncTransactionListView(AsyncLoginRequiredMixin, View):
+    """Asynchronous version of `TransactionListView`, using `apage()`."""
+
+    page_size = TransactionListView.page_size
+    max_page_size = TransactionListView.max_page_size
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            size = int(request.GET.get("size", self.page_size))
+            transactions, cursor = await Transaction.objects.apage(
+                request.user,
+                cursor=request.GET.get("cursor"),
+                size=max(1, min(size, self.max_page_size)),
+            )
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        return JsonResponse({
+            "results": [transaction_to_dict(transaction) for transaction in transactions],
+            "next": cursor,
+        })
+
+
+class TransactionSummaryView(AsyncLoginRequiredMixin, View):
+    """
+    Returns the user's totals and counts, optionally between `?start=`
+    and `?end=` (inclusive, YYYY-MM-DD).
+    """
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            summary = await Transaction.objects.asummary(
+                request.user,
+                start=request.GET.get("start") or None,
+                end=request.GET.get("end") or None,
+            )
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        return JsonResponse({
+            key: str(value) if key in ("total", "income", "expense", "transfer", "net") else value
+            for key, value in summary.items()
+        })
+
+
+class TransactionCreateView(AsyncLoginRequiredMixin, View):
+    """
+    Creates a transaction from a JSON body with the fields returned by
+    the list endpoint; `currency` is a code and `category` is the name
+    of one of the user's categories.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON body."}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "Expected a JSON object."}, status=400)
+
+        errors = {
+            field: ["Invalid type."]
+            for field, types in CREATE_FIELD_TYPES.items()
+            if data.get(field) is not None
+            and (isinstance(data[field], bool) or not isinstance(data[field], types))
+        }
+        if errors:
+            return JsonResponse({"errors": errors}, status=400)
+        currency = await sync_to_async(Currency.objects.get_by_code)(
+            str(data.get("currency") or "BRL").upper()
+        )
+        if currency is None:
+            errors["currency"] = ["Unknown currency."]
+        category = None
+        name = str(data.get("category") or "").strip().lower()
+        if name:
+            category = await CategoryUser.objects.filter(
+                user=request.user, category__name=name
+            ).select_related("category").afirst()
+            if category is None:
+                errors["category"] = ["Unknown category."]
+        if errors:
+            return JsonResponse({"errors": errors}, status=400)
+
+        transaction = Transaction(
+            user=request.user,
+            description=data.get("description") or "",
+            amount=data.get("amount"),
+            currency=currency,
+            date=data.get("date"),
+            payment_method=data.get("payment_method") or "",
+            transaction_type=data.get("transaction_type") or "",
+            category=category,
+        )
+        try:
+            # Related objects were resolved above; transfers have no payment
+            # method, which `clean()` validates instead.
+            exclude = ["user", "currency", "category"]
+            if not transaction.payment_method:
+                exclude.append("payment_method")
+            transaction.clean_fields(exclude=exclude)
+            # Store and return the amount with the scale the list endpoint uses.
+            places = Transaction._meta.get_field("amount").decimal_places
+            transaction.amount = transaction.amount.quantize(Decimal(1).scaleb(-places))
+            await transaction.asave()
+        except ValidationError as error:
+            errors = error.message_dict if hasattr(error, "error_dict") else {"__all__": error.messages}
+            return JsonResponse({"errors": errors}, status=400)
+        return JsonResponse(transaction_to_dict(transaction), status=201)
+
+
+class TransactionExportView(AsyncLoginRequiredMixin, View):
+    """
+    Streams the user's transactions as `?format=csv` (default) or `json`,
+    optionally between `?start=` and `?end=` (inclusive, YYYY-MM-DD).
+    """
+
+    chunk_size = 2000
+
+    async def get(self, request, *args, **kwargs):
+        exporter = EXPORTERS.get(request.GET.get("format", "csv"))
+        if exporter is None:
+            return JsonResponse({"error": "Unknown export format."}, status=400)
+        try:
+            start, end = (
+                datetime.date.fromisoformat(value) if value else None
+                for value in (request.GET.get("start"), request.GET.get("end"))
+            )
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        exporter = exporter()
+        queryset = export_queryset(request.user, start, end)
+        response = StreamingHttpResponse(
+            aexport(exporter, queryset, self.chunk_size), content_type=exporter.content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="transactions.{exporter.extension}"'
+        return response
+
+
+class TransactionReportView(LoginRequiredMixin, View):
+    """
+    Returns the user's `spending_report` from `?start=` to `?end=` (today
+    by default), by `?granularity=` (day, week, month or year; month by
+    default) and optionally broken down `?by=` category, payment_method
+    or currency.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            start = datetime.date.fromisoformat(request.GET.get("start", ""))
+            end = request.GET.get("end")
+            end = datetime.date.fromisoformat(end) if end else timezone.localdate()
+            report = spending_report(
+                request.user, start, end,
+                granularity=request.GET.get("granularity", "month"),
+                by=request.GET.get("by") or None,
+            )
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        return JsonResponse({"results": [_report_json(entry) for entry in report]})
+
+
+def _report_json(totals):
+    """Returns report totals with amounts as strings and dates in ISO format."""
+    data = {}
+    for key, value in totals.items():
+        if key in AMOUNTS:
+            value = str(value)
+        elif key == "period":
+            value = value.isoformat()
+        elif key == "breakdown":
+            value = [_report_json(item) for item in value]
+        data[key] = value
+    return data